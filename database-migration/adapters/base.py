@@ -5,12 +5,26 @@ Defines the Adapter abstract base class for database-specific migration operatio
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
+from core.sql_splitter import split_statements
+
+# Tables owned by the migration tool itself, left out of database dumps and catalog snapshots.
+TOOL_TABLES = ('schema_migrations', 'schema_migration_statements', 'schema_migration_checkpoints', 'schema_migration_locks',
+               'schema_migration_catalog')
+
+# TOOL_TABLES as a SQL list, for NOT IN filters in catalog queries.
+TOOL_TABLE_LIST = ", ".join(f"'{table}'" for table in TOOL_TABLES)
 
 class Adapter(ABC):
     """
     Abstract base class for database adapters. Defines the required interface for migration registry operations.
     """
+    DIALECT = None
+    PLACEHOLDER = '%s'
+    # Whether DDL can be rolled back with the transaction it ran in.
+    TRANSACTIONAL_DDL = True
+    NAMED_PLACEHOLDER = '%({})s'
+
     @abstractmethod
     def initialize_registry(self, cursor):
         """
@@ -29,7 +43,7 @@ class Adapter(ABC):
         Args:
             cursor: Database cursor object.
             migration (dict): Migration metadata.
-            execution_time (str): Time taken to apply the migration.
+            execution_time (int): Milliseconds taken to apply the migration.
             status (str): Status of the migration.
             applied_by (str): User or system applying the migration.
         """
@@ -44,3 +58,369 @@ class Adapter(ABC):
             cursor: Database cursor object.
         """
         pass
+
+    @abstractmethod
+    def table_exists(self, cursor, table: str) -> bool:
+        """
+        Check whether a table exists, without creating it.
+
+        Args:
+            cursor: Database cursor object.
+            table (str): Unquoted table name, such as 'schema_migrations'.
+        Returns:
+            bool: True if the table exists.
+        """
+        pass
+
+    @abstractmethod
+    def create_registry_index(self, cursor):
+        """
+        Create the (version, checksum) index on schema_migrations used by the server-side pending diff.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_migrations(self, cursor, migrations: List[tuple]):
+        """
+        Compare scanned (version, checksum) pairs against schema_migrations in a single query.
+
+        Args:
+            cursor: Database cursor object.
+            migrations (List[tuple]): Scanned (version, checksum) pairs.
+        """
+        pass
+
+    @abstractmethod
+    def initialize_profile_table(self, cursor):
+        """
+        Initialize the schema_migration_statements table holding per-statement profiles.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    @abstractmethod
+    def record_statement_profiles(self, cursor, version: str, profiles: List[Dict[str, any]]) -> None:
+        """
+        Record per-statement profiles of an applied migration.
+
+        Args:
+            cursor: Database cursor object.
+            version (str): Version of the migration the statements belong to.
+            profiles (List[dict]): Profiles as produced by execute_migration.
+        """
+        pass
+
+    @abstractmethod
+    def delete_migrations(self, cursor, versions: List[str]) -> None:
+        """
+        Delete registry rows of rolled back migrations.
+
+        Args:
+            cursor: Database cursor object.
+            versions (List[str]): Versions to remove from schema_migrations.
+        """
+        pass
+
+    def begin(self, cursor) -> None:
+        """
+        Make sure a transaction is open on the cursor's connection. Drivers that open transactions implicitly need nothing here.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    def savepoint(self, cursor, name: str) -> None:
+        """
+        Create a savepoint in the current transaction.
+
+        Args:
+            cursor: Database cursor object.
+            name (str): Savepoint name.
+        """
+        cursor.execute(f"SAVEPOINT {name}")
+
+    def release_savepoint(self, cursor, name: str) -> None:
+        """
+        Release a savepoint, keeping its changes in the current transaction.
+
+        Args:
+            cursor: Database cursor object.
+            name (str): Savepoint name.
+        """
+        cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+    def rollback_to_savepoint(self, cursor, name: str) -> None:
+        """
+        Undo everything done in the current transaction since a savepoint.
+
+        Args:
+            cursor: Database cursor object.
+            name (str): Savepoint name.
+        """
+        cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+
+    def execute_script(self, cursor, sql: str) -> None:
+        """
+        Execute a migration script that may contain several statements.
+
+        Args:
+            cursor: Database cursor object.
+            sql (str): SQL script.
+        """
+        cursor.execute(sql)
+
+    def get_last_lock_wait(self, cursor):
+        """
+        Return the lock-wait time of the statement just executed on the cursor's session, in milliseconds.
+
+        Args:
+            cursor: Database cursor object.
+        Returns:
+            int: Milliseconds spent waiting for locks, or None when the backend does not expose it.
+        """
+        return None
+
+    def bulk_insert(self, cursor, table: str, columns, rows: List[tuple]) -> None:
+        """
+        Insert a batch of literal rows with a single executemany call.
+
+        Args:
+            cursor: Database cursor object.
+            table (str): Target table, as written in the migration.
+            columns (str): Comma-separated column list as written in the migration, or None for all columns.
+            rows (List[tuple]): Row values.
+        """
+        column_list = f" ({columns})" if columns else ""
+        placeholders = ", ".join([self.PLACEHOLDER] * len(rows[0]))
+        cursor.executemany(f"INSERT INTO {table}{column_list} VALUES ({placeholders})", rows)
+
+    def named_placeholder(self, name: str) -> str:
+        """
+        Return the driver's placeholder for a named query parameter.
+
+        Args:
+            name (str): Parameter name.
+        """
+        return self.NAMED_PLACEHOLDER.format(name)
+
+    @abstractmethod
+    def initialize_checkpoint_table(self, cursor):
+        """
+        Initialize the schema_migration_checkpoints table holding backfill progress.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    @abstractmethod
+    def get_checkpoint(self, cursor, version: str):
+        """
+        Return the next key a backfill should resume from, or None if it has no checkpoint.
+
+        Args:
+            cursor: Database cursor object.
+            version (str): Version of the backfill migration.
+        """
+        pass
+
+    @abstractmethod
+    def save_checkpoint(self, cursor, version: str, last_key: int) -> None:
+        """
+        Insert or advance the checkpoint of a backfill.
+
+        Args:
+            cursor: Database cursor object.
+            version (str): Version of the backfill migration.
+            last_key (int): Exclusive upper key of the last committed chunk.
+        """
+        pass
+
+    def delete_checkpoints(self, cursor, versions: List[str]) -> None:
+        """
+        Delete the checkpoints of backfills, so that applying them again starts from the lowest key.
+        Does nothing when no backfill ever created the checkpoint table.
+
+        Args:
+            cursor: Database cursor object.
+            versions (List[str]): Versions of the backfill migrations.
+        """
+        if self.table_exists(cursor, 'schema_migration_checkpoints'):
+            cursor.executemany(self.TEMPLATES["delete_checkpoint"], [(version,) for version in versions])
+
+    def get_key_range(self, cursor, table: str, key: str):
+        """
+        Return the (MIN, MAX) of a table's key column.
+
+        Args:
+            cursor: Database cursor object.
+            table (str): Table name, as written in the migration.
+            key (str): Key column name, as written in the migration.
+        """
+        cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}")
+        return cursor.fetchone()
+
+    @abstractmethod
+    def set_transaction_timeouts(self, cursor, lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+        """
+        Limit lock waits and statement runtime for the current transaction.
+
+        Args:
+            cursor: Database cursor object.
+            lock_timeout_ms (int): Maximum milliseconds to wait for a lock.
+            statement_timeout_ms (int): Maximum milliseconds a statement may run.
+        """
+        pass
+
+    def reset_transaction_timeouts(self, cursor) -> None:
+        """
+        Restore the timeouts in effect before set_transaction_timeouts, for backends where they outlive the transaction.
+        Nothing to do by default, since PostgreSQL scopes them to the transaction; MySQL and SQLite keep them on the connection, which a MigrationSession hands to the next borrower, so they override this.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    @abstractmethod
+    def try_advisory_lock(self, cursor, name: str) -> bool:
+        """
+        Try once, without waiting, to take the session-level migration lock for a registry.
+
+        Args:
+            cursor: Database cursor object.
+            name (str): Lock name identifying the registry.
+        Returns:
+            bool: True if the lock was taken by this connection.
+        """
+        pass
+
+    @abstractmethod
+    def release_advisory_lock(self, cursor, name: str) -> None:
+        """
+        Release the migration lock taken with try_advisory_lock.
+
+        Args:
+            cursor: Database cursor object.
+            name (str): Lock name identifying the registry.
+        """
+        pass
+
+    @abstractmethod
+    def dump_database(self, cursor, db_config: Dict[str, any]) -> str:
+        """
+        Dump the schema and data of every table except TOOL_TABLES as a SQL script.
+
+        Args:
+            cursor: Database cursor object.
+            db_config (dict): Connection settings, for backends that dump with an external tool.
+        Returns:
+            str: SQL script recreating the database.
+        """
+        pass
+
+    def load_dump(self, cursor, script: str) -> None:
+        """
+        Execute a script produced by dump_database, statement by statement, inside the caller's transaction.
+
+        Args:
+            cursor: Database cursor object.
+            script (str): SQL script.
+        """
+        self.begin(cursor)
+        for statement in split_statements(script, self.DIALECT):
+            cursor.execute(statement)
+
+    @abstractmethod
+    def initialize_catalog_table(self, cursor):
+        """
+        Initialize the schema_migration_catalog table holding per-version catalog snapshots.
+
+        Args:
+            cursor: Database cursor object.
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog(self, cursor, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Introspect the live schema into normalized object definitions, leaving out TOOL_TABLES.
+
+        Args:
+            cursor: Database cursor object.
+            names (List[str]): Only return objects with these names.
+        Returns:
+            List[tuple]: (object_type, object_name, definition) rows.
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog_hashes(self, cursor) -> List[tuple]:
+        """
+        Return the md5 of every definition get_catalog would return, hashed in the database where the backend can.
+
+        Args:
+            cursor: Database cursor object.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash) rows.
+        """
+        pass
+
+    @abstractmethod
+    def save_catalog(self, cursor, version: str, rows: List[tuple]) -> None:
+        """
+        Replace the catalog snapshot stored for a version.
+
+        Args:
+            cursor: Database cursor object.
+            version (str): Migration version the snapshot belongs to.
+            rows (List[tuple]): (object_type, object_name, object_hash, definition) rows.
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog_snapshot(self, cursor, version: str, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Read the catalog snapshot stored for a version.
+
+        Args:
+            cursor: Database cursor object.
+            version (str): Migration version of the snapshot.
+            names (List[str]): Only return objects with these names, including their definitions. Without names, definitions are None.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash, definition) rows.
+        """
+        pass
+
+    @abstractmethod
+    def explain_statement(self, cursor, statement: str) -> Dict[str, any]:
+        """
+        Estimate the rows a DML statement touches and its planner cost, without applying it.
+
+        Args:
+            cursor: Database cursor object, inside a transaction the caller rolls back.
+            statement (str): INSERT, UPDATE, DELETE or similar statement.
+        Returns:
+            dict: {"rows", "cost"}, either None when the backend does not estimate it.
+        """
+        pass
+
+    @abstractmethod
+    def estimate_table_rows(self, cursor, table: str) -> Optional[int]:
+        """
+        Estimate a table's row count from statistics, without scanning it where the backend keeps statistics.
+
+        Args:
+            cursor: Database cursor object.
+            table (str): Table name, lower case and unquoted.
+        Returns:
+            int: Estimated rows, or None if the table does not exist or has never been analyzed.
+        """
+        pass
+
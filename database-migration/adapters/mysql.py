@@ -4,13 +4,19 @@ mysql.py
 Implements the Adapter interface for MySQL, providing methods to initialize the migration registry, record migrations, and retrieve applied migrations.
 """
 
-from .base import Adapter
-from typing import Dict, List
+import os
+import subprocess
+from .base import Adapter, TOOL_TABLES, TOOL_TABLE_LIST
+from typing import Dict, List, Optional
+from core.sql_splitter import split_statements
 
 class mySQL(Adapter):
     """
     MySQL adapter for migration registry operations.
     """
+    DIALECT = 'mysql'
+    TRANSACTIONAL_DDL = False
+
     def __init__(self):
         """
         Initialize the mySQL adapter with SQL templates for migration operations.
@@ -43,9 +49,190 @@ class mySQL(Adapter):
                 FROM schema_migrations
                 ORDER BY version;
     """,
+
+            "table_exists": """
+                SELECT COUNT(*)
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s;
+    """,
+
+            "initialize_profile_table": """
+                CREATE TABLE IF NOT EXISTS schema_migration_statements (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    version VARCHAR(50) NOT NULL,
+                    statement_index INTEGER NOT NULL,
+                    statement TEXT NOT NULL,
+                    duration_ms INTEGER NOT NULL,
+                    row_count BIGINT,
+                    lock_wait_ms INTEGER,
+                    executed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    KEY (version)
+                );
+    """,
+
+            "record_statement_profile": """
+                INSERT INTO schema_migration_statements
+                    (version, statement_index, statement, duration_ms, row_count, lock_wait_ms)
+                VALUES
+                    (%s, %s, %s, %s, %s, %s);
+    """,
+
+            "last_lock_wait": """
+                SELECT LOCK_TIME
+                FROM performance_schema.events_statements_history
+                WHERE THREAD_ID = PS_CURRENT_THREAD_ID()
+                ORDER BY EVENT_ID DESC
+                LIMIT 1;
+    """,
+
+            "initialize_checkpoint_table": """
+                CREATE TABLE IF NOT EXISTS schema_migration_checkpoints (
+                    version VARCHAR(50) NOT NULL PRIMARY KEY,
+                    last_key BIGINT NOT NULL,
+                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                );
+    """,
+
+            "get_checkpoint": """
+                SELECT last_key
+                FROM schema_migration_checkpoints
+                WHERE version = %s;
+    """,
+
+            "delete_checkpoint": """
+                DELETE FROM schema_migration_checkpoints
+                WHERE version = %s;
+    """,
+
+            "save_checkpoint": """
+                INSERT INTO schema_migration_checkpoints
+                    (version, last_key)
+                VALUES
+                    (%s, %s)
+                ON DUPLICATE KEY UPDATE last_key = VALUES(last_key);
+    """,
+
+            "registry_index_exists": """
+                SELECT COUNT(*)
+                FROM information_schema.statistics
+                WHERE table_schema = DATABASE()
+                    AND table_name = 'schema_migrations'
+                    AND index_name = 'schema_migrations_version_checksum_idx';
+    """,
+
+            "create_registry_index": """
+                CREATE INDEX schema_migrations_version_checksum_idx
+                ON schema_migrations (version, checksum);
+    """,
+
+            "get_pending_migrations": """
+                SELECT s.version, s.checksum, m.checksum
+                FROM ({values}) AS s
+                LEFT JOIN schema_migrations m ON m.version = s.version
+                WHERE m.version IS NULL OR m.checksum <> s.checksum;
+    """,
+
+            "delete_migration": """
+                DELETE FROM schema_migrations
+                WHERE version = %s;
+    """,
+
+            "try_advisory_lock": """SELECT GET_LOCK(%s, 0);""",
+
+            "release_advisory_lock": """SELECT RELEASE_LOCK(%s);""",
+
+            "save_timeouts": """
+                SET @schema_migration_lock_wait_timeout = COALESCE(@schema_migration_lock_wait_timeout, @@SESSION.innodb_lock_wait_timeout),
+                    @schema_migration_max_execution_time = COALESCE(@schema_migration_max_execution_time, @@SESSION.max_execution_time);
+    """,
+
+            "restore_timeouts": """
+                SET SESSION innodb_lock_wait_timeout = COALESCE(@schema_migration_lock_wait_timeout, @@GLOBAL.innodb_lock_wait_timeout),
+                    SESSION max_execution_time = COALESCE(@schema_migration_max_execution_time, @@GLOBAL.max_execution_time);
+    """,
+
+            "clear_saved_timeouts": """
+                SET @schema_migration_lock_wait_timeout = NULL, @schema_migration_max_execution_time = NULL;
+    """,
+
+            "estimate_table_rows": """
+                SELECT TABLE_ROWS
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s;
+    """,
+
+            "initialize_catalog_table": """
+                CREATE TABLE IF NOT EXISTS schema_migration_catalog (
+                    version VARCHAR(50) NOT NULL,
+                    object_type VARCHAR(20) NOT NULL,
+                    object_name VARCHAR(512) NOT NULL,
+                    object_hash VARCHAR(64) NOT NULL,
+                    definition LONGTEXT,
+                    captured_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (version, object_type, object_name)
+                );
+    """,
+
+            # One normalized definition per table, index, foreign key, view, routine and trigger of the current database, read from information_schema.
+            "catalog": f"""
+                SELECT 'table' AS object_type, c.TABLE_NAME AS object_name,
+                       GROUP_CONCAT(CONCAT(c.COLUMN_NAME, ' ', c.COLUMN_TYPE,
+                                           IF(c.IS_NULLABLE = 'NO', ' NOT NULL', ''),
+                                           IFNULL(CONCAT(' DEFAULT ', c.COLUMN_DEFAULT), ''),
+                                           IF(c.EXTRA = '', '', CONCAT(' ', c.EXTRA)))
+                                    ORDER BY c.ORDINAL_POSITION SEPARATOR ', ') AS definition
+                FROM information_schema.COLUMNS c
+                JOIN information_schema.TABLES t ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+                WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE' AND c.TABLE_NAME NOT IN ({TOOL_TABLE_LIST})
+                GROUP BY c.TABLE_NAME
+                UNION ALL
+                SELECT 'index', CONCAT(TABLE_NAME, '.', INDEX_NAME),
+                       CONCAT(IF(NON_UNIQUE = 0, 'UNIQUE ', ''), INDEX_TYPE, ' (',
+                              GROUP_CONCAT(CONCAT(COLUMN_NAME, IFNULL(CONCAT('(', SUB_PART, ')'), '')) ORDER BY SEQ_IN_INDEX SEPARATOR ', '), ')')
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME NOT IN ({TOOL_TABLE_LIST})
+                GROUP BY TABLE_NAME, INDEX_NAME, NON_UNIQUE, INDEX_TYPE
+                UNION ALL
+                SELECT 'constraint', CONCAT(TABLE_NAME, '.', CONSTRAINT_NAME),
+                       CONCAT('FOREIGN KEY (', GROUP_CONCAT(COLUMN_NAME ORDER BY ORDINAL_POSITION SEPARATOR ', '), ') REFERENCES ',
+                              REFERENCED_TABLE_NAME, ' (', GROUP_CONCAT(REFERENCED_COLUMN_NAME ORDER BY ORDINAL_POSITION SEPARATOR ', '), ')')
+                FROM information_schema.KEY_COLUMN_USAGE
+                WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+                GROUP BY TABLE_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME
+                UNION ALL
+                SELECT 'view', TABLE_NAME, VIEW_DEFINITION
+                FROM information_schema.VIEWS
+                WHERE TABLE_SCHEMA = DATABASE()
+                UNION ALL
+                SELECT LOWER(ROUTINE_TYPE), ROUTINE_NAME, IFNULL(ROUTINE_DEFINITION, '')
+                FROM information_schema.ROUTINES
+                WHERE ROUTINE_SCHEMA = DATABASE()
+                UNION ALL
+                SELECT 'trigger', CONCAT(EVENT_OBJECT_TABLE, '.', TRIGGER_NAME),
+                       CONCAT(ACTION_TIMING, ' ', EVENT_MANIPULATION, ' ', ACTION_STATEMENT)
+                FROM information_schema.TRIGGERS
+                WHERE TRIGGER_SCHEMA = DATABASE()
+    """,
+
+            "delete_catalog": """
+                DELETE FROM schema_migration_catalog
+                WHERE version = %s;
+    """,
+
+            "record_catalog": """
+                INSERT INTO schema_migration_catalog
+                (version, object_type, object_name, object_hash, definition)
+                VALUES (%s, %s, %s, %s, %s);
+    """,
+
+            "get_catalog_snapshot": """
+                SELECT object_type, object_name, object_hash, {definition}
+                FROM schema_migration_catalog
+                WHERE version = %s {names};
+    """,
         }
 
-    def intialize_registry(self, cursor):
+    def initialize_registry(self, cursor):
         """
         Create the schema_migrations table in the MySQL database if it does not exist.
 
@@ -61,7 +248,7 @@ class mySQL(Adapter):
         Args:
             cursor: MySQL database cursor.
             migration (dict): Migration metadata.
-            execution_time (str): Time taken to apply the migration.
+            execution_time (int): Milliseconds taken to apply the migration.
             status (str): Status of the migration.
             applied_by (str): User or system applying the migration.
         """
@@ -82,3 +269,325 @@ class mySQL(Adapter):
             cursor: MySQL database cursor.
         """
         cursor.execute(self.TEMPLATES["get_applied_migrations"])
+
+    def table_exists(self, cursor, table: str) -> bool:
+        """
+        Check information_schema for a table in the current database.
+
+        Args:
+            cursor: MySQL database cursor.
+            table (str): Unquoted table name.
+        Returns:
+            bool: True if the table exists.
+        """
+        cursor.execute(self.TEMPLATES["table_exists"], (table,))
+        return cursor.fetchone()[0] > 0
+
+    def create_registry_index(self, cursor):
+        """
+        Create the (version, checksum) index on schema_migrations if it does not exist.
+        MySQL has no CREATE INDEX IF NOT EXISTS, so information_schema is checked first.
+
+        Args:
+            cursor: MySQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["registry_index_exists"])
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(self.TEMPLATES["create_registry_index"])
+
+    def get_pending_migrations(self, cursor, migrations: List[tuple]):
+        """
+        Ship the scanned (version, checksum) pairs as a UNION ALL derived table and select only the rows that are unapplied or whose checksum differs.
+
+        Args:
+            cursor: MySQL database cursor.
+            migrations (List[tuple]): Scanned (version, checksum) pairs.
+        Returns:
+            List[tuple]: (version, scanned checksum, recorded checksum or None) rows.
+        """
+        if not migrations:
+            return []
+        values = " UNION ALL ".join(["SELECT %s AS version, %s AS checksum"] + ["SELECT %s, %s"] * (len(migrations) - 1))
+        params = [value for pair in migrations for value in pair]
+        cursor.execute(self.TEMPLATES["get_pending_migrations"].format(values=values), params)
+        return cursor.fetchall()
+
+    def initialize_profile_table(self, cursor):
+        """
+        Create the schema_migration_statements table if it does not exist.
+
+        Args:
+            cursor: MySQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_profile_table"])
+
+    def record_statement_profiles(self, cursor, version: str, profiles: List[Dict[str, any]]) -> None:
+        """
+        Record per-statement profiles of an applied migration.
+
+        Args:
+            cursor: MySQL database cursor.
+            version (str): Version of the migration the statements belong to.
+            profiles (List[dict]): Profiles as produced by execute_migration.
+        """
+        cursor.executemany(self.TEMPLATES["record_statement_profile"],
+                           [(version,
+                             p['statement_index'],
+                             p['statement'],
+                             p['duration_ms'],
+                             p['row_count'],
+                             p['lock_wait_ms'],) for p in profiles])
+
+    def execute_script(self, cursor, sql: str) -> None:
+        """
+        Execute a migration script statement by statement.
+        mysql.connector rejects several statements in one execute() unless multi=True, so the script is split instead.
+
+        Args:
+            cursor: MySQL database cursor.
+            sql (str): SQL script.
+        """
+        for statement in split_statements(sql, self.DIALECT):
+            cursor.execute(statement)
+
+    def get_last_lock_wait(self, cursor):
+        """
+        Read the lock time of the previous statement from performance_schema (reported in picoseconds).
+        Returns None when performance_schema or its statement history consumer is disabled.
+
+        Args:
+            cursor: MySQL database cursor.
+        Returns:
+            int: Milliseconds spent waiting for locks, or None.
+        """
+        try:
+            cursor.execute(self.TEMPLATES["last_lock_wait"])
+            row = cursor.fetchone()
+        except Exception:
+            return None
+        return int(row[0] / 1_000_000_000) if row and row[0] is not None else None
+
+    def initialize_checkpoint_table(self, cursor):
+        """
+        Create the schema_migration_checkpoints table if it does not exist.
+
+        Args:
+            cursor: MySQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_checkpoint_table"])
+
+    def get_checkpoint(self, cursor, version: str):
+        """
+        Return the next key a backfill should resume from, or None if it has no checkpoint.
+
+        Args:
+            cursor: MySQL database cursor.
+            version (str): Version of the backfill migration.
+        """
+        cursor.execute(self.TEMPLATES["get_checkpoint"], (version,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, cursor, version: str, last_key: int) -> None:
+        """
+        Insert or advance the checkpoint of a backfill.
+
+        Args:
+            cursor: MySQL database cursor.
+            version (str): Version of the backfill migration.
+            last_key (int): Exclusive upper key of the last committed chunk.
+        """
+        cursor.execute(self.TEMPLATES["save_checkpoint"], (version, last_key,))
+
+    def set_transaction_timeouts(self, cursor, lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+        """
+        Set InnoDB's lock wait timeout (whole seconds) and max_execution_time for the session.
+        MySQL has no transaction-scoped setting, so the session's previous values are kept in user variables, once per reset, for reset_transaction_timeouts to restore.
+        MySQL only enforces max_execution_time on SELECT statements.
+
+        Args:
+            cursor: MySQL database cursor.
+            lock_timeout_ms (int): Maximum milliseconds to wait for a lock.
+            statement_timeout_ms (int): Maximum milliseconds a statement may run.
+        """
+        cursor.execute(self.TEMPLATES["save_timeouts"])
+        cursor.execute(f"SET SESSION innodb_lock_wait_timeout = {max(1, -(-int(lock_timeout_ms) // 1000))}")
+        cursor.execute(f"SET SESSION max_execution_time = {int(statement_timeout_ms)}")
+
+    def reset_transaction_timeouts(self, cursor) -> None:
+        """
+        Restore the session timeouts saved by set_transaction_timeouts, so they do not carry over to later work on the pooled connection.
+
+        Args:
+            cursor: MySQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["restore_timeouts"])
+        cursor.execute(self.TEMPLATES["clear_saved_timeouts"])
+
+    def delete_migrations(self, cursor, versions: List[str]) -> None:
+        """
+        Delete registry rows of rolled back migrations.
+
+        Args:
+            cursor: MySQL database cursor.
+            versions (List[str]): Versions to remove from schema_migrations.
+        """
+        cursor.executemany(self.TEMPLATES["delete_migration"], [(version,) for version in versions])
+
+    def try_advisory_lock(self, cursor, name: str) -> bool:
+        """
+        Take a named user-level lock with GET_LOCK, without waiting.
+        Lock names are server-wide and limited to 64 characters, so callers should include the database name.
+
+        Args:
+            cursor: MySQL database cursor.
+            name (str): Lock name identifying the registry.
+        Returns:
+            bool: True if the lock was taken by this connection.
+        """
+        cursor.execute(self.TEMPLATES["try_advisory_lock"], (name[:64],))
+        return cursor.fetchone()[0] == 1
+
+    def release_advisory_lock(self, cursor, name: str) -> None:
+        """
+        Release the named lock with RELEASE_LOCK.
+
+        Args:
+            cursor: MySQL database cursor.
+            name (str): Lock name identifying the registry.
+        """
+        cursor.execute(self.TEMPLATES["release_advisory_lock"], (name[:64],))
+        cursor.fetchone()
+
+    def dump_database(self, cursor, db_config: Dict[str, any]) -> str:
+        """
+        Dump the database with mysqldump, leaving out the migration tool's tables.
+        Table locks are not written, since LOCK TABLES would commit the loading transaction. The password is passed through MYSQL_PWD so it does not appear in the process list.
+
+        Args:
+            cursor: MySQL database cursor.
+            db_config (dict): Connection settings passed to mysqldump.
+        Returns:
+            str: SQL script recreating the database.
+        """
+        database = db_config["database"]
+        env = dict(os.environ)
+        if "password" in db_config:
+            env["MYSQL_PWD"] = str(db_config["password"])
+        command = ["mysqldump", "--skip-comments", "--skip-add-locks", "--no-tablespaces", "--single-transaction"]
+        for key, flag in (("host", "--host"), ("port", "--port"), ("user", "--user")):
+            if key in db_config:
+                command.append(f"{flag}={db_config[key]}")
+        command += [f"--ignore-table={database}.{table}" for table in TOOL_TABLES]
+        command.append(database)
+        result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+        return result.stdout
+
+    def initialize_catalog_table(self, cursor):
+        """
+        Create the schema_migration_catalog table if it does not exist.
+
+        Args:
+            cursor: MySQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_catalog_table"])
+
+    def get_catalog(self, cursor, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Introspect the current database from information_schema.
+        GROUP_CONCAT is capped at 1 KB by default, so the session limit is raised first to keep wide tables whole.
+
+        Args:
+            cursor: MySQL database cursor.
+            names (List[str]): Only return objects with these names.
+        Returns:
+            List[tuple]: (object_type, object_name, definition) rows.
+        """
+        if names is not None and not names:
+            return []
+        cursor.execute(GROUP_CONCAT_LIMIT)
+        query = f"SELECT object_type, object_name, definition FROM ({self.TEMPLATES['catalog']}) AS catalog"
+        if names is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(f"{query} WHERE object_name IN ({', '.join(['%s'] * len(names))})", names)
+        return cursor.fetchall()
+
+    def get_catalog_hashes(self, cursor) -> List[tuple]:
+        """
+        Hash every catalog definition with MD5() on the server, so only one short row per object is transferred.
+
+        Args:
+            cursor: MySQL database cursor.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash) rows.
+        """
+        cursor.execute(GROUP_CONCAT_LIMIT)
+        cursor.execute(f"SELECT object_type, object_name, MD5(IFNULL(definition, '')) FROM ({self.TEMPLATES['catalog']}) AS catalog")
+        return cursor.fetchall()
+
+    def save_catalog(self, cursor, version: str, rows: List[tuple]) -> None:
+        """
+        Replace the catalog snapshot stored for a version.
+
+        Args:
+            cursor: MySQL database cursor.
+            version (str): Migration version the snapshot belongs to.
+            rows (List[tuple]): (object_type, object_name, object_hash, definition) rows.
+        """
+        cursor.execute(self.TEMPLATES["delete_catalog"], (version,))
+        cursor.executemany(self.TEMPLATES["record_catalog"], [(version, *row) for row in rows])
+
+    def get_catalog_snapshot(self, cursor, version: str, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Read the catalog snapshot stored for a version.
+
+        Args:
+            cursor: MySQL database cursor.
+            version (str): Migration version of the snapshot.
+            names (List[str]): Only return these objects, with their definitions.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash, definition) rows.
+        """
+        if names is None:
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="NULL", names=""), (version,))
+        elif not names:
+            return []
+        else:
+            names_filter = f"AND object_name IN ({', '.join(['%s'] * len(names))})"
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="definition", names=names_filter), (version, *names))
+        return cursor.fetchall()
+
+    def explain_statement(self, cursor, statement: str) -> Dict[str, any]:
+        """
+        Run EXPLAIN, which plans the statement without executing it, and take the largest per-table row estimate.
+        MySQL reports no rows for INSERT ... VALUES and no cost in the tabular format.
+
+        Args:
+            cursor: MySQL database cursor.
+            statement (str): DML statement.
+        Returns:
+            dict: {"rows": estimated rows touched or None, "cost": None}.
+        """
+        cursor.execute(f"EXPLAIN {statement}")
+        columns = [column[0].lower() for column in cursor.description]
+        rows = [row[columns.index("rows")] for row in cursor.fetchall() if row[columns.index("rows")] is not None]
+        return {"rows": int(max(rows)) if rows else None, "cost": None}
+
+    def estimate_table_rows(self, cursor, table: str) -> Optional[int]:
+        """
+        Read InnoDB's row estimate from information_schema.TABLES.
+
+        Args:
+            cursor: MySQL database cursor.
+            table (str): Table name.
+        Returns:
+            int: Estimated rows, or None if the table does not exist.
+        """
+        cursor.execute(self.TEMPLATES["estimate_table_rows"], (table.split(".")[-1],))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+
+# Raises the GROUP_CONCAT limit for the session, so catalog definitions of wide tables are not truncated.
+GROUP_CONCAT_LIMIT = "SET SESSION group_concat_max_len = 16777216"
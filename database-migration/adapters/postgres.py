@@ -4,13 +4,20 @@ postgres.py
 Implements the Adapter interface for PostgreSQL, providing methods to initialize the migration registry, record migrations, and retrieve applied migrations.
 """
 
-from .base import Adapter
-from typing import List,Dict
+import io
+import json
+import os
+import subprocess
+import zlib
+from .base import Adapter, TOOL_TABLES, TOOL_TABLE_LIST
+from typing import List,Dict,Optional
 
 class posgrestSQL(Adapter):
     """
     PostgreSQL adapter for migration registry operations.
     """
+    DIALECT = 'postgresql'
+
     def __init__(self):
         """
         Initialize the posgrestSQL adapter with SQL templates for migration operations.
@@ -42,6 +49,151 @@ class posgrestSQL(Adapter):
                                FROM schema_migrations
                                ORDER BY version
                                """,
+
+            'table_exists': """SELECT to_regclass(%s) IS NOT NULL""",
+
+            'initialize_profile_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_statements (
+                                    id SERIAL PRIMARY KEY,
+                                    version VARCHAR(50) NOT NULL,
+                                    statement_index INTEGER NOT NULL,
+                                    statement TEXT NOT NULL,
+                                    duration_ms INTEGER NOT NULL,
+                                    row_count BIGINT,
+                                    lock_wait_ms INTEGER,
+                                    executed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                    );
+                                CREATE INDEX IF NOT EXISTS schema_migration_statements_version_idx
+                                ON schema_migration_statements (version);
+                                """,
+
+            'record_statement_profile': """
+                                INSERT INTO schema_migration_statements
+                                (version, statement_index, statement, duration_ms, row_count, lock_wait_ms)
+                                VALUES(%s, %s, %s, %s, %s, %s)
+                                """,
+
+            'initialize_checkpoint_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_checkpoints (
+                                    version VARCHAR(50) PRIMARY KEY,
+                                    last_key BIGINT NOT NULL,
+                                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                    );
+                                """,
+
+            'get_checkpoint': """SELECT last_key
+                               FROM schema_migration_checkpoints
+                               WHERE version = %s
+                               """,
+
+            'delete_checkpoint': """DELETE FROM schema_migration_checkpoints
+                               WHERE version = %s
+                               """,
+
+            'save_checkpoint': """
+                                INSERT INTO schema_migration_checkpoints
+                                (version, last_key)
+                                VALUES(%s, %s)
+                                ON CONFLICT (version) DO UPDATE
+                                SET last_key = EXCLUDED.last_key, updated_at = CURRENT_TIMESTAMP
+                                """,
+
+            'create_registry_index': """
+                                CREATE INDEX IF NOT EXISTS schema_migrations_version_checksum_idx
+                                ON schema_migrations (version, checksum)
+                                """,
+
+            'get_pending_migrations': """
+                                SELECT s.version, s.checksum, m.checksum
+                                FROM (VALUES {values}) AS s(version, checksum)
+                                LEFT JOIN schema_migrations m ON m.version = s.version
+                                WHERE m.version IS NULL OR m.checksum <> s.checksum
+                                """,
+
+            'delete_migration': """DELETE FROM schema_migrations
+                               WHERE version = %s
+                               """,
+
+            'try_advisory_lock': """SELECT pg_try_advisory_lock(%s)""",
+
+            'release_advisory_lock': """SELECT pg_advisory_unlock(%s)""",
+
+            'estimate_table_rows': """SELECT reltuples::bigint
+                               FROM pg_class
+                               WHERE oid = to_regclass(%s)
+                               """,
+
+            'initialize_catalog_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_catalog (
+                                    version VARCHAR(50) NOT NULL,
+                                    object_type VARCHAR(20) NOT NULL,
+                                    object_name VARCHAR(512) NOT NULL,
+                                    object_hash VARCHAR(64) NOT NULL,
+                                    definition TEXT,
+                                    captured_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                                    PRIMARY KEY (version, object_type, object_name)
+                                    );
+                                """,
+
+            # One normalized definition per table, index, constraint, view, function and trigger, read from pg_catalog.
+            'catalog': f"""
+                                SELECT 'table' AS object_type, n.nspname || '.' || r.relname AS object_name,
+                                       string_agg(a.attname || ' ' || format_type(a.atttypid, a.atttypmod)
+                                                  || CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END
+                                                  || coalesce(' DEFAULT ' || pg_get_expr(d.adbin, d.adrelid), ''),
+                                                  ', ' ORDER BY a.attnum) AS definition
+                                FROM pg_class r
+                                JOIN pg_namespace n ON n.oid = r.relnamespace
+                                JOIN pg_attribute a ON a.attrelid = r.oid AND a.attnum > 0 AND NOT a.attisdropped
+                                LEFT JOIN pg_attrdef d ON d.adrelid = r.oid AND d.adnum = a.attnum
+                                WHERE r.relkind IN ('r', 'p') AND n.nspname <> 'information_schema' AND n.nspname !~ '^pg_'
+                                  AND r.relname NOT IN ({TOOL_TABLE_LIST})
+                                GROUP BY n.nspname, r.relname
+                                UNION ALL
+                                SELECT 'index', schemaname || '.' || indexname, indexdef
+                                FROM pg_indexes
+                                WHERE schemaname <> 'information_schema' AND schemaname !~ '^pg_' AND tablename NOT IN ({TOOL_TABLE_LIST})
+                                UNION ALL
+                                SELECT 'constraint', n.nspname || '.' || r.relname || '.' || c.conname, pg_get_constraintdef(c.oid)
+                                FROM pg_constraint c
+                                JOIN pg_class r ON r.oid = c.conrelid
+                                JOIN pg_namespace n ON n.oid = r.relnamespace
+                                WHERE n.nspname <> 'information_schema' AND n.nspname !~ '^pg_' AND r.relname NOT IN ({TOOL_TABLE_LIST})
+                                UNION ALL
+                                SELECT 'view', schemaname || '.' || viewname, definition
+                                FROM pg_views
+                                WHERE schemaname <> 'information_schema' AND schemaname !~ '^pg_'
+                                UNION ALL
+                                SELECT 'function', n.nspname || '.' || p.proname || '(' || pg_get_function_identity_arguments(p.oid) || ')',
+                                       pg_get_functiondef(p.oid)
+                                FROM pg_proc p
+                                JOIN pg_namespace n ON n.oid = p.pronamespace
+                                WHERE p.prokind IN ('f', 'p') AND n.nspname <> 'information_schema' AND n.nspname !~ '^pg_'
+                                UNION ALL
+                                SELECT 'trigger', n.nspname || '.' || r.relname || '.' || t.tgname, pg_get_triggerdef(t.oid)
+                                FROM pg_trigger t
+                                JOIN pg_class r ON r.oid = t.tgrelid
+                                JOIN pg_namespace n ON n.oid = r.relnamespace
+                                WHERE NOT t.tgisinternal AND n.nspname <> 'information_schema' AND n.nspname !~ '^pg_'
+                                """,
+
+            'delete_catalog': """DELETE FROM schema_migration_catalog
+                               WHERE version = %s
+                               """,
+
+            'record_catalog': """
+                                INSERT INTO schema_migration_catalog
+                                (version, object_type, object_name, object_hash, definition)
+                                VALUES(%s, %s, %s, %s, %s)
+                                """,
+
+            'get_catalog_snapshot': """SELECT object_type, object_name, object_hash, {definition}
+                               FROM schema_migration_catalog
+                               WHERE version = %s {names}
+                               """,
         }
 
 
@@ -51,7 +203,7 @@ class posgrestSQL(Adapter):
         Args:
             cursor: PostgreSQL database cursor.
         """
-        cursor.execute(self.TEMPLATES['initialize_registry'])
+        cursor.execute(self.TEMPLATES['initialize_table'])
 
 
     def record_migration(self, cursor, migration: Dict[str, any], execution_time: str, status: str, applied_by='system') -> None:
@@ -60,7 +212,7 @@ class posgrestSQL(Adapter):
         Args:
             cursor: PostgreSQL database cursor.
             migration (dict): Migration metadata.
-            execution_time (str): Time taken to apply the migration.
+            execution_time (int): Milliseconds taken to apply the migration.
             status (str): Status of the migration.
             applied_by (str): User or system applying the migration.
         """
@@ -80,3 +232,301 @@ class posgrestSQL(Adapter):
             cursor: PostgreSQL database cursor.
         """
         cursor.execute(self.TEMPLATES["get_applied_migrations"])
+
+    def table_exists(self, cursor, table: str) -> bool:
+        """
+        Check whether a table resolves on the search path.
+        Args:
+            cursor: PostgreSQL database cursor.
+            table (str): Unquoted table name.
+        Returns:
+            bool: True if the table exists.
+        """
+        cursor.execute(self.TEMPLATES["table_exists"], (table,))
+        return bool(cursor.fetchone()[0])
+
+    def create_registry_index(self, cursor):
+        """
+        Create the (version, checksum) index on schema_migrations if it does not exist.
+        Args:
+            cursor: PostgreSQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["create_registry_index"])
+
+    def get_pending_migrations(self, cursor, migrations: List[tuple]):
+        """
+        Ship the scanned (version, checksum) pairs as a VALUES list and select only the rows that are unapplied or whose checksum differs.
+        Args:
+            cursor: PostgreSQL database cursor.
+            migrations (List[tuple]): Scanned (version, checksum) pairs.
+        Returns:
+            List[tuple]: (version, scanned checksum, recorded checksum or None) rows.
+        """
+        if not migrations:
+            return []
+        values = ", ".join(["(%s, %s)"] * len(migrations))
+        params = [value for pair in migrations for value in pair]
+        cursor.execute(self.TEMPLATES["get_pending_migrations"].format(values=values), params)
+        return cursor.fetchall()
+
+    def initialize_profile_table(self, cursor):
+        """
+        Create the schema_migration_statements table if it does not exist.
+        Args:
+            cursor: PostgreSQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_profile_table"])
+
+    def record_statement_profiles(self, cursor, version: str, profiles: List[Dict[str, any]]) -> None:
+        """
+        Record per-statement profiles of an applied migration.
+        PostgreSQL does not expose per-statement lock waits, so lock_wait_ms is stored as NULL.
+        Args:
+            cursor: PostgreSQL database cursor.
+            version (str): Version of the migration the statements belong to.
+            profiles (List[dict]): Profiles as produced by execute_migration.
+        """
+        cursor.executemany(self.TEMPLATES["record_statement_profile"],
+                           [(version,
+                             p['statement_index'],
+                             p['statement'],
+                             p['duration_ms'],
+                             p['row_count'],
+                             p['lock_wait_ms'],) for p in profiles])
+
+    def initialize_checkpoint_table(self, cursor):
+        """
+        Create the schema_migration_checkpoints table if it does not exist.
+        Args:
+            cursor: PostgreSQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_checkpoint_table"])
+
+    def get_checkpoint(self, cursor, version: str):
+        """
+        Return the next key a backfill should resume from, or None if it has no checkpoint.
+        Args:
+            cursor: PostgreSQL database cursor.
+            version (str): Version of the backfill migration.
+        """
+        cursor.execute(self.TEMPLATES["get_checkpoint"], (version,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, cursor, version: str, last_key: int) -> None:
+        """
+        Insert or advance the checkpoint of a backfill.
+        Args:
+            cursor: PostgreSQL database cursor.
+            version (str): Version of the backfill migration.
+            last_key (int): Exclusive upper key of the last committed chunk.
+        """
+        cursor.execute(self.TEMPLATES["save_checkpoint"], (version, last_key,))
+
+    def set_transaction_timeouts(self, cursor, lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+        """
+        Set lock_timeout and statement_timeout for the current transaction only.
+        Args:
+            cursor: PostgreSQL database cursor.
+            lock_timeout_ms (int): Maximum milliseconds to wait for a lock.
+            statement_timeout_ms (int): Maximum milliseconds a statement may run.
+        """
+        cursor.execute(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+        cursor.execute(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+
+    def delete_migrations(self, cursor, versions: List[str]) -> None:
+        """
+        Delete registry rows of rolled back migrations.
+        Args:
+            cursor: PostgreSQL database cursor.
+            versions (List[str]): Versions to remove from schema_migrations.
+        """
+        cursor.executemany(self.TEMPLATES["delete_migration"], [(version,) for version in versions])
+
+    def try_advisory_lock(self, cursor, name: str) -> bool:
+        """
+        Take a session-level advisory lock keyed by a CRC32 of the lock name, without waiting.
+        The lock survives commits and rollbacks and is released automatically if the connection drops.
+        Args:
+            cursor: PostgreSQL database cursor.
+            name (str): Lock name identifying the registry.
+        Returns:
+            bool: True if the lock was taken by this connection.
+        """
+        cursor.execute(self.TEMPLATES["try_advisory_lock"], (_advisory_key(name),))
+        return bool(cursor.fetchone()[0])
+
+    def release_advisory_lock(self, cursor, name: str) -> None:
+        """
+        Release the session-level advisory lock.
+        Args:
+            cursor: PostgreSQL database cursor.
+            name (str): Lock name identifying the registry.
+        """
+        cursor.execute(self.TEMPLATES["release_advisory_lock"], (_advisory_key(name),))
+        cursor.fetchone()
+
+    def bulk_insert(self, cursor, table: str, columns, rows: List[tuple]) -> None:
+        """
+        Load a batch of literal rows with COPY ... FROM STDIN in text format.
+        Args:
+            cursor: PostgreSQL database cursor.
+            table (str): Target table, as written in the migration.
+            columns (str): Comma-separated column list as written in the migration, or None for all columns.
+            rows (List[tuple]): Row values.
+        """
+        column_list = f" ({columns})" if columns else ""
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table}{column_list} FROM STDIN", buffer)
+
+    def dump_database(self, cursor, db_config: Dict[str, any]) -> str:
+        """
+        Dump the database with pg_dump as plain INSERT statements, leaving out the migration tool's tables, owners and privileges.
+        psql meta-commands in the output are dropped, since the script is executed through the driver.
+        Args:
+            cursor: PostgreSQL database cursor.
+            db_config (dict): Connection settings passed to pg_dump.
+        Returns:
+            str: SQL script recreating the database.
+        """
+        env = dict(os.environ)
+        env.update({PG_DUMP_ENV[k]: str(v) for k, v in db_config.items() if k in PG_DUMP_ENV})
+        command = ["pg_dump", "--no-owner", "--no-privileges", "--inserts"]
+        command += [f"--exclude-table={table}" for table in TOOL_TABLES]
+        result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+        return "\n".join(line for line in result.stdout.splitlines() if not line.startswith("\\"))
+
+    def load_dump(self, cursor, script: str) -> None:
+        """
+        Execute a pg_dump script, then reset the search_path it clears for the session.
+        Args:
+            cursor: PostgreSQL database cursor.
+            script (str): SQL script.
+        """
+        super().load_dump(cursor, script)
+        cursor.execute("RESET search_path")
+
+    def initialize_catalog_table(self, cursor):
+        """
+        Create the schema_migration_catalog table if it does not exist.
+        Args:
+            cursor: PostgreSQL database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_catalog_table"])
+
+    def get_catalog(self, cursor, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Introspect tables, indexes, constraints, views, functions and triggers from pg_catalog.
+        Args:
+            cursor: PostgreSQL database cursor.
+            names (List[str]): Only return objects with these schema-qualified names.
+        Returns:
+            List[tuple]: (object_type, object_name, definition) rows.
+        """
+        query = f"SELECT object_type, object_name, definition FROM ({self.TEMPLATES['catalog']}) AS catalog"
+        if names is not None:
+            if not names:
+                return []
+            cursor.execute(f"{query} WHERE object_name IN ({', '.join(['%s'] * len(names))})", names)
+        else:
+            cursor.execute(query)
+        return cursor.fetchall()
+
+    def get_catalog_hashes(self, cursor) -> List[tuple]:
+        """
+        Hash every catalog definition with md5() on the server, so only one short row per object is transferred.
+        Args:
+            cursor: PostgreSQL database cursor.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash) rows.
+        """
+        cursor.execute(f"SELECT object_type, object_name, md5(coalesce(definition, '')) FROM ({self.TEMPLATES['catalog']}) AS catalog")
+        return cursor.fetchall()
+
+    def save_catalog(self, cursor, version: str, rows: List[tuple]) -> None:
+        """
+        Replace the catalog snapshot stored for a version.
+        Args:
+            cursor: PostgreSQL database cursor.
+            version (str): Migration version the snapshot belongs to.
+            rows (List[tuple]): (object_type, object_name, object_hash, definition) rows.
+        """
+        cursor.execute(self.TEMPLATES["delete_catalog"], (version,))
+        cursor.executemany(self.TEMPLATES["record_catalog"], [(version, *row) for row in rows])
+
+    def get_catalog_snapshot(self, cursor, version: str, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Read the catalog snapshot stored for a version.
+        Args:
+            cursor: PostgreSQL database cursor.
+            version (str): Migration version of the snapshot.
+            names (List[str]): Only return these objects, with their definitions.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash, definition) rows.
+        """
+        if names is None:
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="NULL", names=""), (version,))
+        elif not names:
+            return []
+        else:
+            names_filter = f"AND object_name IN ({', '.join(['%s'] * len(names))})"
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="definition", names=names_filter), (version, *names))
+        return cursor.fetchall()
+
+    def explain_statement(self, cursor, statement: str) -> Dict[str, any]:
+        """
+        Run EXPLAIN (FORMAT JSON), which plans the statement without executing it.
+        Modify nodes report zero rows without RETURNING, so the rows of the scan beneath them are used.
+        Args:
+            cursor: PostgreSQL database cursor.
+            statement (str): DML statement.
+        Returns:
+            dict: {"rows": estimated rows touched, "cost": total planner cost}.
+        """
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}")
+        result = cursor.fetchone()[0]
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+        rows = max([plan["Plan Rows"]] + [child["Plan Rows"] for child in plan.get("Plans", [])])
+        return {"rows": int(rows), "cost": plan["Total Cost"]}
+
+    def estimate_table_rows(self, cursor, table: str) -> Optional[int]:
+        """
+        Read the planner's row estimate from pg_class.reltuples.
+        Args:
+            cursor: PostgreSQL database cursor.
+            table (str): Table name, optionally schema-qualified.
+        Returns:
+            int: Estimated rows, or None if the table does not exist or has never been analyzed.
+        """
+        cursor.execute(self.TEMPLATES["estimate_table_rows"], (table,))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+# db_config keys passed to pg_dump through libpq environment variables.
+PG_DUMP_ENV = {'host': 'PGHOST', 'port': 'PGPORT', 'user': 'PGUSER', 'password': 'PGPASSWORD', 'dbname': 'PGDATABASE'}
+
+
+def _advisory_key(name: str) -> int:
+    """
+    Map a lock name to the integer key used by pg_advisory_lock.
+    """
+    return zlib.crc32(name.encode())
+
+
+def _copy_value(value) -> str:
+    """
+    Encode a Python value for COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    if value is True or value is False:
+        return "t" if value else "f"
+    return (str(value).replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
@@ -0,0 +1,543 @@
+"""
+sqlite.py
+---------
+Implements the Adapter interface for SQLite, providing methods to initialize the migration registry, record migrations, and retrieve applied migrations on an embedded database file or in memory.
+"""
+
+import hashlib
+import re
+from .base import Adapter, TOOL_TABLES, TOOL_TABLE_LIST
+from typing import List,Dict,Optional
+from core.sql_splitter import split_statements
+
+# Scanned (version, checksum) pairs sent per pending-diff query, keeping well under SQLite's bound parameter limit.
+PENDING_DIFF_PAIRS = 400
+
+# Table access lines of EXPLAIN QUERY PLAN, e.g. "SCAN events" or "SEARCH events USING INDEX events_kind_idx (kind=?)".
+PLAN_ACCESS = re.compile(r'^(SCAN|SEARCH) (?:TABLE )?"?([\w.]+)')
+# Searches constrained only by equality, e.g. "(rowid=?)" or "(a=? AND b=?)".
+EQUALITY_SEARCH = re.compile(r'\((?:\w+=\? AND )*\w+=\?\)$')
+# DELETE statements without a WHERE clause, which SQLite runs as a truncate with an empty query plan.
+WHOLE_TABLE_DELETE = re.compile(r'^\s*DELETE\s+FROM\s+"?([\w.]+)"?\s*;?\s*$', re.IGNORECASE)
+
+class sqLite(Adapter):
+    """
+    SQLite adapter for migration registry operations.
+    """
+    DIALECT = 'sqlite'
+    PLACEHOLDER = '?'
+    NAMED_PLACEHOLDER = ':{}'
+
+    def __init__(self):
+        """
+        Initialize the sqLite adapter with SQL templates for migration operations.
+        """
+        self.TEMPLATES = {
+            'initialize_table': """
+                        CREATE TABLE IF NOT EXISTS
+                        schema_migrations (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            version VARCHAR(50) NOT NULL,
+                            description VARCHAR(200),
+                            filename VARCHAR(255) NOT NULL,
+                            checksum VARCHAR(64) NOT NULL,
+                            executed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                            execution_time INTEGER,
+                            status VARCHAR(20) NOT NULL,
+                            applied_by VARCHAR(100),
+                            UNIQUE(version)
+                            )
+                        """,
+
+            'record_migration': """
+                                INSERT INTO schema_migrations
+                                (version,description, filename,checksum,execution_time,status,applied_by)
+                                VALUES(?, ?, ?, ?, ?, ?, ?)
+                                """,
+
+            'get_applied_migrations': """SELECT version,checksum
+                               FROM schema_migrations
+                               ORDER BY version
+                               """,
+
+            'table_exists': """SELECT COUNT(*)
+                               FROM sqlite_master
+                               WHERE type = 'table' AND name = ?
+                               """,
+
+            'initialize_profile_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_statements (
+                                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                    version VARCHAR(50) NOT NULL,
+                                    statement_index INTEGER NOT NULL,
+                                    statement TEXT NOT NULL,
+                                    duration_ms INTEGER NOT NULL,
+                                    row_count INTEGER,
+                                    lock_wait_ms INTEGER,
+                                    executed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                    )
+                                """,
+
+            'create_profile_index': """
+                                CREATE INDEX IF NOT EXISTS schema_migration_statements_version_idx
+                                ON schema_migration_statements (version)
+                                """,
+
+            'record_statement_profile': """
+                                INSERT INTO schema_migration_statements
+                                (version, statement_index, statement, duration_ms, row_count, lock_wait_ms)
+                                VALUES(?, ?, ?, ?, ?, ?)
+                                """,
+
+            'initialize_checkpoint_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_checkpoints (
+                                    version VARCHAR(50) PRIMARY KEY,
+                                    last_key INTEGER NOT NULL,
+                                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                    )
+                                """,
+
+            'get_checkpoint': """SELECT last_key
+                               FROM schema_migration_checkpoints
+                               WHERE version = ?
+                               """,
+
+            'delete_checkpoint': """DELETE FROM schema_migration_checkpoints
+                               WHERE version = ?
+                               """,
+
+            'save_checkpoint': """
+                                INSERT INTO schema_migration_checkpoints
+                                (version, last_key)
+                                VALUES(?, ?)
+                                ON CONFLICT (version) DO UPDATE
+                                SET last_key = excluded.last_key, updated_at = CURRENT_TIMESTAMP
+                                """,
+
+            'create_registry_index': """
+                                CREATE INDEX IF NOT EXISTS schema_migrations_version_checksum_idx
+                                ON schema_migrations (version, checksum)
+                                """,
+
+            'get_pending_migrations': """
+                                WITH s(version, checksum) AS (VALUES {values})
+                                SELECT s.version, s.checksum, m.checksum
+                                FROM s
+                                LEFT JOIN schema_migrations m ON m.version = s.version
+                                WHERE m.version IS NULL OR m.checksum <> s.checksum
+                                """,
+
+            'initialize_lock_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_locks (
+                                    name VARCHAR(100) PRIMARY KEY,
+                                    acquired_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                    )
+                                """,
+
+            'delete_migration': """DELETE FROM schema_migrations
+                               WHERE version = ?
+                               """,
+
+            'try_advisory_lock': """INSERT OR IGNORE INTO schema_migration_locks (name) VALUES (?)""",
+
+            'release_advisory_lock': """DELETE FROM schema_migration_locks WHERE name = ?""",
+
+            'initialize_catalog_table': """
+                                CREATE TABLE IF NOT EXISTS
+                                schema_migration_catalog (
+                                    version VARCHAR(50) NOT NULL,
+                                    object_type VARCHAR(20) NOT NULL,
+                                    object_name VARCHAR(512) NOT NULL,
+                                    object_hash VARCHAR(64) NOT NULL,
+                                    definition TEXT,
+                                    captured_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                                    PRIMARY KEY (version, object_type, object_name)
+                                    )
+                                """,
+
+            # SQLite keeps each object's CREATE statement, rewritten by ALTER TABLE, so it is the normalized definition.
+            'catalog': f"""
+                                SELECT type AS object_type, name AS object_name, sql AS definition
+                                FROM sqlite_master
+                                WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' AND tbl_name NOT IN ({TOOL_TABLE_LIST})
+                                """,
+
+            'delete_catalog': """DELETE FROM schema_migration_catalog
+                               WHERE version = ?
+                               """,
+
+            'record_catalog': """
+                                INSERT INTO schema_migration_catalog
+                                (version, object_type, object_name, object_hash, definition)
+                                VALUES(?, ?, ?, ?, ?)
+                                """,
+
+            'get_catalog_snapshot': """SELECT object_type, object_name, object_hash, {definition}
+                               FROM schema_migration_catalog
+                               WHERE version = ? {names}
+                               """,
+        }
+        self._saved_busy_timeouts: Dict[int, int] = {}
+
+
+    def initialize_registry(self, cursor):
+        """
+        Create the schema_migrations table in the SQLite database if it does not exist.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES['initialize_table'])
+
+
+    def record_migration(self, cursor, migration: Dict[str, any], execution_time: str, status: str, applied_by='system') -> None:
+        """
+        Record a migration as applied in the schema_migrations table.
+        Args:
+            cursor: SQLite database cursor.
+            migration (dict): Migration metadata.
+            execution_time (int): Milliseconds taken to apply the migration.
+            status (str): Status of the migration.
+            applied_by (str): User or system applying the migration.
+        """
+        cursor.execute(self.TEMPLATES["record_migration"],
+                       (migration['version'],
+                        migration['description'],
+                        migration['filename'],
+                        migration['checksum'],
+                        execution_time,
+                        status,
+                        applied_by,))
+
+    def get_applied_migrations(self, cursor):
+        """
+        Retrieve applied migrations from the schema_migrations table.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES["get_applied_migrations"])
+
+    def table_exists(self, cursor, table: str) -> bool:
+        """
+        Check sqlite_master for a table.
+        Args:
+            cursor: SQLite database cursor.
+            table (str): Unquoted table name.
+        Returns:
+            bool: True if the table exists.
+        """
+        cursor.execute(self.TEMPLATES["table_exists"], (table,))
+        return cursor.fetchone()[0] > 0
+
+    def create_registry_index(self, cursor):
+        """
+        Create the (version, checksum) index on schema_migrations if it does not exist.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES["create_registry_index"])
+
+    def get_pending_migrations(self, cursor, migrations: List[tuple]):
+        """
+        Ship the scanned (version, checksum) pairs as a VALUES common table expression and select only the rows that are unapplied or whose checksum differs.
+        Pairs are sent in groups of PENDING_DIFF_PAIRS to stay under the bound parameter limit of older SQLite builds.
+        Args:
+            cursor: SQLite database cursor.
+            migrations (List[tuple]): Scanned (version, checksum) pairs.
+        Returns:
+            List[tuple]: (version, scanned checksum, recorded checksum or None) rows.
+        """
+        rows = []
+        for i in range(0, len(migrations), PENDING_DIFF_PAIRS):
+            group = migrations[i:i + PENDING_DIFF_PAIRS]
+            values = ", ".join(["(?, ?)"] * len(group))
+            params = [value for pair in group for value in pair]
+            cursor.execute(self.TEMPLATES["get_pending_migrations"].format(values=values), params)
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def initialize_profile_table(self, cursor):
+        """
+        Create the schema_migration_statements table and its version index if they do not exist.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_profile_table"])
+        cursor.execute(self.TEMPLATES["create_profile_index"])
+
+    def record_statement_profiles(self, cursor, version: str, profiles: List[Dict[str, any]]) -> None:
+        """
+        Record per-statement profiles of an applied migration.
+        SQLite locks the whole database rather than rows, so lock_wait_ms is stored as NULL.
+        Args:
+            cursor: SQLite database cursor.
+            version (str): Version of the migration the statements belong to.
+            profiles (List[dict]): Profiles as produced by execute_migration.
+        """
+        cursor.executemany(self.TEMPLATES["record_statement_profile"],
+                           [(version,
+                             p['statement_index'],
+                             p['statement'],
+                             p['duration_ms'],
+                             p['row_count'],
+                             p['lock_wait_ms'],) for p in profiles])
+
+    def initialize_checkpoint_table(self, cursor):
+        """
+        Create the schema_migration_checkpoints table if it does not exist.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_checkpoint_table"])
+
+    def get_checkpoint(self, cursor, version: str):
+        """
+        Return the next key a backfill should resume from, or None if it has no checkpoint.
+        Args:
+            cursor: SQLite database cursor.
+            version (str): Version of the backfill migration.
+        """
+        cursor.execute(self.TEMPLATES["get_checkpoint"], (version,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, cursor, version: str, last_key: int) -> None:
+        """
+        Insert or advance the checkpoint of a backfill.
+        Args:
+            cursor: SQLite database cursor.
+            version (str): Version of the backfill migration.
+            last_key (int): Exclusive upper key of the last committed chunk.
+        """
+        cursor.execute(self.TEMPLATES["save_checkpoint"], (version, last_key,))
+
+    def set_transaction_timeouts(self, cursor, lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+        """
+        Set the busy timeout used when another connection holds the database lock.
+        SQLite has no server-side statement timeout, so statement_timeout_ms is not enforced.
+        The connection's previous busy timeout is kept, once per reset, for reset_transaction_timeouts to restore.
+        Args:
+            cursor: SQLite database cursor.
+            lock_timeout_ms (int): Maximum milliseconds to wait for a lock.
+            statement_timeout_ms (int): Maximum milliseconds a statement may run.
+        """
+        connection = id(cursor.connection)
+        if connection not in self._saved_busy_timeouts:
+            cursor.execute("PRAGMA busy_timeout")
+            self._saved_busy_timeouts[connection] = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA busy_timeout = {int(lock_timeout_ms)}")
+
+    def reset_transaction_timeouts(self, cursor) -> None:
+        """
+        Restore the busy timeout saved by set_transaction_timeouts, since it belongs to the connection and would otherwise carry over to the next borrower of a pooled connection.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        saved = self._saved_busy_timeouts.pop(id(cursor.connection), None)
+        if saved is not None:
+            cursor.execute(f"PRAGMA busy_timeout = {int(saved)}")
+
+    def delete_migrations(self, cursor, versions: List[str]) -> None:
+        """
+        Delete registry rows of rolled back migrations.
+        Args:
+            cursor: SQLite database cursor.
+            versions (List[str]): Versions to remove from schema_migrations.
+        """
+        cursor.executemany(self.TEMPLATES["delete_migration"], [(version,) for version in versions])
+
+    def begin(self, cursor) -> None:
+        """
+        Open a transaction explicitly when none is active, since sqlite3 on Python < 3.12 only opens one implicitly before DML.
+        A SAVEPOINT outside a transaction would otherwise commit when released.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN")
+
+    def execute_script(self, cursor, sql: str) -> None:
+        """
+        Execute a migration script statement by statement inside the caller's transaction.
+        sqlite3's executescript() commits any open transaction first, so the script is split instead, and a transaction is opened explicitly so DDL is rolled back with the rest of the migration.
+        Args:
+            cursor: SQLite database cursor.
+            sql (str): SQL script.
+        """
+        self.begin(cursor)
+        for statement in split_statements(sql, self.DIALECT):
+            cursor.execute(statement)
+
+    def try_advisory_lock(self, cursor, name: str) -> bool:
+        """
+        Take the migration lock by inserting a row into schema_migration_locks, without waiting.
+        SQLite has no advisory locks, so the lock is a committed row: the caller must commit after taking and releasing it, and a process that dies while holding it leaves the row behind until it is deleted.
+        Args:
+            cursor: SQLite database cursor.
+            name (str): Lock name identifying the registry.
+        Returns:
+            bool: True if the lock was taken by this connection.
+        """
+        cursor.execute(self.TEMPLATES["initialize_lock_table"])
+        cursor.execute(self.TEMPLATES["try_advisory_lock"], (name,))
+        return cursor.rowcount == 1
+
+    def release_advisory_lock(self, cursor, name: str) -> None:
+        """
+        Release the migration lock by deleting its row.
+        Args:
+            cursor: SQLite database cursor.
+            name (str): Lock name identifying the registry.
+        """
+        cursor.execute(self.TEMPLATES["release_advisory_lock"], (name,))
+
+    def dump_database(self, cursor, db_config: Dict[str, any]) -> str:
+        """
+        Dump tables, their rows, then indexes, views and triggers from sqlite_master, leaving out the migration tool's tables.
+        Rows are written before indexes and triggers so loading neither fires triggers nor maintains indexes row by row.
+        Args:
+            cursor: SQLite database cursor.
+            db_config (dict): Connection settings (unused).
+        Returns:
+            str: SQL script recreating the database.
+        """
+        cursor.execute("""SELECT type, name, tbl_name, sql FROM sqlite_master
+                          WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+                          ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 WHEN 'view' THEN 2 ELSE 3 END, rowid""")
+        objects = [row for row in cursor.fetchall() if row[2] not in TOOL_TABLES]
+
+        statements = []
+        for object_type, name, _, sql in objects:
+            if object_type != 'table':
+                continue
+            statements.append(sql)
+            quoted = '"' + name.replace('"', '""') + '"'
+            cursor.execute(f"SELECT * FROM {quoted}")
+            for row in cursor.fetchall():
+                statements.append(f"INSERT INTO {quoted} VALUES({', '.join(_sql_literal(value) for value in row)})")
+        statements.extend(sql for object_type, _, _, sql in objects if object_type != 'table')
+        return "".join(f"{statement};\n" for statement in statements)
+
+    def initialize_catalog_table(self, cursor):
+        """
+        Create the schema_migration_catalog table if it does not exist.
+        Args:
+            cursor: SQLite database cursor.
+        """
+        cursor.execute(self.TEMPLATES["initialize_catalog_table"])
+
+    def get_catalog(self, cursor, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Read tables, indexes, views and triggers from sqlite_master.
+        Args:
+            cursor: SQLite database cursor.
+            names (List[str]): Only return objects with these names.
+        Returns:
+            List[tuple]: (object_type, object_name, definition) rows.
+        """
+        if names is None:
+            cursor.execute(self.TEMPLATES["catalog"])
+        elif not names:
+            return []
+        else:
+            cursor.execute(f"{self.TEMPLATES['catalog']} AND name IN ({', '.join(['?'] * len(names))})", names)
+        return cursor.fetchall()
+
+    def get_catalog_hashes(self, cursor) -> List[tuple]:
+        """
+        Hash catalog definitions locally; SQLite has no md5() and the catalog is read in-process anyway.
+        Args:
+            cursor: SQLite database cursor.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash) rows.
+        """
+        return [(object_type, name, hashlib.md5(definition.encode()).hexdigest()) for object_type, name, definition in self.get_catalog(cursor)]
+
+    def save_catalog(self, cursor, version: str, rows: List[tuple]) -> None:
+        """
+        Replace the catalog snapshot stored for a version.
+        Args:
+            cursor: SQLite database cursor.
+            version (str): Migration version the snapshot belongs to.
+            rows (List[tuple]): (object_type, object_name, object_hash, definition) rows.
+        """
+        cursor.execute(self.TEMPLATES["delete_catalog"], (version,))
+        cursor.executemany(self.TEMPLATES["record_catalog"], [(version, *row) for row in rows])
+
+    def get_catalog_snapshot(self, cursor, version: str, names: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Read the catalog snapshot stored for a version.
+        Args:
+            cursor: SQLite database cursor.
+            version (str): Migration version of the snapshot.
+            names (List[str]): Only return these objects, with their definitions.
+        Returns:
+            List[tuple]: (object_type, object_name, object_hash, definition) rows.
+        """
+        if names is None:
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="NULL", names=""), (version,))
+        elif not names:
+            return []
+        else:
+            names_filter = f"AND object_name IN ({', '.join(['?'] * len(names))})"
+            cursor.execute(self.TEMPLATES["get_catalog_snapshot"].format(definition="definition", names=names_filter), (version, *names))
+        return cursor.fetchall()
+
+    def explain_statement(self, cursor, statement: str) -> Dict[str, any]:
+        """
+        Run EXPLAIN QUERY PLAN, which plans the statement without executing it. The plan has no row estimates, so a table
+        that is scanned, or searched by a range, counts with all its rows, and a search on equality alone counts as one row.
+        A DELETE without WHERE clears the table without a planned scan and counts with all its rows; INSERT ... VALUES has no estimate.
+        Args:
+            cursor: SQLite database cursor.
+            statement (str): DML statement.
+        Returns:
+            dict: {"rows": estimated rows touched or None, "cost": None}.
+        """
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}")
+        estimates = []
+        for detail in [row[3] for row in cursor.fetchall()]:
+            access = PLAN_ACCESS.match(detail)
+            if access is None:
+                continue
+            if access.group(1) == "SEARCH" and EQUALITY_SEARCH.search(detail):
+                estimates.append(1)
+            else:
+                estimates.append(self.estimate_table_rows(cursor, access.group(2).lower()))
+        whole_table = WHOLE_TABLE_DELETE.match(statement)
+        if not estimates and whole_table:
+            estimates.append(self.estimate_table_rows(cursor, whole_table.group(1).lower()))
+        estimates = [rows for rows in estimates if rows is not None]
+        return {"rows": max(estimates) if estimates else None, "cost": None}
+
+    def estimate_table_rows(self, cursor, table: str) -> Optional[int]:
+        """
+        Count the table's rows; SQLite keeps no row statistics unless ANALYZE was run.
+        Args:
+            cursor: SQLite database cursor.
+            table (str): Table name.
+        Returns:
+            int: Row count, or None if the table does not exist.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND lower(name) = ?", (table,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        quoted = '"' + row[0].replace('"', '""') + '"'
+        cursor.execute(f"SELECT COUNT(*) FROM {quoted}")
+        return cursor.fetchone()[0]
+
+
+def _sql_literal(value) -> str:
+    """
+    Render a SQLite value as a SQL literal.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    return "'" + str(value).replace("'", "''") + "'"
@@ -0,0 +1,211 @@
+"""
+bench_migrations.py
+-------------------
+Benchmarks the migration subsystem on synthetic histories: scanning, version ordering, the registry diff and end-to-end apply against an in-memory SQLite backend.
+Results are written as JSON for regression tracking.
+
+Usage (from database-migration/):
+    python -m benchmarks.bench_migrations --sizes 100 10000 100000 --output bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from core.migration_registry import MigrationRegistry
+from core.migration_runner import MigrationRunner
+from core.migration_scanner import MigrationScanner, default_manifest_path
+from core.version_manager import VersionManager, parse_filename, _parse_version
+
+DEFAULT_SIZES = [100, 10000, 100000]
+
+
+def generate_history(directory: str, count: int, seed_every: int = 200, seed_rows: int = 500) -> int:
+    """
+    Write a synthetic migration directory.
+    Most files are one-statement DDL; every seed_every-th file creates a table and loads seed_rows rows with one INSERT ... VALUES.
+
+    Args:
+        directory (str): Empty directory to fill.
+        count (int): Number of migration files.
+        seed_every (int): Interval between seed files. 0 disables seed files.
+        seed_rows (int): Rows per seed file.
+    Returns:
+        int: Total bytes written.
+    """
+    total = 0
+    for i in range(1, count + 1):
+        if seed_every and i % seed_every == 0:
+            rows = ",\n".join(f"({n}, 'seed row {n} of migration {i} {'x' * 32}')" for n in range(seed_rows))
+            sql = f"CREATE TABLE seed_{i} (id INTEGER PRIMARY KEY, payload TEXT);\nINSERT INTO seed_{i} (id, payload) VALUES\n{rows};\n"
+            name = f"V1.{i}__seed_{i}.sql"
+        else:
+            sql = f"CREATE TABLE t_{i} (id INTEGER PRIMARY KEY, name VARCHAR(50));\n"
+            name = f"V1.{i}__table_{i}.sql"
+        with open(os.path.join(directory, name), 'w') as file:
+            total += file.write(sql)
+    return total
+
+
+def fake_registry(migrations: List[Dict[str, any]], applied_count: int) -> MigrationRegistry:
+    """
+    Create an in-memory SQLite registry that records the first applied_count migrations as applied, without running them.
+    """
+    registry = MigrationRegistry({'type': 'sqlite', 'database': ':memory:'})
+    registry.initialize(index_checksums=True)
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(registry._get_adapter().TEMPLATES["record_migration"],
+                           [(m["version"], m["description"], m["filename"], m["checksum"], 0, "Applied", "bench")
+                            for m in migrations[:applied_count]])
+        conn.commit()
+        cursor.close()
+    return registry
+
+
+def measure(name: str, size: int, items: int, run: Callable[[], None], setup: Optional[Callable[[], None]] = None) -> Dict[str, any]:
+    """
+    Time one call of run, then repeat it under tracemalloc for its peak Python allocation.
+
+    Args:
+        name (str): Benchmark name.
+        size (int): Number of files in the history.
+        items (int): Units of work done by one call, for throughput.
+        run (Callable): Code under measurement.
+        setup (Callable): Called before each of the two runs, outside the measurement.
+    Returns:
+        dict: {"benchmark", "size", "items", "seconds", "items_per_second", "peak_bytes"}.
+    """
+    if setup:
+        setup()
+    began = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - began
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "benchmark": name,
+        "size": size,
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_second": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_bytes": peak,
+    }
+    print(f"{name:<32} {size:>8} files  {seconds * 1000:>10.1f} ms  {result['items_per_second'] or 0:>12.0f}/s  {peak / 1048576:>8.1f} MiB", file=sys.stderr)
+    return result
+
+
+def run_size(size: int, applied_fraction: float = 0.9, seed_every: int = 200, seed_rows: int = 500) -> List[Dict[str, any]]:
+    """
+    Run every benchmark on one synthetic history.
+
+    Args:
+        size (int): Number of migration files.
+        applied_fraction (float): Share of the history recorded as already applied in the fake registry.
+        seed_every (int): Interval between seed files.
+        seed_rows (int): Rows per seed file.
+    Returns:
+        List[dict]: One result per benchmark.
+    """
+    directory = tempfile.mkdtemp(prefix=f"bench_migrations_{size}_")
+    manifest = default_manifest_path(directory)
+    try:
+        began = time.perf_counter()
+        total_bytes = generate_history(directory, size, seed_every, seed_rows)
+        print(f"generated {size} files ({total_bytes / 1048576:.1f} MiB) in {time.perf_counter() - began:.1f}s", file=sys.stderr)
+        results = []
+
+        def drop_manifest():
+            if os.path.exists(manifest):
+                os.remove(manifest)
+
+        def clear_parse_caches():
+            parse_filename.cache_clear()
+            _parse_version.cache_clear()
+
+        def scan():
+            return MigrationScanner(directory).discover_migrations()
+
+        results.append(measure("scan_cold", size, size, scan, setup=lambda: (drop_manifest(), clear_parse_caches())))
+        results.append(measure("scan_warm", size, size, scan))
+
+        paths = list(Path(directory).glob('V*__*.sql'))
+        results.append(measure("order_migrations", size, size, lambda: VersionManager().order_migrations(paths), setup=clear_parse_caches))
+
+        migrations = scan()
+        applied_count = int(size * applied_fraction)
+        registry = fake_registry(migrations, applied_count)
+        results.append(measure("get_migrations_to_apply", size, size,
+                               lambda: MigrationRunner(directory, registry).get_migrations_to_apply()))
+        results.append(measure("get_migrations_to_apply_server", size, size,
+                               lambda: MigrationRunner(directory, registry, server_diff=True).get_migrations_to_apply()))
+
+        pending = size - applied_count
+        state = {}
+
+        def fresh_registry():
+            state["registry"] = fake_registry(migrations, applied_count)
+
+        results.append(measure("apply_pending", size, pending,
+                               lambda: MigrationRunner(directory, state["registry"]).run_migrations(), setup=fresh_registry))
+        results.append(measure("apply_pending_batch", size, pending,
+                               lambda: MigrationRunner(directory, state["registry"]).run_migrations(batch=True), setup=fresh_registry))
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        if os.path.exists(manifest):
+            os.remove(manifest)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmark suite and write the JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the migration subsystem on synthetic histories.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="History sizes to benchmark.")
+    parser.add_argument("--applied-fraction", type=float, default=0.9, help="Share of each history already applied.")
+    parser.add_argument("--seed-every", type=int, default=200, help="Every Nth migration is a large seed file (0 for none).")
+    parser.add_argument("--seed-rows", type=int, default=500, help="Rows per seed file.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": [],
+    }
+    # The runner reports progress on stdout; keep it out of the report and the timings.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for size in args.sizes:
+            report["results"].extend(run_size(size, args.applied_fraction, args.seed_every, args.seed_rows))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
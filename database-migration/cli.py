@@ -0,0 +1,283 @@
+"""
+cli.py
+------
+Command-line interface for the migration tool, with status, baseline, migrate, rollback, verify, snapshot and plan commands.
+Modules are imported per command and database drivers only load once the configured backend connects, so the tool starts quickly when run as an init container.
+With --metrics, run timings and counters are written as Prometheus text (or JSON for a .json path) when the command ends, whether it succeeded or not.
+
+Usage:
+    python cli.py [--config migrations.toml] [--metrics migrations.prom] status|baseline|migrate|rollback|verify|snapshot|plan [options]
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for all commands.
+    """
+    parser = argparse.ArgumentParser(prog="migrate", description="Apply, inspect and roll back database migrations.")
+    parser.add_argument("--config", help="Config file (.toml or .json). Defaults to $MIGRATION_CONFIG or ./migrations.toml.")
+    parser.add_argument("--metrics", help="Write run metrics to this file: JSON for .json paths, Prometheus text otherwise.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="Show every migration and whether it is applied, pending or changed.")
+
+    baseline = commands.add_parser("baseline", help="Snapshot the database and registry into a baseline file.")
+    baseline.add_argument("output", help="Baseline file to write.")
+
+    migrate = commands.add_parser("migrate", help="Apply pending migrations.")
+    migrate.add_argument("--batch", action="store_true", help="Apply migrations and registry rows in shared transactions.")
+    migrate.add_argument("--batch-size", type=int, help="Migrations per commit group in batch mode.")
+    migrate.add_argument("--workers", type=int, help="Apply independent migrations concurrently on this many connections.")
+    migrate.add_argument("--profile", action="store_true", help="Record per-statement profiles.")
+    migrate.add_argument("--server-diff", action="store_true", help="Diff against the registry in the database.")
+    migrate.add_argument("--no-lock", action="store_true", help="Do not take the registry's advisory lock.")
+    migrate.add_argument("--baseline", help="Baseline file to load first when the database has no applied migrations.")
+
+    rollback = commands.add_parser("rollback", help="Roll back applied migrations above a target version.")
+    rollback.add_argument("target", help="Version to roll back to, e.g. V1.1.")
+    rollback.add_argument("--no-atomic", action="store_true", help="Keep the steps completed before a failing one.")
+
+    verify = commands.add_parser("verify", help="Check applied migrations against their files; exits 1 on drift.")
+    verify.add_argument("--schema", action="store_true", help="Also compare the live schema with the catalog snapshot of the newest applied version.")
+
+    commands.add_parser("snapshot", help="Record a catalog snapshot of the live schema at the newest applied version.")
+    plan = commands.add_parser("plan", help="List the migrations migrate would apply, in order.")
+    plan.add_argument("--explain", action="store_true", help="Dry-run each migration in a rolled-back transaction and report locks, estimated rows and lock risk.")
+    plan.add_argument("--json", action="store_true", help="Print the --explain report as JSON.")
+    plan.add_argument("--large-table-rows", type=int, help="Row count from which a table counts as large (default 100000).")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the CLI.
+
+    Args:
+        argv (List[str]): Arguments without the program name. Defaults to sys.argv[1:].
+    Returns:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(argv)
+    from config import load_config
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from core.migration_registry import MigrationRegistry
+    registry = MigrationRegistry(config["database"])
+    metrics_path = args.metrics or config["metrics"]
+    collector = None
+    if metrics_path:
+        from core.events import MetricsCollector
+        collector = MetricsCollector().attach(registry.events)
+    try:
+        return COMMANDS[args.command](args, config, registry)
+    except Exception as e:
+        print(f"Error {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        if collector is not None:
+            try:
+                collector.write(metrics_path)
+            except OSError as e:
+                print(f"Error {e} when writing metrics", file=sys.stderr)
+
+
+def diff_migrations(config: Dict[str, any], registry) -> List[Dict[str, any]]:
+    """
+    Compare migration files with the registry, without creating it: a database with no registry has every migration pending.
+
+    Args:
+        config (dict): Loaded config.
+        registry (MigrationRegistry): Registry of the target database.
+    Returns:
+        List[dict]: {"version", "state", "filename", "migration"} in version order, where state is "applied", "pending", "changed" or "missing" (applied, but its file is gone),
+            and migration is the scanned migration (None when missing).
+    """
+    from core.migration_runner import MigrationRunner
+    from core.migration_scanner import MigrationScanner, checksum_matches
+    from core.version_manager import Version
+
+    if registry.exists():
+        applied = {Version.parse(version): checksum
+                   for version, checksum in MigrationRunner(config["migration_dir"], registry).get_applied_migrations().items()}
+    else:
+        print("No registry in the target database; every migration is pending", file=sys.stderr)
+        applied = {}
+    rows = []
+    for migration in MigrationScanner(config["migration_dir"], algorithm=config["checksum_algorithm"]).discover_migrations():
+        recorded = applied.pop(migration["version_key"], None)
+        if recorded is None:
+            state = "pending"
+        elif checksum_matches(migration, recorded):
+            state = "applied"
+        else:
+            state = "changed"
+        rows.append({"version": migration["version_key"], "state": state, "filename": migration["filename"], "migration": migration})
+    rows.extend({"version": version, "state": "missing", "filename": "", "migration": None} for version in applied)
+    rows.sort(key=lambda row: row["version"])
+    return rows
+
+
+def status(args, config: Dict[str, any], registry) -> int:
+    """
+    Print every migration with its state.
+    """
+    rows = diff_migrations(config, registry)
+    for row in rows:
+        print(f"{str(row['version']):<24} {row['state']:<8} {row['filename']}")
+    counts = {state: sum(1 for row in rows if row["state"] == state) for state in ("applied", "pending", "changed", "missing")}
+    print(", ".join(f"{count} {state}" for state, count in counts.items()))
+    return EXIT_OK
+
+
+def verify(args, config: Dict[str, any], registry) -> int:
+    """
+    Report applied migrations whose files changed or disappeared, and with --schema, schema objects that drifted from the catalog snapshot.
+    """
+    drift = [row for row in diff_migrations(config, registry) if row["state"] in ("changed", "missing")]
+    for row in drift:
+        print(f"{str(row['version']):<24} {row['state']:<8} {row['filename']}")
+    if drift:
+        print(f"{len(drift)} applied migrations do not match their files")
+    else:
+        print("All applied migrations match their files")
+
+    schema_drift = []
+    if args.schema:
+        from core.catalog import check_catalog
+
+        schema_drift = check_catalog(registry)
+        for row in schema_drift:
+            print(f"{row['object_type']:<10} {row['state']:<10} {row['object_name']}")
+        if schema_drift:
+            print(f"{len(schema_drift)} schema objects differ from the catalog snapshot")
+        else:
+            print("Schema matches the catalog snapshot")
+    return EXIT_FAILED if drift or schema_drift else EXIT_OK
+
+
+def snapshot(args, config: Dict[str, any], registry) -> int:
+    """
+    Record a catalog snapshot at the newest applied version.
+    """
+    from core.catalog import capture_catalog
+
+    capture_catalog(registry)
+    return EXIT_OK
+
+
+def plan(args, config: Dict[str, any], registry) -> int:
+    """
+    List the migrations migrate would apply.
+    """
+    rows = diff_migrations(config, registry)
+    changed = [row for row in rows if row["state"] == "changed"]
+    if changed:
+        print(f"Applied Migration {changed[0]['version']} has been changed", file=sys.stderr)
+        return EXIT_FAILED
+    pending = [row for row in rows if row["state"] == "pending"]
+    if args.explain and pending:
+        return explain_plan(args, registry, [row["migration"] for row in pending])
+    for row in pending:
+        print(f"{str(row['version']):<24} {row['filename']}")
+    print(f"{len(pending)} migrations to apply")
+    return EXIT_OK
+
+
+def explain_plan(args, registry, pending: List[Dict[str, any]]) -> int:
+    """
+    Print the dry-run cost and lock-risk report of the pending migrations found by diff_migrations.
+    """
+    import json
+    from core.migration_planner import LARGE_TABLE_ROWS, MigrationPlanner
+
+    report = MigrationPlanner(registry, args.large_table_rows or LARGE_TABLE_ROWS).plan(pending)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return EXIT_OK
+    for migration in report:
+        rows = migration["rows"]
+        cost = "" if migration["cost"] is None else f", cost {migration['cost']:g}"
+        print(f"{migration['version']:<24} {migration['risk']:<6} ~{rows} rows{cost}  {migration['filename']}")
+        for statement in migration["statements"]:
+            estimate = "rows unknown" if statement["rows"] is None else f"~{statement['rows']} rows"
+            blocks = f"blocks {statement['blocks']}" if statement["blocks"] else "non-blocking"
+            print(f"    {statement['risk']:<6} {statement['lock']:<28} {blocks:<15} {estimate:<14} {statement['statement'][:80]}")
+            if statement["error"]:
+                print(f"           not explained: {statement['error']}")
+    high = [migration["version"] for migration in report if migration["risk"] == "high"]
+    print(f"{len(report)} migrations to apply" + (f", schedule off-peak: {', '.join(high)}" if high else ""))
+    return EXIT_OK
+
+
+def migrate(args, config: Dict[str, any], registry) -> int:
+    """
+    Apply pending migrations.
+    """
+    from core.migration_runner import MigrationRunner
+
+    registry.initialize(index_checksums=args.server_diff)
+    runner = MigrationRunner(config["migration_dir"], registry,
+                             checksum_algorithm=config["checksum_algorithm"],
+                             server_diff=args.server_diff,
+                             profile_statements=args.profile,
+                             advisory_lock=config["advisory_lock"] and not args.no_lock,
+                             lock_timeout=config["lock_timeout"],
+                             baseline_path=args.baseline or config["baseline"],
+                             catalog_snapshot=config["catalog_snapshot"])
+    to_apply = None
+    if not runner.advisory_lock:
+        to_apply = runner.get_migrations_to_apply()
+        if not to_apply:
+            print("Up To Date")
+            return EXIT_OK
+    print(runner.run_migrations(batch=args.batch, batch_size=args.batch_size, max_workers=args.workers, to_apply=to_apply))
+    return EXIT_OK
+
+
+def baseline(args, config: Dict[str, any], registry) -> int:
+    """
+    Write a baseline snapshot of the database.
+    """
+    from core.baseline import create_baseline
+
+    create_baseline(registry, args.output, config["migration_dir"])
+    return EXIT_OK
+
+
+def rollback(args, config: Dict[str, any], registry) -> int:
+    """
+    Roll back to the target version.
+    """
+    from core.migration_rollback import MigrationRollback
+
+    rolled_back = MigrationRollback(config["down_dir"], registry, args.target, atomic=not args.no_atomic).rollback()
+    print(f"Rolled back {len(rolled_back)} migrations" + (f": {', '.join(rolled_back)}" if rolled_back else ""))
+    return EXIT_OK
+
+
+COMMANDS = {
+    "status": status,
+    "baseline": baseline,
+    "migrate": migrate,
+    "rollback": rollback,
+    "verify": verify,
+    "snapshot": snapshot,
+    "plan": plan,
+}
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+config.py
+---------
+Loads the migration tool's settings from a TOML or JSON config file and environment variables, for the CLI and other entry points.
+"""
+
+import os
+from typing import Dict, Optional
+
+DEFAULT_CONFIG_FILES = ("migrations.toml", "migrations.json")
+CONFIG_ENV = "MIGRATION_CONFIG"
+DATABASE_ENV_PREFIX = "MIGRATION_DB_"
+
+DEFAULTS = {
+    "migration_dir": "migrations_up",
+    "down_dir": "migrations_down",
+    "checksum_algorithm": "md5",
+    "advisory_lock": True,
+    "lock_timeout": 600,
+    "baseline": None,
+    "metrics": None,
+    "catalog_snapshot": True,
+}
+
+
+def load_config(path: Optional[str] = None, environ: Optional[Dict[str, str]] = None) -> Dict[str, any]:
+    """
+    Load settings from a config file, then apply environment overrides.
+    The file has a [database] table holding the db_config passed to MigrationRegistry and a [migrations] table holding the keys in DEFAULTS:
+
+        [database]
+        type = "postgresql"
+        dbname = "postgres"
+        user = "akhil"
+        port = "5432"
+
+        [migrations]
+        migration_dir = "migrations_up"
+        down_dir = "migrations_down"
+
+    Environment variables MIGRATION_DB_<KEY> override database keys (e.g. MIGRATION_DB_HOST), and DB_PASSWORD supplies the password when none is configured.
+
+    Args:
+        path (str): Config file path. Defaults to $MIGRATION_CONFIG, then the first of DEFAULT_CONFIG_FILES that exists.
+        environ (dict): Environment to read overrides from. Defaults to os.environ.
+    Returns:
+        dict: {"database": db_config, **migration settings}.
+    Raises:
+        FileNotFoundError: If an explicitly given config file does not exist.
+        ValueError: If the file format is not supported or no database type is configured.
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(CONFIG_ENV)
+    if path is None:
+        path = next((name for name in DEFAULT_CONFIG_FILES if os.path.exists(name)), None)
+
+    data = _read_config_file(path) if path else {}
+    config = dict(DEFAULTS)
+    config.update(data.get("migrations", {}))
+
+    database = dict(data.get("database", {}))
+    for key, value in environ.items():
+        if key.startswith(DATABASE_ENV_PREFIX):
+            database[key[len(DATABASE_ENV_PREFIX):].lower()] = value
+    if "password" not in database and environ.get("DB_PASSWORD") and database.get("type") != "sqlite":
+        database["password"] = environ["DB_PASSWORD"]
+    if "type" not in database:
+        raise ValueError("No database type configured; set [database] type or MIGRATION_DB_TYPE")
+    config["database"] = database
+    return config
+
+
+def _read_config_file(path: str) -> Dict[str, any]:
+    """
+    Parse a TOML or JSON config file, importing the parser only when needed.
+    """
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+    if path.endswith(".json"):
+        import json
+        with open(path, 'r') as file:
+            return json.load(file)
+    raise ValueError(f"Unsupported config file {path}; use .toml or .json")
@@ -0,0 +1,196 @@
+"""
+backfill.py
+-----------
+Runs annotated-SQL backfill migrations in primary-key-range chunks, committing per chunk under lock and statement timeouts, throttling on observed chunk latency, and keeping a resumable checkpoint in the registry.
+"""
+
+import re
+import time
+from typing import Dict, Optional
+from .migration_registry import MigrationRegistry
+
+BACKFILL_HEADER = re.compile(r'^\s*--\s*backfill\s*:(.*)$', re.IGNORECASE)
+
+DEFAULTS = {
+    "chunk_size": 1000,
+    "min_chunk_size": 100,
+    "max_chunk_size": 100000,
+    "lock_timeout": 2000,
+    "statement_timeout": 30000,
+    "target_ms": 500,
+    "sleep_ratio": 1.0,
+    "max_sleep": 5.0,
+    "retries": 5,
+}
+DURATION_KEYS = ("lock_timeout", "statement_timeout", "target_ms")
+
+
+def load_backfill(path: str) -> Optional[Dict[str, any]]:
+    """
+    Read the backfill header of a migration file, if it has one.
+    A backfill file starts with a header comment naming the table and integer key, followed by one statement using {start} and {end} for the chunk's key range:
+
+        -- backfill: table=orders key=id chunk_size=5000 lock_timeout=2s statement_timeout=30s target_ms=500
+        UPDATE orders SET total_cents = total * 100 WHERE id >= {start} AND id < {end};
+
+    Args:
+        path (str): Migration file path.
+    Returns:
+        dict: Backfill spec with "table", "key", "body" and the tuning options, or None for ordinary migrations.
+    """
+    with open(path, 'r') as file:
+        first_line = file.readline()
+        match = BACKFILL_HEADER.match(first_line)
+        if not match:
+            return None
+        body = file.read().strip().rstrip(';')
+
+    spec = dict(DEFAULTS)
+    for option in match.group(1).split():
+        name, _, value = option.partition('=')
+        spec[name] = value
+    if "table" not in spec or "key" not in spec:
+        raise ValueError(f"Backfill {path} must declare table= and key=")
+    if "{start}" not in body or "{end}" not in body:
+        raise ValueError(f"Backfill {path} must use {{start}} and {{end}} in its statement")
+    for name in DURATION_KEYS:
+        spec[name] = _parse_ms(spec[name])
+    for name in ("chunk_size", "min_chunk_size", "max_chunk_size", "retries"):
+        spec[name] = int(spec[name])
+    for name in ("sleep_ratio", "max_sleep"):
+        spec[name] = float(spec[name])
+    spec["body"] = body
+    return spec
+
+
+class BackfillExecutor:
+    """
+    Executes a backfill spec chunk by chunk over [MIN(key), MAX(key)] of its table.
+    Each chunk commits together with its checkpoint, so an interrupted backfill resumes after the last committed chunk.
+    Chunks that exceed target_ms are halved and chunks under half of it are doubled, within min/max_chunk_size, and the executor sleeps sleep_ratio times each chunk's latency (capped at max_sleep) between chunks.
+    """
+
+    def __init__(self, migration_registry: MigrationRegistry, sleep=time.sleep) -> None:
+        """
+        Initialize the BackfillExecutor.
+
+        Args:
+            migration_registry (MigrationRegistry): Registry used for connections and checkpoints.
+            sleep (Callable): Function used to pause between chunks.
+        """
+        self.migration_registry = migration_registry
+        self.sleep = sleep
+
+    def run(self, migration: Dict[str, any], spec: Dict[str, any]) -> int:
+        """
+        Run the backfill to completion, resuming from its checkpoint if one exists.
+
+        Args:
+            migration (dict): Migration metadata.
+            spec (dict): Backfill spec from load_backfill.
+        Returns:
+            int: Rows affected by this run.
+        """
+        adapter = self.migration_registry._get_adapter()
+        version = migration["version"]
+        statement = spec["body"].replace("{start}", adapter.named_placeholder("start")).replace("{end}", adapter.named_placeholder("end"))
+        chunk_size = spec["chunk_size"]
+        total_rows = 0
+
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                adapter.initialize_checkpoint_table(cursor)
+                conn.commit()
+                checkpoint = adapter.get_checkpoint(cursor, version)
+                low, high = adapter.get_key_range(cursor, spec["table"], spec["key"])
+                conn.commit()
+                if low is None:
+                    return 0
+                start = checkpoint if checkpoint is not None else low
+
+                while start <= high:
+                    end = start + chunk_size
+                    began = time.perf_counter()
+                    rows = self._run_chunk(conn, cursor, adapter, statement, version, start, end, spec)
+                    latency_ms = (time.perf_counter() - began) * 1000
+                    total_rows += rows
+                    print(f"Backfill {version}: keys [{start}, {end}) updated {rows} rows in {int(latency_ms)}ms")
+                    start = end
+
+                    if latency_ms > spec["target_ms"]:
+                        chunk_size = max(spec["min_chunk_size"], chunk_size // 2)
+                    elif latency_ms < spec["target_ms"] / 2:
+                        chunk_size = min(spec["max_chunk_size"], chunk_size * 2)
+                    if start <= high:
+                        self.sleep(min(spec["max_sleep"], latency_ms / 1000 * spec["sleep_ratio"]))
+            finally:
+                try:
+                    adapter.reset_transaction_timeouts(cursor)
+                    conn.commit()
+                finally:
+                    cursor.close()
+        return total_rows
+
+    def _run_chunk(self, conn, cursor, adapter, statement: str, version: str, start: int, end: int, spec: Dict[str, any]) -> int:
+        """
+        Apply one key range and advance the checkpoint in the same transaction, retrying with backoff on failures such as lock timeouts.
+        """
+        for attempt in range(spec["retries"] + 1):
+            try:
+                adapter.set_transaction_timeouts(cursor, spec["lock_timeout"], spec["statement_timeout"])
+                cursor.execute(statement, {"start": start, "end": end})
+                rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else 0
+                adapter.save_checkpoint(cursor, version, end)
+                conn.commit()
+                return rows
+            except Exception as e:
+                conn.rollback()
+                if attempt == spec["retries"]:
+                    print(f"Error {e} in backfill {version} at keys [{start}, {end})")
+                    raise
+                self.sleep(min(spec["max_sleep"], 0.1 * 2 ** attempt))
+
+
+def _parse_ms(value) -> int:
+    """
+    Parse a duration such as 500, '500ms', '2s' or '1min' into milliseconds.
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*(ms|s|min)?', str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid duration {value}")
+    number, unit = float(match.group(1)), match.group(2) or 'ms'
+    return int(number * {'ms': 1, 's': 1000, 'min': 60000}[unit])
+
+
+def apply_backfill_migration(migration_registry: MigrationRegistry, migration: Dict[str, any], sleep=time.sleep) -> bool:
+    """
+    Run and record a migration if it is a backfill. Backfills commit per chunk, so callers must not hold uncommitted work on the registry connection.
+    The checkpoint is deleted in the transaction that records the migration, so a backfill applied again after a rollback starts from the lowest key.
+
+    Args:
+        migration_registry (MigrationRegistry): Registry used for connections, checkpoints and recording.
+        migration (dict): Migration metadata.
+        sleep (Callable): Function used to pause between chunks.
+    Returns:
+        bool: True if the migration was a backfill and has been applied, False for ordinary migrations.
+    """
+    spec = load_backfill(migration["path"])
+    if spec is None:
+        return False
+    began = time.perf_counter()
+    BackfillExecutor(migration_registry, sleep).run(migration, spec)
+    with migration_registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            migration_registry.record_migration(migration, int((time.perf_counter() - began) * 1000), "Applied", cursor=cursor)
+            migration_registry._get_adapter().delete_checkpoints(cursor, [migration["version"]])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return True
@@ -0,0 +1,146 @@
+"""
+baseline.py
+-----------
+Captures the schema, data and registry rows of a migrated database in a single snapshot file, and loads such a snapshot into a fresh database so that only the migrations after it need replaying.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+from .migration_registry import MigrationRegistry
+from .migration_scanner import MigrationScanner, checksum_matches
+from .version_manager import Version
+
+BASELINE_FORMAT = 1
+
+REGISTRY_COLUMNS = ("version", "description", "filename", "checksum", "execution_time", "status")
+
+
+def create_baseline(migration_registry: MigrationRegistry, output_path: str, migration_dir: Optional[str] = None) -> Dict[str, any]:
+    """
+    Snapshot the database and its registry rows into a JSON baseline file.
+
+    Args:
+        migration_registry (MigrationRegistry): Registry of the database to snapshot.
+        output_path (str): Path of the baseline file to write.
+        migration_dir (str): Directory of up migrations. When given, the registry is checked against the files first, so a drifted database is never baselined.
+    Returns:
+        dict: The snapshot written, with its "version" being the newest migration it contains.
+    Raises:
+        ValueError: If the registry is empty or an applied migration no longer matches its file.
+    """
+    adapter = migration_registry._get_adapter()
+    with migration_registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT {', '.join(REGISTRY_COLUMNS)} FROM schema_migrations")
+            rows = [dict(zip(REGISTRY_COLUMNS, row)) for row in cursor.fetchall()]
+            if not rows:
+                raise ValueError("No applied migrations to baseline")
+            script = adapter.dump_database(cursor, migration_registry.db_config)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    rows.sort(key=lambda row: Version.parse(row["version"]))
+    if migration_dir is not None:
+        _validate_checksums(rows, migration_dir)
+
+    snapshot = {
+        "format": BASELINE_FORMAT,
+        "dialect": adapter.DIALECT,
+        "version": rows[-1]["version"],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "registry": rows,
+        "schema": script,
+    }
+    snapshot["digest"] = _digest(snapshot)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(snapshot, file)
+    os.replace(tmp_path, output_path)
+    print(f"Baseline at {snapshot['version']} written to {output_path}")
+    return snapshot
+
+
+def read_baseline(path: str) -> Dict[str, any]:
+    """
+    Read and verify a baseline file.
+
+    Args:
+        path (str): Baseline file path.
+    Returns:
+        dict: The snapshot.
+    Raises:
+        ValueError: If the file has an unknown format or its digest does not match its contents.
+    """
+    with open(path, 'r') as file:
+        snapshot = json.load(file)
+    if snapshot.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"Unsupported baseline format in {path}")
+    if snapshot.get("digest") != _digest(snapshot):
+        raise ValueError(f"Baseline {path} is corrupt")
+    return snapshot
+
+
+def load_baseline(migration_registry: MigrationRegistry, path: str, migration_dir: Optional[str] = None) -> str:
+    """
+    Load a baseline into a database without applied migrations, in one transaction.
+    The squashed migrations are recorded with their original checksums, so the runner keeps validating their files afterwards.
+
+    Args:
+        migration_registry (MigrationRegistry): Registry of the fresh database.
+        path (str): Baseline file path.
+        migration_dir (str): Directory of up migrations. When given, files of squashed migrations must still match the baseline's checksums.
+    Returns:
+        str: Version of the newest migration in the baseline.
+    Raises:
+        ValueError: If the baseline is corrupt, was taken from another backend, does not match the migration files, or the database already has applied migrations.
+    """
+    snapshot = read_baseline(path)
+    adapter = migration_registry._get_adapter()
+    if snapshot["dialect"] != adapter.DIALECT:
+        raise ValueError(f"Baseline {path} was taken from {snapshot['dialect']}, not {adapter.DIALECT}")
+    if migration_dir is not None:
+        _validate_checksums(snapshot["registry"], migration_dir)
+
+    migration_registry.initialize()
+    with migration_registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            adapter.get_applied_migrations(cursor)
+            if cursor.fetchall():
+                raise ValueError("Baselines can only be loaded into a database without applied migrations")
+            adapter.load_dump(cursor, snapshot["schema"])
+            for row in snapshot["registry"]:
+                migration_registry.record_migration(row, row["execution_time"], row["status"], applied_by="baseline", cursor=cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    print(f"Loaded baseline at {snapshot['version']} from {path}")
+    return snapshot["version"]
+
+
+def _validate_checksums(rows: List[Dict[str, any]], migration_dir: str) -> None:
+    """
+    Check that every registry row with a file in migration_dir still matches it. Files deleted after squashing are allowed.
+    """
+    scanned = {m["version_key"]: m for m in MigrationScanner(migration_dir).discover_migrations()}
+    for row in rows:
+        migration = scanned.get(Version.parse(row["version"]))
+        if migration is not None and not checksum_matches(migration, row["checksum"]):
+            raise ValueError(f'Applied Migration {row["version"]} has been changed')
+
+
+def _digest(snapshot: Dict[str, any]) -> str:
+    """
+    Hash the snapshot's contents, excluding its digest.
+    """
+    content = json.dumps({k: v for k, v in snapshot.items() if k != "digest"}, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
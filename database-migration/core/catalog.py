@@ -0,0 +1,122 @@
+"""
+catalog.py
+----------
+Records normalized, hashed snapshots of the live schema catalog per migration version, and checks a database for schema drift against the snapshot of its newest applied version.
+A check compares one hash per object, computed in the database where the backend can, and reads definitions only for objects whose hash changed.
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+from .migration_registry import MigrationRegistry
+from .version_manager import Version
+
+# Snapshot row holding a digest of all object hashes. It marks that a snapshot exists and confirms an unchanged catalog without reading the snapshot's other rows.
+DIGEST_TYPE = "catalog"
+DIGEST_NAME = "*"
+
+
+def capture_catalog(migration_registry: MigrationRegistry, version: Optional[str] = None) -> Dict[str, any]:
+    """
+    Introspect the live schema and store it as the catalog snapshot of a version, replacing any earlier snapshot of that version.
+
+    Args:
+        migration_registry (MigrationRegistry): Registry of the database to snapshot.
+        version (str): Version to store the snapshot under. Defaults to the newest applied migration.
+    Returns:
+        dict: {"version", "objects"}.
+    Raises:
+        ValueError: If no version is given and no migrations are applied.
+    """
+    adapter = migration_registry._get_adapter()
+    with migration_registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            adapter.initialize_catalog_table(cursor)
+            version = version or _newest_applied(adapter, cursor)
+            hashes = {(object_type, name): object_hash for object_type, name, object_hash in adapter.get_catalog_hashes(cursor)}
+            rows = [(object_type, name, hashes[(object_type, name)], definition)
+                    for object_type, name, definition in adapter.get_catalog(cursor) if (object_type, name) in hashes]
+            rows.append((DIGEST_TYPE, DIGEST_NAME, _digest(hashes), None))
+            adapter.save_catalog(cursor, version, rows)
+            conn.commit()
+        except Exception as e:
+            print("Error", e)
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    print(f"Recorded catalog snapshot of {len(rows) - 1} objects at {version}")
+    return {"version": version, "objects": len(rows) - 1}
+
+
+def check_catalog(migration_registry: MigrationRegistry) -> List[Dict[str, any]]:
+    """
+    Compare the live schema with the catalog snapshot of the newest applied version.
+    The check only reads: a database without the snapshot table reports that no snapshot was recorded instead of creating the table.
+
+    Args:
+        migration_registry (MigrationRegistry): Registry of the database to check.
+    Returns:
+        List[dict]: {"object_type", "object_name", "state", "expected", "actual"} per drifted object, ordered by type and name.
+            state is "changed", "missing" (in the snapshot but not the database) or "unexpected" (in the database but not the snapshot).
+            expected and actual hold the snapshot and live definitions of changed objects, and are None otherwise.
+    Raises:
+        ValueError: If no migrations are applied or no snapshot was recorded at the newest applied version.
+    """
+    adapter = migration_registry._get_adapter()
+    with migration_registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if not adapter.table_exists(cursor, 'schema_migrations'):
+                raise ValueError("No applied migrations")
+            version = _newest_applied(adapter, cursor)
+            has_snapshots = adapter.table_exists(cursor, 'schema_migration_catalog')
+            digest_rows = adapter.get_catalog_snapshot(cursor, version, names=[DIGEST_NAME]) if has_snapshots else []
+            if not digest_rows:
+                raise ValueError(f"No catalog snapshot recorded at {version}")
+
+            live = {(object_type, name): object_hash for object_type, name, object_hash in adapter.get_catalog_hashes(cursor)}
+            if digest_rows[0][2] == _digest(live):
+                conn.commit()
+                return []
+
+            stored = {(object_type, name): object_hash for object_type, name, object_hash, _ in adapter.get_catalog_snapshot(cursor, version)
+                      if object_type != DIGEST_TYPE}
+            drift = {}
+            for key, object_hash in stored.items():
+                if key not in live:
+                    drift[key] = "missing"
+                elif live[key] != object_hash:
+                    drift[key] = "changed"
+            drift.update((key, "unexpected") for key in live if key not in stored)
+
+            changed = sorted({name for (_, name), state in drift.items() if state == "changed"})
+            expected = {(object_type, name): definition for object_type, name, _, definition in adapter.get_catalog_snapshot(cursor, version, names=changed)}
+            actual = {(object_type, name): definition for object_type, name, definition in adapter.get_catalog(cursor, names=changed)}
+            conn.commit()
+        finally:
+            cursor.close()
+
+    return [{"object_type": object_type, "object_name": name, "state": state,
+             "expected": expected.get((object_type, name)) if state == "changed" else None,
+             "actual": actual.get((object_type, name)) if state == "changed" else None}
+            for (object_type, name), state in sorted(drift.items())]
+
+
+def _newest_applied(adapter, cursor) -> str:
+    """
+    Return the newest applied version as recorded in the registry.
+    """
+    adapter.get_applied_migrations(cursor)
+    versions = [row[0] for row in cursor.fetchall()]
+    if not versions:
+        raise ValueError("No applied migrations")
+    return max(versions, key=Version.parse)
+
+
+def _digest(hashes: Dict[tuple, str]) -> str:
+    """
+    Hash a catalog's (object_type, object_name) -> object hash mapping, independent of row order.
+    """
+    content = "\n".join(f"{object_type}\0{name}\0{object_hash}" for (object_type, name), object_hash in sorted(hashes.items()))
+    return hashlib.sha256(content.encode()).hexdigest()
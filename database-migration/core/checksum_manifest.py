@@ -0,0 +1,124 @@
+"""
+checksum_manifest.py
+--------------------
+Caches migration file checksums keyed by file path, size, mtime and inode, both in a persisted manifest file and in an in-process memo shared by every scanner, so unchanged files are not re-read and re-hashed.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# Process-wide memo shared by every MigrationScanner: absolute path -> (size, mtime_ns, inode, checksum)
+_MEMO: Dict[str, tuple] = {}
+_MEMO_LOCK = threading.Lock()
+
+# Files modified this recently are not cached, since a same-size rewrite within the
+# filesystem's mtime granularity would otherwise be indistinguishable from the cached file.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class ChecksumManifest:
+    """
+    Persisted map of migration file name to its stat signature and checksum.
+    """
+
+    def __init__(self, manifest_path: Optional[str]) -> None:
+        """
+        Initialize the ChecksumManifest.
+
+        Args:
+            manifest_path (str): Path of the JSON manifest file, or None to only use the in-process memo.
+        """
+        self.manifest_path = manifest_path
+        self.entries = self._load()
+        self._dirty = False
+
+    def lookup(self, file_path: str, stat: os.stat_result) -> Optional[str]:
+        """
+        Return the cached checksum for a file if its size, mtime and inode are unchanged.
+
+        Args:
+            file_path (str): Path of the migration file.
+            stat (os.stat_result): Current stat of the file.
+        Returns:
+            str: Cached checksum, or None on a miss.
+        """
+        signature = _signature(stat)
+        with _MEMO_LOCK:
+            memo = _MEMO.get(os.path.abspath(file_path))
+        if memo and memo[:3] == signature:
+            return memo[3]
+
+        entry = self.entries.get(os.path.basename(file_path))
+        if entry and tuple(entry["stat"]) == signature:
+            with _MEMO_LOCK:
+                _MEMO[os.path.abspath(file_path)] = signature + (entry["checksum"],)
+            return entry["checksum"]
+        return None
+
+    def store(self, file_path: str, stat: os.stat_result, checksum: str) -> None:
+        """
+        Cache a freshly computed checksum for a file.
+
+        Args:
+            file_path (str): Path of the migration file.
+            stat (os.stat_result): Stat of the file taken before it was hashed.
+            checksum (str): The computed checksum.
+        """
+        if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        signature = _signature(stat)
+        with _MEMO_LOCK:
+            _MEMO[os.path.abspath(file_path)] = signature + (checksum,)
+        self.entries[os.path.basename(file_path)] = {"stat": list(signature), "checksum": checksum}
+        self._dirty = True
+
+    def prune(self, file_names: Iterable[str]) -> None:
+        """
+        Drop manifest entries for files that no longer exist in the migration directory.
+
+        Args:
+            file_names (Iterable[str]): Names of the files found by the current scan.
+        """
+        keep = set(file_names)
+        for name in [name for name in self.entries if name not in keep]:
+            del self.entries[name]
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Write the manifest to disk if it changed. Failures are reported and ignored, since the manifest is only a cache.
+        """
+        if not self.manifest_path or not self._dirty:
+            return
+        tmp_path = f"{self.manifest_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": 1, "files": self.entries}, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+        except OSError as e:
+            print("Error", e)
+
+    def _load(self) -> Dict[str, dict]:
+        """
+        Read the manifest file, treating a missing or unreadable file as empty.
+        """
+        if not self.manifest_path:
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                data = json.load(f)
+            return data.get("files", {}) if data.get("version") == 1 else {}
+        except (OSError, ValueError):
+            return {}
+
+
+def _signature(stat: os.stat_result) -> tuple:
+    """
+    Return the (size, mtime_ns, inode) tuple used to detect changed files.
+    """
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
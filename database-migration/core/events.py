@@ -0,0 +1,264 @@
+"""
+events.py
+---------
+Event hooks for migration runs, and a metrics collector that turns those events into counters and timers exported in Prometheus text format or JSON.
+
+Every MigrationRegistry owns an EventHooks instance (registry.events) that the runner, parallel executor and rollback emit to. Handlers are called as handler(event, fields) with these fields:
+
+    scan_start         migration_dir
+    scan_end           migration_dir, count, seconds
+    diff               pending, applied, server_diff, seconds
+    lock_wait          lock_name, attempts, acquired, seconds
+    migration_begin    version
+    migration_commit   version, seconds
+    migration_fail     version, seconds, error
+    rollback_step      version, seconds
+    rollback_fail      version, error
+    rollback           target, rolled_back, success, seconds
+    run_end            result, success, seconds
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+SCAN_START = "scan_start"
+SCAN_END = "scan_end"
+DIFF = "diff"
+LOCK_WAIT = "lock_wait"
+MIGRATION_BEGIN = "migration_begin"
+MIGRATION_COMMIT = "migration_commit"
+MIGRATION_FAIL = "migration_fail"
+ROLLBACK_STEP = "rollback_step"
+ROLLBACK_FAIL = "rollback_fail"
+ROLLBACK = "rollback"
+RUN_END = "run_end"
+
+EVENTS = (SCAN_START, SCAN_END, DIFF, LOCK_WAIT, MIGRATION_BEGIN, MIGRATION_COMMIT, MIGRATION_FAIL,
+          ROLLBACK_STEP, ROLLBACK_FAIL, ROLLBACK, RUN_END)
+
+
+class EventHooks:
+    """
+    Dispatches migration events to subscribed handlers.
+    Handler errors are reported and swallowed, so instrumentation can never fail a migration.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize EventHooks with no handlers.
+        """
+        self._handlers: Dict[Optional[str], List[Callable]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Callable[[str, Dict[str, any]], None], *events: str) -> Callable:
+        """
+        Call handler for the given events, or for every event when none are given.
+
+        Args:
+            handler (Callable): Called as handler(event, fields).
+            events (str): Event names from EVENTS.
+        Returns:
+            Callable: The handler, so subscribe can be used as a decorator.
+        Raises:
+            ValueError: If an event name is unknown.
+        """
+        unknown = [event for event in events if event not in EVENTS]
+        if unknown:
+            raise ValueError(f"Unknown events {', '.join(unknown)}")
+        with self._lock:
+            for event in events or (None,):
+                self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def unsubscribe(self, handler: Callable) -> None:
+        """
+        Stop calling handler for any event.
+        """
+        with self._lock:
+            for handlers in self._handlers.values():
+                while handler in handlers:
+                    handlers.remove(handler)
+
+    def emit(self, event: str, **fields) -> None:
+        """
+        Call the handlers subscribed to event, then those subscribed to every event.
+
+        Args:
+            event (str): Event name from EVENTS.
+            fields: Event payload.
+        """
+        with self._lock:
+            handlers = self._handlers.get(event, []) + self._handlers.get(None, [])
+        for handler in handlers:
+            try:
+                handler(event, fields)
+            except Exception as e:
+                print("Error", e)
+
+
+# name: (type, help). Summaries are exported as <name>_count and <name>_sum.
+METRICS = {
+    "events_total": ("counter", "Migration events emitted, by event."),
+    "scan_seconds": ("summary", "Time spent scanning the migration directory."),
+    "migration_files": ("gauge", "Migration files found by the last scan."),
+    "diff_seconds": ("summary", "Time spent diffing migration files against the registry."),
+    "pending_migrations": ("gauge", "Migrations pending after the last diff."),
+    "lock_wait_seconds": ("summary", "Time spent waiting for the advisory lock."),
+    "lock_timeouts_total": ("counter", "Advisory lock waits that timed out."),
+    "migrations_applied_total": ("counter", "Migrations applied and committed."),
+    "migrations_failed_total": ("counter", "Migrations that failed and were rolled back."),
+    "migration_seconds": ("summary", "Time to apply and commit one migration."),
+    "migration_duration_seconds": ("gauge", "Time to apply each migration of this run, by version."),
+    "rollback_steps_total": ("counter", "Down migrations executed."),
+    "rollback_failed_total": ("counter", "Down migrations that failed."),
+    "rollback_step_seconds": ("summary", "Time to execute one down migration."),
+    "run_seconds": ("summary", "Duration of whole migrate and rollback runs, by command."),
+    "last_run_success": ("gauge", "1 if the last run of the command succeeded, 0 if it failed."),
+}
+
+
+class MetricsCollector:
+    """
+    Event handler that aggregates migration events into counters, gauges and timers.
+    Attach it to a registry's events before a run and write it out afterwards.
+    """
+
+    def __init__(self, prefix: str = "schema_migration") -> None:
+        """
+        Initialize an empty MetricsCollector.
+
+        Args:
+            prefix (str): Prefix of every exported metric name.
+        """
+        self.prefix = prefix
+        self._samples: Dict[str, Dict[tuple, any]] = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+
+    def attach(self, events: EventHooks) -> "MetricsCollector":
+        """
+        Subscribe to every event of events.
+        """
+        events.subscribe(self)
+        return self
+
+    def __call__(self, event: str, fields: Dict[str, any]) -> None:
+        """
+        Record one event.
+        """
+        with self._lock:
+            self._inc("events_total", event=event)
+            if event == SCAN_END:
+                self._observe("scan_seconds", fields["seconds"])
+                self._set("migration_files", fields["count"])
+            elif event == DIFF:
+                self._observe("diff_seconds", fields["seconds"])
+                self._set("pending_migrations", fields["pending"])
+            elif event == LOCK_WAIT:
+                self._observe("lock_wait_seconds", fields["seconds"])
+                if not fields["acquired"]:
+                    self._inc("lock_timeouts_total")
+            elif event == MIGRATION_COMMIT:
+                self._inc("migrations_applied_total")
+                self._observe("migration_seconds", fields["seconds"])
+                self._set("migration_duration_seconds", fields["seconds"], version=fields["version"])
+            elif event == MIGRATION_FAIL:
+                self._inc("migrations_failed_total")
+            elif event == ROLLBACK_STEP:
+                self._inc("rollback_steps_total")
+                self._observe("rollback_step_seconds", fields["seconds"])
+            elif event == ROLLBACK_FAIL:
+                self._inc("rollback_failed_total")
+            elif event in (ROLLBACK, RUN_END):
+                command = "rollback" if event == ROLLBACK else "migrate"
+                self._observe("run_seconds", fields["seconds"], command=command)
+                self._set("last_run_success", int(fields["success"]), command=command)
+
+    def _inc(self, name: str, value: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        self._samples[name][key] = self._samples[name].get(key, 0) + value
+
+    def _set(self, name: str, value: float, **labels) -> None:
+        self._samples[name][tuple(sorted(labels.items()))] = value
+
+    def _observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        count, total = self._samples[name].get(key, (0, 0.0))
+        self._samples[name][key] = (count + 1, total + value)
+
+    def to_json(self) -> Dict[str, any]:
+        """
+        Return the metrics as a JSON-serializable dict.
+
+        Returns:
+            dict: {metric name: {"type", "help", "samples": [{"labels", "value"} or {"labels", "count", "sum"}]}} for every metric with samples.
+        """
+        metrics = {}
+        with self._lock:
+            for name, samples in self._samples.items():
+                if not samples:
+                    continue
+                kind, help_text = METRICS[name]
+                rows = []
+                for key, value in sorted(samples.items()):
+                    row = {"labels": dict(key)}
+                    if kind == "summary":
+                        row["count"], row["sum"] = value[0], round(value[1], 6)
+                    else:
+                        row["value"] = value
+                    rows.append(row)
+                metrics[f"{self.prefix}_{name}"] = {"type": kind, "help": help_text, "samples": rows}
+        return metrics
+
+    def to_prometheus(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, metric in self.to_json().items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for row in metric["samples"]:
+                labels = _format_labels(row["labels"])
+                if metric["type"] == "summary":
+                    lines.append(f"{name}_count{labels} {row['count']}")
+                    lines.append(f"{name}_sum{labels} {row['sum']}")
+                else:
+                    lines.append(f"{name}{labels} {row['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, format: Optional[str] = None) -> None:
+        """
+        Write the metrics to path atomically, e.g. for the node_exporter textfile collector.
+
+        Args:
+            path (str): Output file.
+            format (str): "prometheus" or "json". Defaults to json for .json paths and prometheus otherwise.
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        format = format or ("json" if path.endswith(".json") else "prometheus")
+        if format == "json":
+            content = json.dumps({"metrics": self.to_json()}, indent=2) + "\n"
+        elif format == "prometheus":
+            content = self.to_prometheus()
+        else:
+            raise ValueError(f"Unknown metrics format {format}; use prometheus or json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+
+def _format_labels(labels: Dict[str, any]) -> str:
+    """
+    Render labels as {key="value",...}, escaping values as Prometheus requires.
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,177 @@
+"""
+fleet_runner.py
+---------------
+Applies pending migrations to many PostgreSQL databases concurrently with asyncpg, isolating failures per target and summarizing the outcome of the rollout.
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, List, Union
+from adapters.postgres import posgrestSQL
+from .backfill import load_backfill
+from .migration_scanner import MigrationScanner, checksum_matches
+from .sql_splitter import StatementSplitter
+from .streaming_executor import READ_CHUNK_CHARS
+from .version_manager import Version
+
+
+class FleetRunner:
+    """
+    Rolls the migrations in a directory out to a fleet of PostgreSQL databases.
+    The directory is scanned once; each target is then diffed against its own registry and migrated in its own connection, with at most `concurrency` targets in flight.
+    Pending files are read statement by statement while they are applied, so large seed files are never held in memory whole.
+    Backfill migrations need the chunked BackfillExecutor and are rejected; apply them with MigrationRunner.
+    """
+
+    def __init__(self, migration_dir: str, targets: Union[List[Dict[str, any]], Dict[str, Dict[str, any]]], concurrency: int = 10,
+                 checksum_algorithm: str = 'md5', connect_timeout: float = 10) -> None:
+        """
+        Initialize the FleetRunner.
+
+        Args:
+            migration_dir (str): Directory containing migration files.
+            targets (list or dict): A list of db_config dicts, or a shard map of name -> db_config.
+            concurrency (int): Maximum number of databases migrated at the same time.
+            checksum_algorithm (str): Digest algorithm for newly recorded checksums.
+            connect_timeout (float): Seconds to wait when connecting to a target.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if isinstance(targets, dict):
+            self.targets = list(targets.items())
+        else:
+            self.targets = [(_target_name(config), config) for config in targets]
+        self.migration_dir = migration_dir
+        self.concurrency = concurrency
+        self.checksum_algorithm = checksum_algorithm
+        self.connect_timeout = connect_timeout
+        self.adapter = posgrestSQL()
+
+    def run(self) -> Dict[str, any]:
+        """
+        Run the rollout from synchronous code.
+
+        Returns:
+            dict: Summary report, see run_async.
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> Dict[str, any]:
+        """
+        Migrate every target concurrently.
+
+        Returns:
+            dict: {"targets", "succeeded", "failed", "duration_ms", "results"}, where results holds one
+            {"target", "status", "applied", "error", "duration_ms"} dict per target in input order.
+            status is "applied", "up_to_date" or "failed".
+        """
+        start = time.perf_counter()
+        migrations = MigrationScanner(self.migration_dir, algorithm=self.checksum_algorithm).discover_migrations()
+        if not migrations:
+            raise ValueError("No migration files found")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._migrate_target(name, config, migrations, semaphore) for name, config in self.targets))
+
+        failed = sum(1 for result in results if result["status"] == "failed")
+        return {
+            "targets": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "duration_ms": int((time.perf_counter() - start) * 1000),
+            "results": list(results),
+        }
+
+    async def _migrate_target(self, name: str, config: Dict[str, any], migrations: List[Dict[str, any]], semaphore: asyncio.Semaphore) -> Dict[str, any]:
+        """
+        Diff and migrate one target. Errors are captured in the result instead of propagating to the other targets.
+        """
+        import asyncpg
+
+        async with semaphore:
+            start = time.perf_counter()
+            result = {"target": name, "status": "up_to_date", "applied": [], "error": None}
+            conn = None
+            try:
+                conn = await asyncpg.connect(timeout=self.connect_timeout, **_asyncpg_config(config))
+                await conn.execute(self.adapter.TEMPLATES["initialize_table"])
+                applied = {Version.parse(row[0]): row[1] for row in await conn.fetch(self.adapter.TEMPLATES["get_applied_migrations"])}
+
+                pending = []
+                for migration in migrations:
+                    version = migration["version_key"]
+                    if version in applied:
+                        if not checksum_matches(migration, applied[version]):
+                            raise ValueError(f'Applied Migration {version} has been changed')
+                    else:
+                        pending.append(migration)
+                for migration in pending:
+                    if load_backfill(migration["path"]) is not None:
+                        raise ValueError(f'Migration {migration["version"]} is a backfill, which the fleet runner cannot apply')
+
+                record = _to_asyncpg(self.adapter.TEMPLATES["record_migration"])
+                for migration in pending:
+                    began = time.perf_counter()
+                    async with conn.transaction():
+                        await _execute_file(conn, migration["path"])
+                        await conn.execute(record,
+                                           migration['version'],
+                                           migration['description'],
+                                           migration['filename'],
+                                           migration['checksum'],
+                                           int((time.perf_counter() - began) * 1000),
+                                           "Applied",
+                                           "system")
+                    result["applied"].append(migration["version"])
+                    result["status"] = "applied"
+            except Exception as e:
+                print(f"Error {e} when migrating {name}")
+                result["status"] = "failed"
+                result["error"] = str(e)
+            finally:
+                if conn is not None:
+                    await conn.close()
+            result["duration_ms"] = int((time.perf_counter() - start) * 1000)
+            return result
+
+
+async def _execute_file(conn, path: str) -> None:
+    """
+    Execute a migration file statement by statement, reading it in chunks.
+    """
+    splitter = StatementSplitter(posgrestSQL.DIALECT)
+    with open(path, 'r') as file:
+        while True:
+            chunk = await asyncio.to_thread(file.read, READ_CHUNK_CHARS)
+            for statement in splitter.feed(chunk) if chunk else splitter.finish():
+                await conn.execute(statement)
+            if not chunk:
+                break
+
+
+def _asyncpg_config(config: Dict[str, any]) -> Dict[str, any]:
+    """
+    Translate a psycopg2-style db_config into asyncpg.connect keyword arguments.
+    """
+    translated = {k: v for k, v in config.items() if k != "type"}
+    if "dbname" in translated:
+        translated["database"] = translated.pop("dbname")
+    if "port" in translated:
+        translated["port"] = int(translated["port"])
+    return translated
+
+
+def _to_asyncpg(sql: str) -> str:
+    """
+    Rewrite %s placeholders as asyncpg's numbered $n placeholders.
+    """
+    counter = iter(range(1, sql.count('%s') + 1))
+    return re.sub(r'%s', lambda _: f"${next(counter)}", sql)
+
+
+def _target_name(config: Dict[str, any]) -> str:
+    """
+    Build a readable name for a target from its connection settings.
+    """
+    return f"{config.get('host', 'localhost')}:{config.get('port', 5432)}/{config.get('dbname', config.get('database', ''))}"
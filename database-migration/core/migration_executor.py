@@ -0,0 +1,68 @@
+"""
+migration_executor.py
+---------------------
+Executes a single migration file on a cursor, either as one script, statement by statement with per-statement profiling, or streamed for large data-seed files.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from .sql_splitter import split_statements
+from .streaming_executor import stream_migration
+
+# Statement text stored in the profiling table is truncated to this many characters.
+PROFILE_STATEMENT_CHARS = 1000
+
+
+def execute_migration(cursor, migration: Dict[str, any], adapter, profile_statements: bool = False,
+                      stream_threshold: Optional[int] = None, batch_rows: int = 1000) -> Tuple[int, List[Dict[str, any]]]:
+    """
+    Execute a migration file on the given cursor without committing.
+
+    Args:
+        cursor: Database cursor of the caller's transaction.
+        migration (dict): Migration metadata with a "path".
+        adapter (Adapter): Adapter for the target backend.
+        profile_statements (bool): Split the file into statements, run them one by one and collect a profile per statement.
+        stream_threshold (int): Files of at least this many bytes are streamed with bounded memory, with INSERT ... VALUES blocks loaded in batches. None disables streaming.
+        batch_rows (int): Rows per bulk load when streaming.
+    Returns:
+        Tuple[int, List[dict]]: Execution time in milliseconds and the statement profiles (empty unless profiling).
+    """
+    profiles = []
+
+    def record(statement, duration_ms, row_count, lock_wait_ms=None):
+        profiles.append({
+            "statement_index": len(profiles),
+            "statement": statement[:PROFILE_STATEMENT_CHARS],
+            "duration_ms": duration_ms,
+            "row_count": row_count,
+            "lock_wait_ms": lock_wait_ms,
+        })
+
+    total_start = time.perf_counter()
+    if stream_threshold is not None and os.path.getsize(migration["path"]) >= stream_threshold:
+        stream_migration(cursor, migration, adapter, batch_rows, record if profile_statements else None)
+        return _elapsed_ms(total_start), profiles
+
+    with open(migration["path"], 'r') as file:
+        sql_statements = file.read()
+
+    if not profile_statements:
+        adapter.execute_script(cursor, sql_statements)
+        return _elapsed_ms(total_start), []
+
+    for statement in split_statements(sql_statements, adapter.DIALECT):
+        start = time.perf_counter()
+        cursor.execute(statement)
+        duration_ms = _elapsed_ms(start)
+        row_count = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        record(statement, duration_ms, row_count, adapter.get_last_lock_wait(cursor))
+    return _elapsed_ms(total_start), profiles
+
+
+def _elapsed_ms(start: float) -> int:
+    """
+    Return whole milliseconds elapsed since a perf_counter() reading.
+    """
+    return int((time.perf_counter() - start) * 1000)
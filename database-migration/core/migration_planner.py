@@ -0,0 +1,265 @@
+"""
+migration_planner.py
+--------------------
+Dry-runs pending migrations: splits each file into statements, classifies the lock each statement takes, estimates the rows it touches with EXPLAIN or table statistics, and rates its lock risk.
+The whole plan runs in one transaction that is rolled back, so nothing is applied.
+"""
+
+import re
+from typing import Dict, List, Optional
+from .migration_registry import MigrationRegistry
+from .sql_splitter import split_statements
+from .backfill import load_backfill
+from .parallel_executor import TABLE_PATTERNS, _table_names
+
+RISKS = ("low", "medium", "high")
+
+# Tables at least this large make a statement whose lock time grows with the table "heavy".
+LARGE_TABLE_ROWS = 100000
+
+# Statement text kept in the report, after collapsing whitespace.
+PLAN_STATEMENT_CHARS = 200
+
+DML_PATTERN = re.compile(r'^\s*(?:INSERT|UPDATE|DELETE|MERGE|REPLACE)\b', re.IGNORECASE)
+CREATE_TABLE_PATTERN = re.compile(r'^\s*CREATE\s+(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?TABLE\b', re.IGNORECASE)
+ALTER = r'^\s*ALTER\s+TABLE\b'
+
+
+def _rules(*rules):
+    return [(re.compile(pattern, re.IGNORECASE | re.DOTALL), lock, blocks, scales) for pattern, lock, blocks, scales in rules]
+
+
+# Per dialect, the first matching (pattern, lock, blocks, scales) rule classifies a statement.
+# blocks is "reads" when the lock blocks reads and writes, "writes" when it blocks writes only, and None when it blocks neither.
+# scales means the lock is held for a time that grows with the table, e.g. for a rewrite or a validation scan.
+LOCK_RULES = {
+    'postgresql': _rules(
+        (r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\b', "SHARE UPDATE EXCLUSIVE", None, True),
+        (r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b', "SHARE", "writes", True),
+        (r'^\s*DROP\s+INDEX\s+CONCURRENTLY\b', "SHARE UPDATE EXCLUSIVE", None, False),
+        (r'^\s*DROP\s+INDEX\b', "ACCESS EXCLUSIVE", "reads", False),
+        (r'^\s*REINDEX\b.*\bCONCURRENTLY\b', "SHARE UPDATE EXCLUSIVE", None, True),
+        (r'^\s*REINDEX\b', "SHARE", "writes", True),
+        (r'^\s*(?:VACUUM\s+FULL|CLUSTER)\b', "ACCESS EXCLUSIVE", "reads", True),
+        (ALTER + r'.*\bVALIDATE\s+CONSTRAINT\b', "SHARE UPDATE EXCLUSIVE", None, True),
+        (ALTER + r'.*\b(?:FOREIGN\s+KEY|REFERENCES)\b.*\bNOT\s+VALID\b', "SHARE ROW EXCLUSIVE", "writes", False),
+        (ALTER + r'.*\b(?:FOREIGN\s+KEY|REFERENCES)\b', "SHARE ROW EXCLUSIVE", "writes", True),
+        (ALTER + r'.*\bNOT\s+VALID\b', "ACCESS EXCLUSIVE", "reads", False),
+        (ALTER + r'.*\b(?:ALTER\s+(?:COLUMN\s+)?\S+\s+(?:SET\s+DATA\s+)?TYPE|SET\s+NOT\s+NULL|SET\s+(?:LOGGED|UNLOGGED|TABLESPACE)'
+                 r'|ADD\s+(?:CONSTRAINT\s+\S+\s+)?(?:CHECK|PRIMARY\s+KEY|UNIQUE|EXCLUDE))\b', "ACCESS EXCLUSIVE", "reads", True),
+        (ALTER + r'.*\bADD\b.*\bDEFAULT\b.*\b(?:random|clock_timestamp|gen_random_uuid|uuid_generate_v\d\w*|nextval)\s*\(',
+         "ACCESS EXCLUSIVE", "reads", True),
+        (ALTER, "ACCESS EXCLUSIVE", "reads", False),
+        (r'^\s*(?:DROP\s+TABLE|TRUNCATE)\b', "ACCESS EXCLUSIVE", "reads", False),
+        (r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:CONSTRAINT\s+)?TRIGGER\b', "SHARE ROW EXCLUSIVE", "writes", False),
+        (r'^\s*(?:INSERT|UPDATE|DELETE|MERGE|COPY)\b', "ROW EXCLUSIVE", None, True),
+        (r'^\s*COMMENT\b', "SHARE UPDATE EXCLUSIVE", None, False),
+        (r'^\s*(?:CREATE|SELECT|GRANT|REVOKE|SET)\b', "ACCESS SHARE", None, False),
+    ),
+    'mysql': _rules(
+        (r'^\s*CREATE\s+(?:UNIQUE\s+)?(?:FULLTEXT|SPATIAL)\s+INDEX\b', "SHARED (INPLACE)", "writes", True),
+        (r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b', "NONE (INPLACE)", None, True),
+        (r'^\s*DROP\s+INDEX\b', "EXCLUSIVE METADATA (INPLACE)", "reads", False),
+        (ALTER + r'.*\bALGORITHM\s*=\s*INSTANT\b', "EXCLUSIVE METADATA (INSTANT)", "reads", False),
+        (ALTER + r'.*\b(?:MODIFY|CHANGE|CONVERT\s+TO\s+CHARACTER\s+SET|DROP\s+PRIMARY\s+KEY)\b', "SHARED (COPY)", "writes", True),
+        (ALTER + r'.*\bADD\s+(?:CONSTRAINT\s+\S+\s+)?FOREIGN\s+KEY\b', "SHARED (COPY)", "writes", True),
+        (ALTER + r'.*\bADD\s+(?:FULLTEXT|SPATIAL)\b', "SHARED (INPLACE)", "writes", True),
+        (ALTER + r'.*\bADD\s+(?:CONSTRAINT\s+\S+\s+)?(?:UNIQUE|INDEX|KEY)\b', "NONE (INPLACE)", None, True),
+        (ALTER + r'.*\b(?:ADD\s+(?:CONSTRAINT\s+\S+\s+)?PRIMARY\s+KEY|DROP\s+(?:COLUMN\s+)?(?!INDEX|KEY|FOREIGN)\w+|ENGINE|FORCE)\b',
+         "NONE (INPLACE rebuild)", None, True),
+        (ALTER + r'.*\b(?:ADD|RENAME|DROP\s+(?:INDEX|KEY|FOREIGN\s+KEY)|ALTER\s+(?:COLUMN\s+)?\S+\s+(?:SET|DROP)\s+DEFAULT)\b',
+         "EXCLUSIVE METADATA (INSTANT)", "reads", False),
+        (ALTER, "SHARED (COPY)", "writes", True),
+        (r'^\s*(?:DROP\s+TABLE|TRUNCATE|RENAME\s+TABLE)\b', "EXCLUSIVE METADATA", "reads", False),
+        (r'^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b', "ROW", None, True),
+        (r'^\s*(?:CREATE|SELECT|GRANT|REVOKE|SET)\b', "NONE", None, False),
+    ),
+    'sqlite': _rules(
+        (r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b', "EXCLUSIVE (database)", "writes", True),
+        (ALTER + r'.*\bDROP\b', "EXCLUSIVE (database)", "writes", True),
+        (ALTER, "EXCLUSIVE (database)", "writes", False),
+        (r'^\s*VACUUM\b', "EXCLUSIVE (database)", "reads", True),
+        (r'^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b', "RESERVED (database)", "writes", True),
+        (r'^\s*(?:CREATE|DROP)\b', "RESERVED (database)", "writes", False),
+        (r'^\s*SELECT\b', "SHARED (database)", None, False),
+    ),
+}
+
+# Lock assumed for statements no rule recognizes.
+UNKNOWN_LOCK = ("UNKNOWN", "reads", False)
+
+
+def classify_statement(statement: str, dialect: str = 'postgresql') -> Dict[str, any]:
+    """
+    Classify the lock a statement takes on the backend.
+
+    Args:
+        statement (str): One SQL statement, comments allowed.
+        dialect (str): 'postgresql', 'mysql' or 'sqlite'.
+    Returns:
+        dict: {"lock", "blocks", "scales", "dml", "table"}, where table is the first table the statement targets, if known.
+    """
+    statement = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', statement, flags=re.DOTALL)
+    lock, blocks, scales = next(((lock, blocks, scales) for pattern, lock, blocks, scales in LOCK_RULES[dialect] if pattern.match(statement)),
+                                UNKNOWN_LOCK)
+    table = None
+    for pattern in TABLE_PATTERNS:
+        match = pattern.match(statement)
+        if match:
+            names = _table_names(match.group(1))
+            table = names[0] if names else None
+            break
+    return {"lock": lock, "blocks": blocks, "scales": scales, "dml": bool(DML_PATTERN.match(statement)), "table": table}
+
+
+def rate_risk(blocks: Optional[str], scales: bool, rows: Optional[int], large_table_rows: int = LARGE_TABLE_ROWS) -> str:
+    """
+    Rate a statement's lock risk.
+    A statement is heavy when its lock time grows with a table that is large or of unknown size. Heavy and blocking is "high", heavy or blocking is "medium", and anything else is "low".
+    Brief blocking locks are "medium" because they queue behind long-running transactions and block everything queued after them.
+
+    Args:
+        blocks (str): What the lock blocks, as in LOCK_RULES.
+        scales (bool): Whether the lock time grows with the rows touched.
+        rows (int): Rows touched or in the table, None if unknown.
+        large_table_rows (int): Row count from which a table counts as large.
+    Returns:
+        str: One of RISKS.
+    """
+    heavy = scales and (rows is None or rows >= large_table_rows)
+    if blocks and heavy:
+        return "high"
+    if blocks or heavy:
+        return "medium"
+    return "low"
+
+
+class MigrationPlanner:
+    """
+    Produces a per-migration cost and lock-risk report for pending migrations without applying them.
+    DML is estimated with the adapter's EXPLAIN, and DDL that rewrites or scans a table with the table's row statistics.
+    On backends with transactional DDL, CREATE TABLE statements are executed inside the rolled-back plan transaction, so later statements on new tables can be explained.
+    """
+
+    def __init__(self, migration_registry: MigrationRegistry, large_table_rows: int = LARGE_TABLE_ROWS,
+                 lock_timeout_ms: int = 2000, statement_timeout_ms: int = 30000) -> None:
+        """
+        Initialize the MigrationPlanner.
+
+        Args:
+            migration_registry (MigrationRegistry): Registry of the target database.
+            large_table_rows (int): Row count from which a table counts as large.
+            lock_timeout_ms (int): Maximum milliseconds a planning query waits for a lock.
+            statement_timeout_ms (int): Maximum milliseconds a planning query may run.
+        """
+        self.migration_registry = migration_registry
+        self.large_table_rows = large_table_rows
+        self.lock_timeout_ms = lock_timeout_ms
+        self.statement_timeout_ms = statement_timeout_ms
+
+    def plan(self, migrations: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """
+        Plan migrations in order, as if each earlier one had been applied.
+
+        Args:
+            migrations (List[dict]): Pending migrations in apply order.
+        Returns:
+            List[dict]: Per migration {"version", "filename", "risk", "rows", "cost", "locks", "statements"}, where statements holds
+                {"statement", "lock", "blocks", "table", "rows", "cost", "risk", "error"} per statement, and rows and cost are sums over the statements with estimates.
+        """
+        adapter = self.migration_registry._get_adapter()
+        new_tables: Dict[str, int] = {}
+        report = []
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                adapter.begin(cursor)
+                adapter.set_transaction_timeouts(cursor, self.lock_timeout_ms, self.statement_timeout_ms)
+                for migration in migrations:
+                    spec = load_backfill(migration["path"])
+                    if spec is not None:
+                        statements = [self._plan_backfill(cursor, adapter, spec)]
+                    else:
+                        with open(migration["path"], 'r') as file:
+                            sql = file.read()
+                        statements = [self._plan_statement(cursor, adapter, statement, f"plan_step_{len(report)}_{i}", new_tables)
+                                      for i, statement in enumerate(split_statements(sql, adapter.DIALECT))]
+                    report.append(self._summarize(migration, statements))
+            finally:
+                try:
+                    conn.rollback()
+                    adapter.reset_transaction_timeouts(cursor)
+                finally:
+                    cursor.close()
+        return report
+
+    def _plan_statement(self, cursor, adapter, statement: str, savepoint: str, new_tables: Dict[str, int]) -> Dict[str, any]:
+        """
+        Classify and estimate one statement inside its own savepoint, which is rolled back unless it created a table.
+        """
+        classification = classify_statement(statement, adapter.DIALECT)
+        table = classification["table"]
+        rows, cost, error = 0, None, None
+        adapter.savepoint(cursor, savepoint)
+        try:
+            if CREATE_TABLE_PATTERN.match(statement):
+                if adapter.TRANSACTIONAL_DDL:
+                    cursor.execute(statement)
+                if table:
+                    new_tables[table] = 0
+            elif classification["dml"]:
+                estimate = adapter.explain_statement(cursor, statement)
+                rows, cost = estimate["rows"], estimate["cost"]
+                if table in new_tables and rows is not None and statement.lstrip()[:6].upper() == "INSERT":
+                    new_tables[table] += rows
+            elif classification["scales"]:
+                rows = new_tables[table] if table in new_tables else (adapter.estimate_table_rows(cursor, table) if table else None)
+        except Exception as e:
+            rows, error = None, str(e).strip()
+        if error is None and CREATE_TABLE_PATTERN.match(statement):
+            adapter.release_savepoint(cursor, savepoint)
+        else:
+            adapter.rollback_to_savepoint(cursor, savepoint)
+
+        return {
+            "statement": " ".join(statement.split())[:PLAN_STATEMENT_CHARS],
+            "lock": classification["lock"],
+            "blocks": classification["blocks"],
+            "table": table,
+            "rows": rows,
+            "cost": cost,
+            "risk": rate_risk(classification["blocks"], classification["scales"], rows, self.large_table_rows),
+            "error": error,
+        }
+
+    def _plan_backfill(self, cursor, adapter, spec: Dict[str, any]) -> Dict[str, any]:
+        """
+        Estimate a chunked backfill: it touches the whole table, but each chunk holds its row locks only briefly.
+        """
+        rows = adapter.estimate_table_rows(cursor, spec["table"].lower())
+        return {
+            "statement": " ".join(spec["body"].split())[:PLAN_STATEMENT_CHARS],
+            "lock": "ROW (chunked backfill)",
+            "blocks": None,
+            "table": spec["table"],
+            "rows": rows,
+            "cost": None,
+            "risk": rate_risk(None, True, rows, self.large_table_rows),
+            "error": None,
+        }
+
+    @staticmethod
+    def _summarize(migration: Dict[str, any], statements: List[Dict[str, any]]) -> Dict[str, any]:
+        """
+        Combine statement plans into a migration plan with the highest statement risk.
+        """
+        costs = [s["cost"] for s in statements if s["cost"] is not None]
+        return {
+            "version": migration["version"],
+            "filename": migration["filename"],
+            "risk": max((s["risk"] for s in statements), key=RISKS.index, default="low"),
+            "rows": sum(s["rows"] for s in statements if s["rows"] is not None),
+            "cost": sum(costs) if costs else None,
+            "locks": sorted({s["lock"] for s in statements}),
+            "statements": statements,
+        }
@@ -1,19 +1,25 @@
 """
 migration_registry.py
 ---------------------
-Handles the migration registry, including initialization and recording of applied migrations for different database backends (PostgreSQL, MySQL).
+Handles the migration registry, including initialization and recording of applied migrations for different database backends (PostgreSQL, MySQL, SQLite).
+Database drivers and adapters are imported only when their backend is first used, so selecting one backend never pays for loading the others.
 """
-import sqlite3
-import psycopg2
-import mysql.connector
-from typing import Dict
-from ..adapters.mysql import mySQL
-from ..adapters.postgres import posgrestSQL
+import itertools
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, List
+from .events import EventHooks
+
+# Names in-memory SQLite databases; id() can be reused while a freed registry's connections are still open.
+_memory_database_ids = itertools.count()
 
 class MigrationRegistry:
     """
     Manages the schema_migrations registry table and records migration application events.
-    Supports PostgreSQL and MySQL backends.
+    Supports PostgreSQL, MySQL and SQLite backends.
+    A SQLite db_config names a file with 'database', or ':memory:' for a private in-memory database shared by every connection of this registry.
+    Runs against the registry emit their scan, lock, apply and rollback events to its events hooks.
     """
     def __init__(self,db_config) -> None:
         """
@@ -24,71 +30,249 @@ class MigrationRegistry:
         """
         self.db_config = db_config
         self.db_type = db_config.get('type', 'postgresql')
-        self.mySQL_adapter = mySQL()
-        self.postgrest_adpater = posgrestSQL()
+        self.adapter = None
+        self.session = None
+        self._memory_anchor = None
+        self._memory_id = next(_memory_database_ids)
+        self.events = EventHooks()
+        self.lock_name = f"schema_migrations:{db_config.get('dbname', db_config.get('database', ''))}"
 
-    def initialize(self) -> None:
+    def initialize(self, index_checksums: bool = False) -> str:
         """
         Initialize the schema_migrations table in the target database.
         Calls the appropriate adapter for the configured backend.
-        """
-        conn = self._get_connection()
-        cursor = conn.cursor()
 
-        if self.db_type == 'postgresql':
-            try:
-                self.postgrest_adpater.initialize_registry(cursor)
-            except psycopg2.error as e:
-                print("Error", e)
-                raise
-        if self.db_type == 'mysql':
+        Args:
+            index_checksums (bool): Also create the (version, checksum) index that backs the server-side pending diff.
+        Returns:
+            str: "Applied" once the registry exists.
+        """
+        adapter = self._get_adapter()
+        with self.connection() as conn:
+            cursor = conn.cursor()
             try:
-                self.mySQL.intialize_registry(cursor)
-            except Exception as e:
-                print("Error", e)
-                raise
+                try:
+                    adapter.initialize_registry(cursor)
+                except Exception as e:
+                    print("Error", e)
+                    raise
+                if index_checksums:
+                    self._get_adapter().create_registry_index(cursor)
+
+                conn.commit()
+            finally:
+                cursor.close()
+        return "Applied"
+
+    def exists(self) -> bool:
+        """
+        Check whether the schema_migrations table exists in the target database, without creating anything.
+        A SQLite database file that does not exist yet is not created.
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        Returns:
+            bool: True if the registry table exists.
+        """
+        database = str(self.db_config.get('database', ':memory:'))
+        if self.db_type == 'sqlite' and database != ':memory:' and not self.db_config.get('uri') and not os.path.exists(database):
+            return False
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                return self._get_adapter().table_exists(cursor, 'schema_migrations')
+            finally:
+                conn.rollback()
+                cursor.close()
 
-    def record_migration(self, migration: Dict[str,any], execution_time: str, status: str, applied_by='system') -> None:
+    def record_migration(self, migration: Dict[str,any], execution_time: int, status: str, applied_by='system', cursor=None) -> None:
         """
         Record a migration as applied in the schema_migrations table.
 
         Args:
             migration (dict): Migration metadata.
-            execution_time (str): Time taken to apply the migration.
+            execution_time (int): Milliseconds taken to apply the migration.
             status (str): Status of the migration (e.g., 'Applied').
             applied_by (str): User or system applying the migration.
+            cursor: Optional cursor of an open transaction. When given, the row is written on it and the caller owns the commit.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        if self.db_type == 'postgresql':
+        if cursor is not None:
             try:
-                self.postgrest_adpater.record_migration(cursor, migration, execution_time, status, applied_by)
+                self._get_adapter().record_migration(cursor, migration, execution_time, status, applied_by)
             except Exception as e:
                 print("Error", e)
                 raise
-        if self.db_type == 'mysql':
+            return
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
             try:
-                self.mySQL_adapter.record_migration(cursor,migration, execution_time, status, applied_by )
+                try:
+                    self._get_adapter().record_migration(cursor, migration, execution_time, status, applied_by)
+                except Exception as e:
+                    print("Error", e)
+                    raise
+
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def remove_migrations(self, versions: List[str], cursor=None) -> None:
+        """
+        Remove rolled back migrations from the schema_migrations table, together with any backfill checkpoints they left.
+
+        Args:
+            versions (List[str]): Versions to remove.
+            cursor: Optional cursor of an open transaction. When given, the rows are deleted on it and the caller owns the commit.
+        """
+        if not versions:
+            return
+        if cursor is not None:
+            try:
+                self._get_adapter().delete_migrations(cursor, versions)
+                self._get_adapter().delete_checkpoints(cursor, versions)
             except Exception as e:
                 print("Error", e)
                 raise
+            return
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                try:
+                    self._get_adapter().delete_migrations(cursor, versions)
+                    self._get_adapter().delete_checkpoints(cursor, versions)
+                except Exception as e:
+                    print("Error", e)
+                    raise
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def initialize_profiling(self) -> None:
+        """
+        Initialize the schema_migration_statements table used to store per-statement profiles.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._get_adapter().initialize_profile_table(cursor)
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def record_statement_profiles(self, version: str, profiles: List[Dict[str,any]], cursor=None) -> None:
+        """
+        Record per-statement profiles of an applied migration.
+
+        Args:
+            version (str): Version of the migration the statements belong to.
+            profiles (List[dict]): Profiles as produced by execute_migration.
+            cursor: Optional cursor of an open transaction. When given, the rows are written on it and the caller owns the commit.
+        """
+        if not profiles:
+            return
+        if cursor is not None:
+            self._get_adapter().record_statement_profiles(cursor, version, profiles)
+            return
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._get_adapter().record_statement_profiles(cursor, version, profiles)
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def get_pending_migrations(self, migrations: List[tuple]) -> List[tuple]:
+        """
+        Diff scanned migrations against the registry in the database, in one round trip.
+
+        Args:
+            migrations (List[tuple]): Scanned (version, checksum) pairs.
+        Returns:
+            List[tuple]: (version, scanned checksum, recorded checksum or None) for every unapplied or mismatched version.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                rows = self._get_adapter().get_pending_migrations(cursor, migrations)
+                conn.commit()
+                return rows
+            finally:
+                cursor.close()
+
+    def _get_adapter(self):
+        """
+        Return the adapter for the configured backend, importing it on first use.
+        """
+        if self.adapter is not None:
+            return self.adapter
+        if self.db_type == 'postgresql':
+            from adapters.postgres import posgrestSQL
+            self.adapter = posgrestSQL()
+        elif self.db_type == 'mysql':
+            from adapters.mysql import mySQL
+            self.adapter = mySQL()
+        elif self.db_type == 'sqlite':
+            from adapters.sqlite import sqLite
+            self.adapter = sqLite()
+        else:
+            raise ValueError(f"Unsupported database type {self.db_type}")
+        return self.adapter
+
+    @contextmanager
+    def connection(self):
+        """
+        Yield a database connection for the configured backend.
+        Borrows from the attached MigrationSession when one is open, otherwise opens a new connection and closes it when the block exits.
+        """
+        if self.session is not None:
+            with self.session.connection() as conn:
+                yield conn
+            return
+
+        conn = self._get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
 
     def _get_connection(self):
         """
         Create and return a new database connection for the configured backend.
+        Connections are returned with autocommit off; callers commit explicitly.
         """
         if self.db_type == 'postgresql':
+            import psycopg2
             db_config_no_type = {k:v for k,v in self.db_config.items() if k != "type"}
-            return psycopg2.connect(**db_config_no_type)
+            conn = psycopg2.connect(**db_config_no_type)
+            conn.autocommit = False
+            return conn
         elif self.db_type == 'mysql':
+            import mysql.connector
             db_config_no_type = {k:v for k,v in self.db_config.items() if k != "type"}
-            return mysql.connector.connect(**self.db_config)
+            conn = mysql.connector.connect(**db_config_no_type)
+            conn.autocommit = False
+            return conn
+        elif self.db_type == 'sqlite':
+            return self._get_sqlite_connection()
+        raise ValueError(f"Unsupported database type {self.db_type}")
+
+    def _get_sqlite_connection(self):
+        """
+        Open a SQLite connection usable from the session pool and executor threads.
+        ':memory:' is mapped to a shared-cache in-memory database named after this registry, kept alive by an anchor connection for the registry's lifetime.
+        On Python 3.12+ the connection uses PEP 249 transactions, so DDL is transactional as well; older versions rely on the adapter opening transactions explicitly.
+        """
+        import sqlite3
+        database = str(self.db_config.get('database', ':memory:'))
+        options = {k:v for k,v in self.db_config.items() if k not in ("type", "database")}
+        options.setdefault('check_same_thread', False)
+        if sys.version_info >= (3, 12):
+            options.setdefault('autocommit', False)
+        if database == ':memory:':
+            database = f"file:schema_migrations_{self._memory_id}?mode=memory&cache=shared"
+            options['uri'] = True
+            if self._memory_anchor is None:
+                self._memory_anchor = sqlite3.connect(database, **options)
+        return sqlite3.connect(database, **options)
@@ -3,90 +3,154 @@ migration_rollback.py
 ---------------------
 Provides functionality to rollback database migrations to a specified target version. This includes reversing the effects of applied migrations and cleaning up the migration registry to reflect the rollback state.
 """
-from pathlib import Path
-import re
+import time
+from typing import Dict, List
 from .migration_registry import MigrationRegistry
-from .version_manager import VersionManager
+from .version_manager import Version, VersionManager
 from .migration_scanner import MigrationScanner
+from .events import ROLLBACK_STEP, ROLLBACK_FAIL, ROLLBACK
 
 class MigrationRollback():
     """
     Handles the rollback process for database migrations.
     This class is responsible for reversing migrations that were applied after a specified target version and updating the migration registry accordingly.
+    The whole down chain runs in one transaction with a savepoint per step, and registry rows are removed in that same transaction.
+    Backends without transactional DDL (MySQL) implicitly commit around DDL, which also drops savepoints, so there each step is committed together with the removal of its registry row instead, and a failure keeps the steps completed before it.
+    Each step emits rollback_step or rollback_fail, and the whole rollback emits rollback, to the registry's events hooks.
     """
-    def __init__(self, migration_dir: str, migration_registry: MigrationRegistry, rollback_target: object) -> None:
+    def __init__(self, migration_dir: str, migration_registry: MigrationRegistry, rollback_target: object, atomic: bool = True) -> None:
         """
         Initialize the MigrationRollback instance.
 
         Args:
-            migration_dir (str): Directory containing the down (rollback) migration files.
+            migration_dir (str): Directory containing the down (rollback) migration files, named with the version of the up migration they reverse.
             migration_registry (MigrationRegistry): Instance of MigrationRegistry for database operations.
-            rollback_target (object): Target migration object to rollback to (should be a file object).
+            rollback_target (object): Target migration to rollback to, as a file object (e.g. Path) or a version string such as 'V1.1'.
+            atomic (bool): Undo the entire rollback if any step fails. When False, the steps completed before the failing one are committed.
         """
         self.version_manager = VersionManager()
         self.migration_dir = migration_dir
         self.migration_registry = migration_registry
         self.rollback_target = rollback_target
+        self.atomic = atomic
         self.migration_scanner = MigrationScanner(migration_dir)
+        self._down_index = None
 
-    def clean_registry(self) -> None:
+    def target_version(self) -> Version:
         """
-        Remove migration records from the registry for all migrations with a version greater than the rollback target.
-        This ensures the registry accurately reflects the current state after rollback.
+        Return the version of the rollback target.
         """
-        file_version = self.version_manager.extract_version(self.rollback_target.name)
-        conn = None
-        cursor = None
-        try:
-            conn = self.migration_registry._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM schema_migrations WHERE version > ?", (file_version))
+        name = getattr(self.rollback_target, 'name', self.rollback_target)
+        if name.endswith('.sql'):
+            return self.version_manager.extract_version(name)
+        return self.version_manager.parse_version(name)
 
-            conn.commit()
-        except Exception as e:
-            print("Error", e)
-            if conn: conn.rollback()
+    def down_index(self) -> Dict[Version, Dict[str, any]]:
+        """
+        Scan the down directory once and index its migrations by version.
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+        Returns:
+            dict: Mapping of Version to down migration metadata.
+        """
+        if self._down_index is None:
+            self._down_index = {m["version_key"]: m for m in self.migration_scanner.discover_migrations()}
+        return self._down_index
 
-    def rollback(self):
+    def plan(self, applied_versions: List[str]) -> List[tuple]:
         """
-        Rollback all migrations with a version greater than the rollback target version.
-        This executes the corresponding down (rollback) SQL scripts in reverse order and cleans the migration registry.
+        Pair every applied version above the target with its down migration, newest first.
+
+        Args:
+            applied_versions (List[str]): Versions recorded in the registry.
+        Returns:
+            List[tuple]: (registry version, down migration) steps in execution order.
+        Raises:
+            ValueError: If an applied version above the target has no down migration.
         """
-        file_version = self.version_manager.extract_version(self.rollback_target.name)
-        migration_down_files = self.migration_scanner.discover_migrations()
+        target = self.target_version()
+        index = self.down_index()
+        versions = sorted((v for v in applied_versions if self.version_manager.parse_version(v) > target),
+                          key=self.version_manager.parse_version, reverse=True)
+        missing = [v for v in versions if self.version_manager.parse_version(v) not in index]
+        if missing:
+            raise ValueError(f"No down migration for {', '.join(missing)}")
+        return [(v, index[self.version_manager.parse_version(v)]) for v in versions]
 
-        migration_down_files = [m for m in migration_down_files if m["version"] > file_version]
-        conn = None
-        cursor = None
-        try:
-            conn = self.migration_registry._get_connection()
+    def clean_registry(self) -> None:
+        """
+        Remove migration records from the registry for all migrations with a version greater than the rollback target, without running down migrations.
+        This ensures the registry accurately reflects the current state after a rollback done by hand.
+        """
+        target = self.target_version()
+        adapter = self.migration_registry._get_adapter()
+        with self.migration_registry.connection() as conn:
             cursor = conn.cursor()
-            for migration in reversed(migration_down_files):
-                path = migration["path"]
+            try:
+                adapter.get_applied_migrations(cursor)
+                versions = [row[0] for row in cursor.fetchall() if self.version_manager.parse_version(row[0]) > target]
+                self.migration_registry.remove_migrations(versions, cursor=cursor)
+                conn.commit()
+            except Exception as e:
+                print("Error", e)
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
 
-                try:
-                    with open(path, 'r') as file:
-                        sql_statements = file.read()
-                        cursor.execute(sql_statements)
-                        conn.commit()
-                except Exception as e:
-                    print("Error", e)
-                    conn.rollback()
-                    raise
+    def rollback(self) -> List[str]:
+        """
+        Rollback all applied migrations with a version greater than the rollback target version.
+        This executes the corresponding down (rollback) SQL scripts in reverse order and deletes their registry rows, in a single transaction where the backend supports transactional DDL.
 
-            self.clean_registry()
+        Returns:
+            List[str]: Versions rolled back, newest first.
+        Raises:
+            ValueError: If an applied version above the target has no down migration. Nothing is executed in that case.
+        """
+        adapter = self.migration_registry._get_adapter()
+        events = self.migration_registry.events
+        target = str(getattr(self.rollback_target, 'name', self.rollback_target))
+        began = time.perf_counter()
+        rolled_back = []
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                adapter.begin(cursor)
+                adapter.get_applied_migrations(cursor)
+                steps = self.plan([row[0] for row in cursor.fetchall()])
 
-        except Exception as e:
-            print("Error", e)
-            conn.rollback()
+                for step, (version, down) in enumerate(steps):
+                    savepoint = f"rollback_step_{step}"
+                    print(f"Rolling back migration {version}...")
+                    step_began = time.perf_counter()
+                    if adapter.TRANSACTIONAL_DDL:
+                        adapter.savepoint(cursor, savepoint)
+                    try:
+                        with open(down["path"], 'r') as file:
+                            adapter.execute_script(cursor, file.read())
+                        self.migration_registry.remove_migrations([version], cursor=cursor)
+                        if adapter.TRANSACTIONAL_DDL:
+                            adapter.release_savepoint(cursor, savepoint)
+                        else:
+                            conn.commit()
+                    except Exception as e:
+                        print(f"Error {e} when rolling back migration {version}")
+                        events.emit(ROLLBACK_FAIL, version=version, error=str(e))
+                        if self.atomic or not adapter.TRANSACTIONAL_DDL:
+                            raise
+                        adapter.rollback_to_savepoint(cursor, savepoint)
+                        conn.commit()
+                        raise
+                    rolled_back.append(version)
+                    events.emit(ROLLBACK_STEP, version=version, seconds=time.perf_counter() - step_began)
 
-        finally:
-            cursor.close()
-            conn.close()
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                events.emit(ROLLBACK, target=target, rolled_back=0 if self.atomic and adapter.TRANSACTIONAL_DDL else len(rolled_back),
+                            success=False, seconds=time.perf_counter() - began)
+                raise
+            finally:
+                cursor.close()
+        events.emit(ROLLBACK, target=target, rolled_back=len(rolled_back), success=True, seconds=time.perf_counter() - began)
+        return rolled_back
@@ -4,25 +4,58 @@ migration_runner.py
 Coordinates the process of determining which migrations need to be applied and executes them against the database.
 """
 
-from typing import Dict, List
-from .migration_scanner import MigrationScanner
-from .migration_registry import MigrationRegistry
 import time
+from typing import Dict, List, Optional
+from .migration_scanner import MigrationScanner, checksum_matches
+from .migration_registry import MigrationRegistry
+from .migration_session import MigrationSession
+from .parallel_executor import ParallelMigrationExecutor
+from .migration_executor import execute_migration
+from .backfill import apply_backfill_migration, load_backfill
+from .version_manager import Version
+from .baseline import load_baseline
+from .catalog import capture_catalog
+from .migration_planner import MigrationPlanner, LARGE_TABLE_ROWS
+from .events import SCAN_START, SCAN_END, DIFF, LOCK_WAIT, MIGRATION_BEGIN, MIGRATION_COMMIT, MIGRATION_FAIL, RUN_END
 
 class MigrationRunner:
     """
     Handles the discovery, filtering, and application of migration files to the database.
+    Scan, diff, lock wait and per-migration events are emitted to the registry's events hooks.
     """ 
-    def __init__(self, migration_dir, migration_registry: MigrationRegistry) -> None:
+    def __init__(self, migration_dir, migration_registry: MigrationRegistry, checksum_algorithm: str = 'md5', server_diff: bool = False,
+                 profile_statements: bool = False, stream_threshold: Optional[int] = None, advisory_lock: bool = False,
+                 lock_timeout: float = 600, lock_poll_interval: float = 0.5, sleep=time.sleep, baseline_path: Optional[str] = None,
+                 catalog_snapshot: bool = False) -> None:
         """
         Initialize the MigrationRunner.
 
         Args:
             migration_dir (str): Directory containing migration files.
-            db_config (dict): Database configuration dictionary.
+            migration_registry (MigrationRegistry): Registry used for connections and recording applied migrations.
+            checksum_algorithm (str): Digest algorithm for newly recorded checksums. Rows recorded with another algorithm still validate.
+            server_diff (bool): Compare scanned migrations to the registry in the database instead of fetching every registry row.
+            profile_statements (bool): Execute migrations statement by statement and record each statement's duration, row count and lock wait in schema_migration_statements.
+            stream_threshold (int): Stream migration files of at least this many bytes with bounded memory, loading INSERT ... VALUES blocks in batches (COPY on PostgreSQL). None disables streaming.
+            advisory_lock (bool): Serialize concurrent runners against the same registry with a database lock, so only one of them applies migrations.
+            lock_timeout (float): Seconds to wait for the lock before giving up.
+            lock_poll_interval (float): Seconds between attempts to take the lock.
+            sleep (Callable): Function used to pause between lock attempts.
+            baseline_path (str): Baseline snapshot loaded before applying migrations when the database has no applied migrations yet.
+            catalog_snapshot (bool): After applying migrations, record a catalog snapshot of the schema at the newest version for drift checks.
         """
         self.migration_dir = migration_dir
         self.migration_registry = migration_registry
+        self.checksum_algorithm = checksum_algorithm
+        self.server_diff = server_diff
+        self.profile_statements = profile_statements
+        self.stream_threshold = stream_threshold
+        self.advisory_lock = advisory_lock
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self.sleep = sleep
+        self.baseline_path = baseline_path
+        self.catalog_snapshot = catalog_snapshot
 
     def get_applied_migrations(self) -> dict:
         """
@@ -31,71 +64,323 @@ class MigrationRunner:
         Returns:
             dict: Mapping of migration version to checksum.
         """
-        conn = self.migration_registry._get_connection()
-        try:
+        with self.migration_registry.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""SELECT version,checksum
-                           FROM schema_migrations
-                           ORDER BY version
-                           """)
-            return {row[0]: row[1] for row in cursor.fetchall()}
-        finally:
-            cursor.close()
-            conn.close()
+            try:
+                cursor.execute("""SELECT version,checksum
+                               FROM schema_migrations
+                               ORDER BY version
+                               """)
+                return {row[0]: row[1] for row in cursor.fetchall()}
+            finally:
+                cursor.close()
 
     def get_migrations_to_apply(self) -> List[Dict[str,any]]:
         """
         Determine which migrations need to be applied by comparing migration files to the registry.
         Also checks for checksum mismatches in already-applied migrations.
+        Files and registry rows are matched by Version, so the pending list keeps the scanner's version order.
 
         Returns:
             List[dict]: List of migration metadata dicts to apply.
         Raises:
             ValueError: If a migration file has been changed after being applied, or if no migration files are found.
         """
-        scanner = MigrationScanner(self.migration_dir)
+        events = self.migration_registry.events
+        scanner = MigrationScanner(self.migration_dir, algorithm=self.checksum_algorithm)
+        events.emit(SCAN_START, migration_dir=self.migration_dir)
+        began = time.perf_counter()
         migration_files = scanner.discover_migrations()
+        events.emit(SCAN_END, migration_dir=self.migration_dir, count=len(migration_files), seconds=time.perf_counter() - began)
         if not migration_files:
             raise ValueError("No migration files found")
-        applied_migrations = self.get_applied_migrations()
+
+        began = time.perf_counter()
+        if self.server_diff:
+            apply_migrations = self._diff_on_server(migration_files)
+        else:
+            apply_migrations = self._diff_locally(migration_files)
+        events.emit(DIFF, pending=len(apply_migrations), applied=len(migration_files) - len(apply_migrations),
+                    server_diff=self.server_diff, seconds=time.perf_counter() - began)
+        return apply_migrations
+
+    def plan_migrations(self, large_table_rows: int = LARGE_TABLE_ROWS) -> List[Dict[str,any]]:
+        """
+        Dry-run the pending migrations and estimate their cost and lock risk without applying anything.
+
+        Args:
+            large_table_rows (int): Row count from which a table counts as large.
+        Returns:
+            List[dict]: Per-migration plans as returned by MigrationPlanner.plan.
+        """
+        return MigrationPlanner(self.migration_registry, large_table_rows).plan(self.get_migrations_to_apply())
+
+    def _diff_locally(self, migration_files: List[Dict[str,any]]) -> List[Dict[str,any]]:
+        """
+        Fetch every registry row and compare it with the scanned migrations.
+
+        Args:
+            migration_files (List[dict]): Scanned migrations in version order.
+        Returns:
+            List[dict]: Migrations to apply, in version order.
+        Raises:
+            ValueError: If a migration file has been changed after being applied.
+        """
+        applied_migrations = {Version.parse(version): checksum for version, checksum in self.get_applied_migrations().items()}
         apply_migrations = []
         for migration in migration_files:
-            version,checksum = migration["version"], migration['checksum']
+            version = migration["version_key"]
             if version in applied_migrations:
-                if checksum != applied_migrations[version]:
+                if not checksum_matches(migration, applied_migrations[version]):
                     raise ValueError(f'Applied Migration {version} has been changed')
             else:
                 apply_migrations.append(migration)
         return apply_migrations
 
-    def run_migrations(self) -> None:
+    def _diff_on_server(self, migration_files: List[Dict[str,any]]) -> List[Dict[str,any]]:
+        """
+        Let the database return only unapplied and checksum-mismatched versions.
+        Mismatches are re-checked locally, since a row recorded with another checksum algorithm can still match the file.
+
+        Args:
+            migration_files (List[dict]): Scanned migrations in version order.
+        Returns:
+            List[dict]: Migrations to apply, in version order.
+        Raises:
+            ValueError: If a migration file has been changed after being applied.
+        """
+        by_version = {m["version"]: m for m in migration_files}
+        rows = self.migration_registry.get_pending_migrations([(m["version"], m["checksum"]) for m in migration_files])
+        pending = set()
+        for version, _, recorded_checksum in rows:
+            if recorded_checksum is None:
+                pending.add(version)
+            elif not checksum_matches(by_version[version], recorded_checksum):
+                raise ValueError(f'Applied Migration {version} has been changed')
+        return [m for m in migration_files if m["version"] in pending]
+
+    def run_migrations(self, batch: bool = False, batch_size: Optional[int] = None, max_workers: Optional[int] = None,
+                       to_apply: Optional[List[Dict[str,any]]] = None) -> str:
         """
         Apply all pending migrations to the database in order.
-        Records each migration in the registry after successful application.
+        Records each migration in the registry after successful application, and emits run_end with the outcome and duration.
+        Unless a MigrationSession is already attached to the registry, one is opened for the run (one connection per worker, plus the lock holder) so its calls share pooled connections.
+
+        Args:
+            batch (bool): Apply migrations and their registry rows in shared transactions instead of committing each migration and its registry row separately.
+            batch_size (int): In batch mode, number of migrations per commit group. Defaults to all pending migrations in a single transaction.
+            max_workers (int): Apply independent migrations concurrently on up to this many connections, following their dependency graph.
+            to_apply (List[dict]): Pending migrations from an earlier get_migrations_to_apply(), so the directory is not scanned again.
+                Ignored with advisory_lock, whose holder re-checks the registry, and when a baseline is loaded.
+        Returns:
+            str: "Migrations Applied" once every pending migration is applied, or "Up To Date" when running with advisory_lock and another runner already applied them.
         Raises:
-            ValueError: If there are no migrations to apply.
+            ValueError: If there are no migrations to apply and advisory_lock is off.
+            TimeoutError: If advisory_lock is on and the lock is not obtained within lock_timeout.
         """
-        to_apply = self.get_migrations_to_apply()
+        began = time.perf_counter()
+        session = None
+        if self.migration_registry.session is None:
+            session = MigrationSession(self.migration_registry, pool_size=(max_workers or 1) + 1).open()
+        try:
+            result = self._run(batch, batch_size, max_workers, to_apply)
+        except Exception as e:
+            self.migration_registry.events.emit(RUN_END, result=f"Error {e}", success=False, seconds=time.perf_counter() - began)
+            raise
+        finally:
+            if session is not None:
+                session.close()
+        self.migration_registry.events.emit(RUN_END, result=result, success=True, seconds=time.perf_counter() - began)
+        return result
+
+    def _run(self, batch: bool, batch_size: Optional[int], max_workers: Optional[int], to_apply: Optional[List[Dict[str,any]]]) -> str:
+        """
+        Apply pending migrations with or without the advisory lock. See run_migrations.
+        """
+        if batch and max_workers:
+            raise ValueError("Batch mode and parallel execution cannot be combined")
+        if self.baseline_path is not None and not self.migration_registry.exists():
+            self.migration_registry.initialize()
+        if self.advisory_lock:
+            return self._run_locked(batch, batch_size, max_workers)
+        if self._load_baseline_if_fresh() or to_apply is None:
+            to_apply = self.get_migrations_to_apply()
         if not to_apply:
             raise ValueError("No migrations to apply")
-        conn = self.migration_registry._get_connection()
-        conn.autocommit = False
-        try:
+        return self._apply_pending(to_apply, batch, batch_size, max_workers)
+
+    def _run_locked(self, batch: bool, batch_size: Optional[int], max_workers: Optional[int]) -> str:
+        """
+        Apply pending migrations while holding the registry's advisory lock.
+        A runner that finds nothing pending returns at once without locking. Otherwise it polls for the lock; whoever holds it re-checks the registry, so runners that waited behind the applier find everything applied and return.
+        If the lock holder dies, its lock is freed and the next runner applies whatever is still pending.
+
+        Args:
+            batch (bool): Passed through to the apply step.
+            batch_size (int): Passed through to the apply step.
+            max_workers (int): Passed through to the apply step.
+        Returns:
+            str: "Migrations Applied" or "Up To Date".
+        """
+        if not self.get_migrations_to_apply():
+            return "Up To Date"
+
+        adapter = self.migration_registry._get_adapter()
+        lock_name = self.migration_registry.lock_name
+        began = time.monotonic()
+        deadline = began + self.lock_timeout
+        with self.migration_registry.connection() as conn:
             cursor = conn.cursor()
-            for migration in to_apply:
-                print(f"Applying migration {migration['version']}...")
-                try:
-                    with open(migration["path"], 'r') as file:
-                        sql_statements = file.read()
-                    start = time.time()
-                    cursor.execute(sql_statements)
-                    end = time.time()
+            try:
+                attempts = 0
+                while True:
+                    attempts += 1
+                    acquired = adapter.try_advisory_lock(cursor, lock_name)
                     conn.commit()
-                    self.migration_registry.record_migration(migration,(end - start),"Applied")
-                except Exception as e:
-                    conn.rollback()
-                    print(f'Error {e} when applying migration {migration['version']}')
-                    raise
-        finally:
-            cursor.close()
-            conn.close()
+                    now = time.monotonic()
+                    if acquired or now >= deadline:
+                        self.migration_registry.events.emit(LOCK_WAIT, lock_name=lock_name, attempts=attempts, acquired=acquired, seconds=now - began)
+                        if acquired:
+                            break
+                        raise TimeoutError(f"Migration lock {lock_name} not acquired after {self.lock_timeout}s")
+                    self.sleep(self.lock_poll_interval)
+
+                try:
+                    self._load_baseline_if_fresh()
+                    to_apply = self.get_migrations_to_apply()
+                    if not to_apply:
+                        print("Migrations already applied by another runner")
+                        return "Up To Date"
+                    return self._apply_pending(to_apply, batch, batch_size, max_workers)
+                finally:
+                    try:
+                        conn.rollback()
+                        adapter.release_advisory_lock(cursor, lock_name)
+                        conn.commit()
+                    except Exception as e:
+                        print("Error", e)
+            finally:
+                cursor.close()
+
+    def _load_baseline_if_fresh(self) -> bool:
+        """
+        Load the configured baseline when the registry has no applied migrations.
+
+        Returns:
+            bool: True if a baseline was loaded.
+        """
+        if self.baseline_path is not None and not self.get_applied_migrations():
+            load_baseline(self.migration_registry, self.baseline_path, self.migration_dir)
+            return True
+        return False
+
+    def _apply_pending(self, to_apply: List[Dict[str,any]], batch: bool, batch_size: Optional[int], max_workers: Optional[int]) -> str:
+        """
+        Apply the given pending migrations sequentially, in commit groups or in parallel, then record a catalog snapshot if enabled.
+
+        Args:
+            to_apply (List[dict]): Pending migrations in apply order.
+            batch (bool): Apply in commit groups.
+            batch_size (int): Migrations per commit group.
+            max_workers (int): Apply independent migrations concurrently.
+        Returns:
+            str: "Migrations Applied".
+        """
+        if self.profile_statements:
+            self.migration_registry.initialize_profiling()
+        if max_workers:
+            ParallelMigrationExecutor(self.migration_registry, max_workers, self.profile_statements, self.stream_threshold).run(to_apply)
+        elif batch:
+            self._run_batched(to_apply, batch_size)
+        else:
+            self._run_sequential(to_apply)
+        if self.catalog_snapshot:
+            capture_catalog(self.migration_registry)
+        return "Migrations Applied"
+
+    def _run_sequential(self, to_apply: List[Dict[str,any]]) -> None:
+        """
+        Apply migrations one at a time, committing each migration and then writing its registry row.
+
+        Args:
+            to_apply (List[dict]): Pending migrations in apply order.
+        """
+        adapter = self.migration_registry._get_adapter()
+        events = self.migration_registry.events
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for migration in to_apply:
+                    print(f"Applying migration {migration['version']}...")
+                    events.emit(MIGRATION_BEGIN, version=migration["version"])
+                    began = time.perf_counter()
+                    try:
+                        if not apply_backfill_migration(self.migration_registry, migration):
+                            execution_ms, profiles = execute_migration(cursor, migration, adapter, self.profile_statements, self.stream_threshold)
+                            conn.commit()
+                            self.migration_registry.record_migration(migration,execution_ms,"Applied")
+                            self.migration_registry.record_statement_profiles(migration["version"], profiles)
+                    except Exception as e:
+                        conn.rollback()
+                        print(f'Error {e} when applying migration {migration["version"]}')
+                        events.emit(MIGRATION_FAIL, version=migration["version"], seconds=time.perf_counter() - began, error=str(e))
+                        raise
+                    events.emit(MIGRATION_COMMIT, version=migration["version"], seconds=time.perf_counter() - began)
+            finally:
+                cursor.close()
+
+    def _run_batched(self, to_apply: List[Dict[str,any]], batch_size: Optional[int]) -> None:
+        """
+        Apply migrations in commit groups, writing each registry row on the same cursor as its migration.
+        A failure rolls back the whole group, so the registry never disagrees with the applied schema.
+        Note that MySQL implicitly commits around DDL statements, so groups are only atomic for DML there.
+        Backfill migrations commit per chunk, so the group before a backfill is committed first.
+        migration_commit events for a group are emitted once the group commits, each with its own execution time.
+
+        Args:
+            to_apply (List[dict]): Pending migrations in apply order.
+            batch_size (int): Migrations per commit group, or None for a single transaction.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        group_size = batch_size or len(to_apply)
+        adapter = self.migration_registry._get_adapter()
+        events = self.migration_registry.events
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for i in range(0, len(to_apply), group_size):
+                    group = to_apply[i:i + group_size]
+                    executed = []
+                    try:
+                        for migration in group:
+                            print(f"Applying migration {migration['version']}...")
+                            events.emit(MIGRATION_BEGIN, version=migration["version"])
+                            began = time.perf_counter()
+                            if load_backfill(migration["path"]) is not None:
+                                conn.commit()
+                                self._emit_commits(executed)
+                                executed = []
+                                apply_backfill_migration(self.migration_registry, migration)
+                                self._emit_commits([(migration, time.perf_counter() - began)])
+                                continue
+                            execution_ms, profiles = execute_migration(cursor, migration, adapter, self.profile_statements, self.stream_threshold)
+                            self.migration_registry.record_migration(migration,execution_ms,"Applied", cursor=cursor)
+                            self.migration_registry.record_statement_profiles(migration["version"], profiles, cursor=cursor)
+                            executed.append((migration, time.perf_counter() - began))
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        print(f'Error {e} when applying migrations {group[0]["version"]}..{group[-1]["version"]}')
+                        events.emit(MIGRATION_FAIL, version=migration["version"], seconds=time.perf_counter() - began, error=str(e))
+                        raise
+                    self._emit_commits(executed)
+            finally:
+                cursor.close()
+
+    def _emit_commits(self, executed: List[tuple]) -> None:
+        """
+        Emit migration_commit for (migration, seconds) pairs that have just been committed.
+        """
+        for migration, seconds in executed:
+            self.migration_registry.events.emit(MIGRATION_COMMIT, version=migration["version"], seconds=seconds)
@@ -5,11 +5,39 @@ Scans the migration directory for migration files, extracts metadata, and comput
 """
 
 import os
-import re
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from .version_manager import VersionManager
+from typing import List, Dict, Any, Optional, Tuple
+from .version_manager import VersionManager, parse_filename
+from .checksum_manifest import ChecksumManifest
+
+# Environment variable naming the directory that holds checksum manifests.
+# Defaults to schema-migrations under the user cache directory, outside the versioned migration sources.
+MANIFEST_DIR_ENV = "MIGRATION_CACHE_DIR"
+
+# Files are hashed in chunks of this many bytes so large seed files are never fully buffered.
+CHUNK_SIZE = 1024 * 1024
+
+# Checksums other than md5 are stored as "<algorithm>:<hexdigest>" and must fit the VARCHAR(64) checksum column.
+SUPPORTED_ALGORITHMS = ('md5', 'blake2b')
+
+
+def default_manifest_path(migration_dir: str) -> str:
+    """
+    Return the manifest file of a migration directory, named after a hash of its absolute path.
+    Manifests live in $MIGRATION_CACHE_DIR, else $XDG_CACHE_HOME/schema-migrations, else ~/.cache/schema-migrations.
+
+    Args:
+        migration_dir (str): Path to the directory containing migration files.
+    Returns:
+        str: Path of the manifest file.
+    """
+    cache_dir = os.environ.get(MANIFEST_DIR_ENV)
+    if not cache_dir:
+        cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "schema-migrations")
+    key = hashlib.sha256(os.path.abspath(migration_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"checksums-{key}.json")
 
 
 class MigrationScanner:
@@ -17,48 +45,137 @@ class MigrationScanner:
     Scans a directory for migration files, extracts version and description, and computes checksums.
     """
 
-    def __init__(self, migration_dir: str) -> None:
+    def __init__(self, migration_dir: str, use_manifest: bool = True, manifest_path: Optional[str] = None,
+                 algorithm: str = 'md5', max_workers: Optional[int] = None) -> None:
         """
         Initialize the MigrationScanner.
 
         Args:
             migration_dir (str): Path to the directory containing migration files.
+            use_manifest (bool): Persist checksums to a manifest file so unchanged files are not re-hashed on the next run.
+            manifest_path (str): Location of the manifest file. Defaults to default_manifest_path(migration_dir).
+            algorithm (str): Digest algorithm for new checksums, one of SUPPORTED_ALGORITHMS.
+            max_workers (int): Threads used to hash files that miss the cache. Defaults to the ThreadPoolExecutor default.
         """
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported checksum algorithm {algorithm}")
         self.migration_dir = migration_dir
         self.version_manager = VersionManager()
+        if use_manifest and manifest_path is None:
+            manifest_path = default_manifest_path(migration_dir)
+        self.manifest_path = manifest_path if use_manifest else None
+        self.algorithm = algorithm
+        self.max_workers = max_workers
 
     def discover_migrations(self) -> List[Dict[str, Any]]:
         """
         Discover and return metadata for all migration files in the directory.
+        Files missing from the checksum cache are hashed concurrently.
+        Each filename is parsed once into a Version, and the files are sorted once by it.
         Returns:
-            List[dict]: List of migration metadata dicts, sorted by version.
+            List[dict]: List of migration metadata dicts, sorted by version. "version" is the registry string and "version_key" the parsed Version.
         """
         migrations = []
+        misses = []
 
-        migration_files = Path(self.migration_dir).glob('V*.*__*.sql')
+        entries = []
+        for file_path in Path(self.migration_dir).glob('V*__*.sql'):
+            parsed = parse_filename(file_path.name)
+            if parsed is not None:
+                entries.append((parsed[0], parsed[1], file_path))
+        entries.sort(key=lambda entry: entry[0])
+        manifest = ChecksumManifest(self.manifest_path)
 
-        sorted_files = self.version_manager.order_migrations(migration_files)
+        for version, description, file_path in entries:
+            stat = file_path.stat()
+            checksum = manifest.lookup(str(file_path), stat)
+            if checksum is not None and split_checksum(checksum)[0] != self.algorithm:
+                checksum = None
 
-        for file_path in sorted_files:
-            # Extract Version and description
-
-            match = re.match(r'V(\d+(?:\.\d+)?)__(.+)\.sql', file_path.name)
-            if not match:
-                continue
-
-            version, description = match.groups()
-
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                checksum = hashlib.md5(content).hexdigest()
-
-            migrations.append({
-                'version': f"V{version}",
+            migration = {
+                'version': str(version),
+                'version_key': version,
                 'description': description.replace('_', ''),
                 "filename": file_path.name,
                 "path": str(file_path),
                 'checksum': checksum,
-            })
+            }
+            if checksum is None:
+                misses.append((migration, stat))
+            migrations.append(migration)
+
+        if len(misses) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                checksums = list(pool.map(lambda miss: compute_checksum(miss[0]["path"], self.algorithm), misses))
+        else:
+            checksums = [compute_checksum(miss[0]["path"], self.algorithm) for miss in misses]
+
+        for (migration, stat), checksum in zip(misses, checksums):
+            migration['checksum'] = checksum
+            manifest.store(migration["path"], stat, checksum)
+
+        manifest.prune(m["filename"] for m in migrations)
+        manifest.save()
 
         # Migrations are returned in sorted order DO NOT RESORT!
         return migrations
+
+
+def compute_checksum(path: str, algorithm: str = 'md5') -> str:
+    """
+    Hash a file in fixed-size chunks.
+
+    Args:
+        path (str): Path of the file to hash.
+        algorithm (str): Digest algorithm, one of SUPPORTED_ALGORITHMS.
+    Returns:
+        str: The checksum, tagged with its algorithm unless it is md5.
+    """
+    if algorithm == 'md5':
+        digest = hashlib.md5()
+    elif algorithm == 'blake2b':
+        digest = hashlib.blake2b(digest_size=16)
+    else:
+        raise ValueError(f"Unsupported checksum algorithm {algorithm}")
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    if algorithm == 'md5':
+        return digest.hexdigest()
+    return f"{algorithm}:{digest.hexdigest()}"
+
+
+def split_checksum(checksum: str) -> Tuple[str, str]:
+    """
+    Split a stored checksum into its algorithm tag and hex digest. Untagged checksums are md5.
+
+    Args:
+        checksum (str): Checksum as stored in schema_migrations.
+    Returns:
+        Tuple[str, str]: (algorithm, hexdigest)
+    """
+    if ':' in checksum:
+        algorithm, hexdigest = checksum.split(':', 1)
+        return algorithm, hexdigest
+    return 'md5', checksum
+
+
+def checksum_matches(migration: Dict[str, Any], stored_checksum: str) -> bool:
+    """
+    Check a scanned migration against the checksum recorded when it was applied.
+    If the stored checksum used a different algorithm, the file is re-hashed with that algorithm.
+
+    Args:
+        migration (dict): Migration metadata from discover_migrations.
+        stored_checksum (str): Checksum from the registry.
+    Returns:
+        bool: True if the file is unchanged since it was applied.
+    """
+    if migration['checksum'] == stored_checksum:
+        return True
+    algorithm = split_checksum(stored_checksum)[0]
+    if algorithm == split_checksum(migration['checksum'])[0] or algorithm not in SUPPORTED_ALGORITHMS:
+        return False
+    return compute_checksum(migration['path'], algorithm) == stored_checksum
@@ -0,0 +1,124 @@
+"""
+migration_session.py
+--------------------
+Provides a session-scoped connection provider so the runner, registry and rollback can share one connection (or a small pool) for a whole migration run instead of reconnecting for every call.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class MigrationSession:
+    """
+    Holds a small pool of database connections for the duration of a migration run.
+    While a session is open it is attached to its MigrationRegistry, so every component using that registry borrows connections from the pool.
+    """
+
+    def __init__(self, migration_registry, pool_size: int = 1, acquire_timeout: float = 30) -> None:
+        """
+        Initialize the MigrationSession.
+
+        Args:
+            migration_registry (MigrationRegistry): Registry whose connection settings are used to open connections.
+            pool_size (int): Maximum number of connections held open by the session.
+            acquire_timeout (float): Seconds to wait for a free connection when the pool is exhausted.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.migration_registry = migration_registry
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def open(self):
+        """
+        Attach the session to its registry so connections are borrowed from the pool.
+
+        Returns:
+            MigrationSession: The opened session.
+        """
+        self.migration_registry.session = self
+        return self
+
+    def close(self) -> None:
+        """
+        Detach the session from its registry and close every pooled connection.
+        """
+        if self.migration_registry.session is self:
+            self.migration_registry.session = None
+        with self._lock:
+            connections, self._connections = self._connections, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print("Error", e)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection from the pool for the duration of the with-block.
+        Nested borrows on the same thread reuse the connection already held by that thread, so a caller holding a connection never waits on itself.
+        If the block raises, any open transaction on the connection is rolled back before it returns to the pool.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def _acquire(self):
+        """
+        Take an idle connection, opening a new one while the pool is below pool_size.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self.pool_size:
+                conn = self.migration_registry._get_connection()
+                self._connections.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection available after {self.acquire_timeout}s")
+
+    def _release(self, conn) -> None:
+        """
+        Return a connection to the pool, discarding it if it has been closed.
+        """
+        if getattr(conn, 'closed', False):
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            return
+        self._idle.put(conn)
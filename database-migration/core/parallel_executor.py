@@ -0,0 +1,258 @@
+"""
+parallel_executor.py
+--------------------
+Builds a dependency graph over pending migrations and applies independent migrations concurrently on separate connections, while dependent migrations keep their version order.
+"""
+
+import heapq
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, List, Optional, Set
+from .migration_registry import MigrationRegistry
+from .migration_executor import execute_migration
+from .sql_splitter import StatementSplitter
+from .streaming_executor import READ_CHUNK_CHARS
+from .backfill import apply_backfill_migration
+from .version_manager import Version
+from .events import MIGRATION_BEGIN, MIGRATION_COMMIT, MIGRATION_FAIL
+
+DEPENDS_PATTERN = re.compile(r'^\s*--\s*depends\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+
+# Statements whose target tables can be read from the SQL. Any other statement (functions, DO blocks, views, ...)
+# makes its migration a barrier that runs alone, after everything before it and before everything after it.
+TABLE_PATTERNS = [
+    re.compile(r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?:[\w."]+\s+)?ON\s+(?:ONLY\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*CREATE\s+(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?([\w.",\s]+)', re.IGNORECASE),
+    re.compile(r'^\s*DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?[\w."]+\s+ON\s+([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*INSERT\s+(?:IGNORE\s+)?INTO\s+([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*UPDATE\s+(?:ONLY\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*DELETE\s+FROM\s+(?:ONLY\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*TRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?([\w.",\s]+)', re.IGNORECASE),
+    re.compile(r'^\s*COMMENT\s+ON\s+TABLE\s+([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*COMMENT\s+ON\s+COLUMN\s+([\w."]+)\.[\w"]+\s', re.IGNORECASE),
+]
+REFERENCE_PATTERN = re.compile(r'\b(?:REFERENCES|FROM|JOIN)\s+([\w."]+)', re.IGNORECASE)
+
+
+def analyze_migration(sql: str, dialect: str = 'postgresql') -> Dict[str, any]:
+    """
+    Extract declared dependencies and touched tables from a migration's SQL.
+    Declared dependencies use a header comment such as "-- depends: V1.1, V1.2".
+
+    Args:
+        sql (str): Contents of the migration file.
+        dialect (str): 'postgresql', 'mysql' or 'sqlite'.
+    Returns:
+        dict: {"depends": set of versions, "tables": set of table names, "barrier": bool}
+    """
+    return _analyze_chunks([sql], dialect)
+
+
+def analyze_migration_file(path: str, dialect: str = 'postgresql') -> Dict[str, any]:
+    """
+    Analyze a migration file like analyze_migration, reading it in chunks so that only the statement being parsed is held in memory.
+
+    Args:
+        path (str): Migration file path.
+        dialect (str): 'postgresql', 'mysql' or 'sqlite'.
+    Returns:
+        dict: {"depends": set of versions, "tables": set of table names, "barrier": bool}
+    """
+    with open(path, 'r') as file:
+        return _analyze_chunks(iter(lambda: file.read(READ_CHUNK_CHARS), ''), dialect)
+
+
+def _analyze_chunks(chunks: Iterable[str], dialect: str) -> Dict[str, any]:
+    """
+    Analyze SQL arriving in pieces, one statement at a time.
+    """
+    analysis = {"depends": set(), "tables": set(), "barrier": False}
+    splitter = StatementSplitter(dialect)
+    for chunk in chunks:
+        for statement in splitter.feed(chunk):
+            _analyze_statement(statement, analysis)
+    # A trailing comment-only fragment is not a statement but may still declare dependencies.
+    _analyze_depends(splitter.pending(), analysis)
+    for statement in splitter.finish():
+        _analyze_statement(statement, analysis)
+    return analysis
+
+
+def _analyze_depends(text: str, analysis: Dict[str, any]) -> None:
+    for match in DEPENDS_PATTERN.finditer(text):
+        analysis["depends"].update(v.strip() for v in match.group(1).split(',') if v.strip())
+
+
+def _analyze_statement(statement: str, analysis: Dict[str, any]) -> None:
+    """
+    Add one statement's declared dependencies and tables to an analysis, marking it a barrier if the statement's tables cannot be read.
+    """
+    _analyze_depends(statement, analysis)
+    statement = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', statement, flags=re.DOTALL)
+    for pattern in TABLE_PATTERNS:
+        match = pattern.match(statement)
+        if match:
+            analysis["tables"].update(_table_names(match.group(1)))
+            break
+    else:
+        analysis["barrier"] = True
+    for reference in REFERENCE_PATTERN.findall(statement):
+        analysis["tables"].update(_table_names(reference))
+
+
+def build_dependency_graph(migrations: List[Dict[str, any]]) -> List[Set[int]]:
+    """
+    Compute, for each migration, the indexes of earlier migrations it must wait for.
+    A migration depends on its declared dependencies, on the previous migration touching any of its tables, and on the surrounding barrier migrations.
+    Declared dependencies are matched by Version, so "V1.01" and "V1.1" name the same migration.
+
+    Args:
+        migrations (List[dict]): Pending migrations in version order, each with an "analysis" from analyze_migration.
+    Returns:
+        List[Set[int]]: Dependency index sets, parallel to migrations.
+    """
+    index_by_version = {Version.parse(m["version"]): i for i, m in enumerate(migrations)}
+    last_toucher: Dict[str, int] = {}
+    last_barrier = None
+    since_barrier: List[int] = []
+    graph = []
+
+    for i, migration in enumerate(migrations):
+        analysis = migration["analysis"]
+        declared = [Version.parse(v) for v in analysis["depends"]]
+        deps = {index_by_version[v] for v in declared if index_by_version.get(v, i) < i}
+        if analysis["barrier"]:
+            deps.update(since_barrier)
+            if last_barrier is not None:
+                deps.add(last_barrier)
+            last_barrier = i
+            since_barrier = []
+        else:
+            if last_barrier is not None:
+                deps.add(last_barrier)
+            since_barrier.append(i)
+        for table in analysis["tables"]:
+            if table in last_toucher:
+                deps.add(last_toucher[table])
+            last_toucher[table] = i
+        graph.append(deps)
+
+    return graph
+
+
+class ParallelMigrationExecutor:
+    """
+    Applies pending migrations concurrently according to their dependency graph.
+    Each migration runs in its own transaction on a connection borrowed from the registry; MigrationRunner.run_migrations opens a MigrationSession sized for max_workers so those connections are reused.
+    """
+
+    def __init__(self, migration_registry: MigrationRegistry, max_workers: int = 4, profile_statements: bool = False,
+                 stream_threshold: Optional[int] = None) -> None:
+        """
+        Initialize the ParallelMigrationExecutor.
+
+        Args:
+            migration_registry (MigrationRegistry): Registry used for connections and recording applied migrations.
+            max_workers (int): Maximum number of migrations applied at the same time.
+            profile_statements (bool): Execute statement by statement and record per-statement profiles.
+            stream_threshold (int): Stream migration files of at least this many bytes. None disables streaming.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.migration_registry = migration_registry
+        self.max_workers = max_workers
+        self.profile_statements = profile_statements
+        self.stream_threshold = stream_threshold
+
+    def run(self, to_apply: List[Dict[str, any]]) -> List[str]:
+        """
+        Apply migrations, starting each as soon as its dependencies have committed.
+        Ready migrations are started in version order. After a failure no new migrations are started, the running ones finish, and the first error is raised.
+
+        Args:
+            to_apply (List[dict]): Pending migrations in version order.
+        Returns:
+            List[str]: Versions in the order they committed.
+        """
+        dialect = self.migration_registry._get_adapter().DIALECT
+        for migration in to_apply:
+            migration["analysis"] = analyze_migration_file(migration["path"], dialect)
+        graph = build_dependency_graph(to_apply)
+        dependents: List[List[int]] = [[] for _ in to_apply]
+        remaining = [len(deps) for deps in graph]
+        for i, deps in enumerate(graph):
+            for dep in deps:
+                dependents[dep].append(i)
+
+        ready = [i for i, count in enumerate(remaining) if count == 0]
+        heapq.heapify(ready)
+        committed = []
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while ready or running:
+                while ready and error is None and len(running) < self.max_workers:
+                    i = heapq.heappop(ready)
+                    running[pool.submit(self._apply, to_apply[i])] = i
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    committed.append(to_apply[i]["version"])
+                    for dependent in dependents[i]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            heapq.heappush(ready, dependent)
+
+        if error is not None:
+            raise error
+        return committed
+
+    def _apply(self, migration: Dict[str, any]) -> None:
+        """
+        Apply one migration in its own transaction and record it in the registry.
+        Events are emitted from the worker thread.
+        """
+        print(f"Applying migration {migration['version']}...")
+        events = self.migration_registry.events
+        events.emit(MIGRATION_BEGIN, version=migration["version"])
+        began = time.perf_counter()
+        with self.migration_registry.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if not apply_backfill_migration(self.migration_registry, migration):
+                    execution_ms, profiles = execute_migration(cursor, migration, self.migration_registry._get_adapter(), self.profile_statements, self.stream_threshold)
+                    self.migration_registry.record_migration(migration,execution_ms,"Applied", cursor=cursor)
+                    self.migration_registry.record_statement_profiles(migration["version"], profiles, cursor=cursor)
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f'Error {e} when applying migration {migration["version"]}')
+                events.emit(MIGRATION_FAIL, version=migration["version"], seconds=time.perf_counter() - began, error=str(e))
+                raise
+            finally:
+                cursor.close()
+        events.emit(MIGRATION_COMMIT, version=migration["version"], seconds=time.perf_counter() - began)
+
+
+def _table_names(raw: str) -> List[str]:
+    """
+    Normalize a captured table reference or comma-separated list into lower-case unquoted names.
+    """
+    names = []
+    for name in raw.split(','):
+        name = name.strip().split()[0] if name.strip() else ''
+        name = name.replace('"', '').lower()
+        if name and name not in ('if', 'only', 'cascade', 'restrict'):
+            names.append(name)
+    return names
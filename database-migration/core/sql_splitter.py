@@ -0,0 +1,218 @@
+"""
+sql_splitter.py
+---------------
+Splits migration SQL into individual statements for PostgreSQL, MySQL and SQLite, respecting quoted strings and identifiers, dollar-quoted bodies and comments. Input can be fed incrementally, so files never need to be loaded whole.
+"""
+
+import re
+from typing import List
+
+NORMAL, SINGLE_QUOTE, DOUBLE_QUOTE, BACKTICK, LINE_COMMENT, BLOCK_COMMENT, DOLLAR_QUOTE = range(7)
+
+DOLLAR_TAG = re.compile(r'\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$')
+PARTIAL_DOLLAR_TAG = re.compile(r'\$(?:[A-Za-z_][A-Za-z0-9_]*)?')
+QUOTE_STATES = {"'": SINGLE_QUOTE, '"': DOUBLE_QUOTE, '`': BACKTICK}
+QUOTE_CHARS = {SINGLE_QUOTE: "'", DOUBLE_QUOTE: '"', BACKTICK: '`'}
+
+
+class StatementSplitter:
+    """
+    Incremental, dialect-aware SQL statement splitter.
+    Feed text with feed() and collect finished statements; call finish() at the end of input for the trailing statement.
+    Statements are returned without their terminating semicolon, and comment-only fragments are dropped.
+    MySQL client-side DELIMITER commands are not supported.
+    """
+
+    def __init__(self, dialect: str = 'postgresql') -> None:
+        """
+        Initialize the StatementSplitter.
+
+        Args:
+            dialect (str): 'postgresql', 'mysql' or 'sqlite'.
+        """
+        self.dialect = dialect
+        self._buffer = ''
+        self._start = 0
+        self._pos = 0
+        self._state = NORMAL
+        self._backslash_escapes = False
+        self._dollar_tag = None
+        self._comment_depth = 0
+        self._has_code = False
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text to the splitter.
+
+        Args:
+            text (str): Next piece of SQL input.
+        Returns:
+            List[str]: Statements completed by this piece of input.
+        """
+        self._buffer += text
+        return self._scan(final=False)
+
+    def finish(self) -> List[str]:
+        """
+        Signal the end of input.
+
+        Returns:
+            List[str]: Any remaining statements, including one without a trailing semicolon.
+        """
+        statements = self._scan(final=True)
+        tail = self._buffer[self._start:].strip()
+        if tail and self._has_code:
+            statements.append(tail)
+        self._buffer, self._start, self._pos, self._has_code = '', 0, 0, False
+        return statements
+
+    def pending(self) -> str:
+        """
+        Return the text of the statement currently being accumulated.
+        """
+        return self._buffer[self._start:]
+
+    def _scan(self, final: bool) -> List[str]:
+        """
+        Advance the state machine over buffered input, stopping early when a token may continue in the next piece of input.
+        """
+        buf = self._buffer
+        n = len(buf)
+        i = self._pos
+        mysql = self.dialect == 'mysql'
+        statements = []
+
+        while i < n:
+            state = self._state
+            c = buf[i]
+
+            if state == NORMAL:
+                if c == ';':
+                    if self._has_code:
+                        statements.append(buf[self._start:i].strip())
+                    self._start = i + 1
+                    self._has_code = False
+                    i += 1
+                elif c in QUOTE_STATES and (c != '`' or self.dialect != 'postgresql'):
+                    self._state = QUOTE_STATES[c]
+                    self._backslash_escapes = mysql and c != '`' or (
+                        c == "'" and i > 0 and buf[i - 1] in 'eE' and (i < 2 or not (buf[i - 2].isalnum() or buf[i - 2] == '_')))
+                    self._has_code = True
+                    i += 1
+                elif c == '-' or c == '/':
+                    if i + 1 >= n and not final:
+                        break
+                    nxt = buf[i + 1] if i + 1 < n else ''
+                    if c == '-' and nxt == '-':
+                        if mysql and i + 2 >= n and not final:
+                            break
+                        if not mysql or i + 2 >= n or buf[i + 2].isspace():
+                            self._state = LINE_COMMENT
+                            i += 2
+                            continue
+                    elif c == '/' and nxt == '*':
+                        self._state = BLOCK_COMMENT
+                        self._comment_depth = 1
+                        i += 2
+                        continue
+                    self._has_code = True
+                    i += 1
+                elif c == '#' and mysql:
+                    self._state = LINE_COMMENT
+                    i += 1
+                elif c == '$' and self.dialect == 'postgresql':
+                    match = DOLLAR_TAG.match(buf, i)
+                    if match:
+                        self._state = DOLLAR_QUOTE
+                        self._dollar_tag = match.group(0)
+                        self._has_code = True
+                        i = match.end()
+                        continue
+                    if not final and PARTIAL_DOLLAR_TAG.fullmatch(buf, i):
+                        break
+                    self._has_code = True
+                    i += 1
+                else:
+                    if not c.isspace():
+                        self._has_code = True
+                    i += 1
+
+            elif state in QUOTE_CHARS:
+                quote = QUOTE_CHARS[state]
+                if self._backslash_escapes:
+                    j = i
+                    while j < n and buf[j] != quote and buf[j] != '\\':
+                        j += 1
+                else:
+                    j = buf.find(quote, i)
+                    if j < 0:
+                        j = n
+                if j >= n:
+                    i = n
+                    break
+                if buf[j] == '\\':
+                    if j + 1 >= n and not final:
+                        i = j
+                        break
+                    i = j + 2
+                    continue
+                if j + 1 >= n and not final:
+                    i = j
+                    break
+                if j + 1 < n and buf[j + 1] == quote:
+                    i = j + 2
+                    continue
+                self._state = NORMAL
+                i = j + 1
+
+            elif state == LINE_COMMENT:
+                j = buf.find('\n', i)
+                if j < 0:
+                    i = n
+                    break
+                self._state = NORMAL
+                i = j + 1
+
+            elif state == BLOCK_COMMENT:
+                if (c == '*' or c == '/') and i + 1 >= n and not final:
+                    break
+                nxt = buf[i + 1] if i + 1 < n else ''
+                if c == '*' and nxt == '/':
+                    self._comment_depth -= 1
+                    if self._comment_depth == 0:
+                        self._state = NORMAL
+                    i += 2
+                elif c == '/' and nxt == '*' and self.dialect == 'postgresql':
+                    self._comment_depth += 1
+                    i += 2
+                else:
+                    i += 1
+
+            elif state == DOLLAR_QUOTE:
+                j = buf.find(self._dollar_tag, i)
+                if j < 0:
+                    i = max(i, n - len(self._dollar_tag) + 1)
+                    break
+                self._state = NORMAL
+                i = j + len(self._dollar_tag)
+
+        if self._start > 0:
+            self._buffer = buf[self._start:]
+            i -= self._start
+            self._start = 0
+        self._pos = i
+        return statements
+
+
+def split_statements(sql: str, dialect: str = 'postgresql') -> List[str]:
+    """
+    Split a SQL script into statements.
+
+    Args:
+        sql (str): SQL script.
+        dialect (str): 'postgresql', 'mysql' or 'sqlite'.
+    Returns:
+        List[str]: Statements in script order, without terminating semicolons.
+    """
+    splitter = StatementSplitter(dialect)
+    return splitter.feed(sql) + splitter.finish()
@@ -0,0 +1,301 @@
+"""
+streaming_executor.py
+---------------------
+Executes large migration files incrementally with bounded memory. Ordinary statements are executed as they are parsed, and bulk INSERT ... VALUES blocks are turned into batched bulk loads (COPY on PostgreSQL, executemany on MySQL).
+"""
+
+import re
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+from .sql_splitter import StatementSplitter
+
+# Characters read from the migration file per step.
+READ_CHUNK_CHARS = 64 * 1024
+
+# INSERT ... VALUES statements still incomplete after buffering this many characters are switched to row streaming.
+# Smaller statements are executed exactly as written.
+STREAM_INSERT_CHARS = 1024 * 1024
+
+INSERT_HEADER = re.compile(
+    r'^\s*(?:(?:--[^\n]*\n|/\*.*?\*/)\s*)*INSERT\s+INTO\s+([\w."`]+)\s*(?:\(([^)]*)\))?\s*VALUES\s*(?=\()',
+    re.IGNORECASE | re.DOTALL,
+)
+NUMBER = re.compile(r'[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?')
+KEYWORDS = {'null': None, 'true': True, 'false': False}
+MYSQL_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', 'b': '\b', 'Z': '\x1a'}
+
+
+class NonLiteralRow(Exception):
+    """
+    Raised when a VALUES tuple contains an expression that cannot be sent as a bound parameter.
+    """
+
+
+class StreamingExecutor:
+    """
+    Streams a migration file into the database in bounded memory.
+    INSERT ... VALUES statements longer than STREAM_INSERT_CHARS are parsed tuple by tuple and loaded in batches of batch_rows; tuples containing expressions such as NOW() are flushed and executed as single-row INSERTs, preserving row order.
+    Streamed INSERTs with a trailing clause (ON CONFLICT, ON DUPLICATE KEY UPDATE, RETURNING) are rejected, since earlier batches cannot honour it.
+    """
+
+    def __init__(self, cursor, adapter, batch_rows: int = 1000, on_statement: Optional[Callable[[str, int, Optional[int]], None]] = None) -> None:
+        """
+        Initialize the StreamingExecutor.
+
+        Args:
+            cursor: Database cursor of the caller's transaction.
+            adapter (Adapter): Adapter for the target backend.
+            batch_rows (int): Rows per bulk load.
+            on_statement (Callable): Optional callback receiving (statement text, duration ms, row count) for each executed statement or batch.
+        """
+        self.cursor = cursor
+        self.adapter = adapter
+        self.batch_rows = batch_rows
+        self.on_statement = on_statement
+        self.mysql = adapter.DIALECT == 'mysql'
+
+    def execute_file(self, path: str) -> None:
+        """
+        Execute every statement in the file at path.
+
+        Args:
+            path (str): Migration file path.
+        """
+        self._splitter = StatementSplitter(self.adapter.DIALECT)
+        self._rows = None
+        with open(path, 'r') as file:
+            while True:
+                chunk = file.read(READ_CHUNK_CHARS)
+                self._consume(chunk, final=not chunk)
+                if not chunk:
+                    break
+
+    def _consume(self, text: str, final: bool) -> None:
+        """
+        Route input to the current INSERT row stream or to the statement splitter, switching to row streaming whenever the pending statement is an INSERT ... VALUES.
+        """
+        while True:
+            if self._rows is not None:
+                rest = self._rows.feed(text, final)
+                if rest is None:
+                    return
+                self._rows = None
+                text = rest
+            for statement in self._splitter.feed(text):
+                self._execute(statement)
+            pending = self._splitter.pending()
+            header = INSERT_HEADER.match(pending) if len(pending) >= STREAM_INSERT_CHARS else None
+            if header is None:
+                if final:
+                    for statement in self._splitter.finish():
+                        self._execute(statement)
+                return
+            self._rows = InsertRowStream(self, header.group(1), header.group(2), self.mysql)
+            text = pending[header.end():]
+            self._splitter = StatementSplitter(self.adapter.DIALECT)
+
+    def _execute(self, statement: str) -> None:
+        """
+        Execute one complete statement.
+        """
+        start = time.perf_counter()
+        self.cursor.execute(statement)
+        self._report(statement, start, self.cursor.rowcount)
+
+    def bulk_insert(self, table: str, columns: Optional[str], rows: List[tuple]) -> None:
+        """
+        Load a batch of literal rows through the adapter's bulk path.
+        """
+        start = time.perf_counter()
+        self.adapter.bulk_insert(self.cursor, table, columns, rows)
+        self._report(f"INSERT INTO {table} -- bulk load of {len(rows)} rows", start, len(rows))
+
+    def _report(self, statement: str, start: float, row_count) -> None:
+        if self.on_statement:
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            self.on_statement(statement, duration_ms, row_count if row_count is not None and row_count >= 0 else None)
+
+
+class InsertRowStream:
+    """
+    Incremental parser for the tuples of one INSERT ... VALUES statement.
+    """
+
+    def __init__(self, executor: StreamingExecutor, table: str, columns: Optional[str], mysql: bool) -> None:
+        self.executor = executor
+        self.table = table
+        self.columns = columns
+        self.mysql = mysql
+        self.buffer = ''
+        self.batch: List[tuple] = []
+        self.expect_tuple = True
+
+    def feed(self, text: str, final: bool) -> Optional[str]:
+        """
+        Consume text. Returns the input following the statement's terminator once the statement ends, otherwise None.
+        """
+        self.buffer += text
+        buf = self.buffer
+        i = 0
+        n = len(buf)
+        while True:
+            while i < n and buf[i].isspace():
+                i += 1
+            if i >= n:
+                if final:
+                    self._flush()
+                    return ''
+                break
+            if self.expect_tuple:
+                if buf[i] != '(':
+                    raise ValueError(f"Unexpected text in VALUES list of INSERT INTO {self.table}: {buf[i:i + 40]!r}")
+                end = _tuple_end(buf, i, self.mysql)
+                if end is None:
+                    if final:
+                        raise ValueError(f"Unterminated VALUES tuple in INSERT INTO {self.table}")
+                    break
+                tuple_text = buf[i:end + 1]
+                try:
+                    self.batch.append(_parse_tuple(tuple_text[1:-1], self.mysql))
+                    if len(self.batch) >= self.executor.batch_rows:
+                        self._flush()
+                except NonLiteralRow:
+                    self._flush()
+                    columns = f" ({self.columns})" if self.columns else ""
+                    self.executor._execute(f"INSERT INTO {self.table}{columns} VALUES {tuple_text}")
+                self.expect_tuple = False
+                i = end + 1
+            elif buf[i] == ',':
+                self.expect_tuple = True
+                i += 1
+            elif buf[i] == ';':
+                self._flush()
+                return buf[i + 1:]
+            else:
+                raise ValueError(f"Streaming does not support clauses after VALUES in INSERT INTO {self.table}: {buf[i:i + 40]!r}")
+        self.buffer = buf[i:]
+        return None
+
+    def _flush(self) -> None:
+        if self.batch:
+            self.executor.bulk_insert(self.table, self.columns, self.batch)
+            self.batch = []
+
+
+def _tuple_end(buf: str, start: int, mysql: bool) -> Optional[int]:
+    """
+    Return the index of the parenthesis closing the tuple opened at start, or None if it is not in the buffer yet.
+    """
+    depth = 0
+    i = start
+    n = len(buf)
+    while i < n:
+        c = buf[i]
+        if c == "'":
+            escapes = mysql or (i > 0 and buf[i - 1] in 'eE')
+            i += 1
+            while True:
+                if i >= n:
+                    return None
+                if escapes and buf[i] == '\\':
+                    i += 2
+                    continue
+                if buf[i] == "'":
+                    if i + 1 >= n:
+                        return None
+                    if buf[i + 1] == "'":
+                        i += 2
+                        continue
+                    break
+                i += 1
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return None
+
+
+def _parse_tuple(text: str, mysql: bool) -> tuple:
+    """
+    Parse the inside of a VALUES tuple into Python values.
+
+    Raises:
+        NonLiteralRow: If any value is not a string, number, boolean or NULL literal.
+    """
+    values = []
+    i = 0
+    n = len(text)
+    while True:
+        while i < n and text[i].isspace():
+            i += 1
+        if i >= n:
+            raise NonLiteralRow()
+        c = text[i]
+        if c == "'" or (c in 'eE' and i + 1 < n and text[i + 1] == "'"):
+            escapes = mysql or c != "'"
+            if c != "'":
+                i += 1
+            value, i = _parse_string(text, i, escapes)
+        else:
+            number = NUMBER.match(text, i)
+            word = re.match(r'[A-Za-z_]+', text[i:])
+            if number:
+                literal = number.group(0)
+                value = int(literal) if re.fullmatch(r'[-+]?\d+', literal) else Decimal(literal)
+                i = number.end()
+            elif word and word.group(0).lower() in KEYWORDS:
+                value = KEYWORDS[word.group(0).lower()]
+                i += len(word.group(0))
+            else:
+                raise NonLiteralRow()
+        values.append(value)
+        while i < n and text[i].isspace():
+            i += 1
+        if i >= n:
+            return tuple(values)
+        if text[i] != ',':
+            raise NonLiteralRow()
+        i += 1
+
+
+def _parse_string(text: str, i: int, escapes: bool):
+    """
+    Parse a single-quoted string literal starting at text[i]. Returns (value, index after the literal).
+    """
+    parts = []
+    i += 1
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if escapes and c == '\\' and i + 1 < n:
+            parts.append(MYSQL_ESCAPES.get(text[i + 1], text[i + 1]))
+            i += 2
+        elif c == "'":
+            if i + 1 < n and text[i + 1] == "'":
+                parts.append("'")
+                i += 2
+            else:
+                return ''.join(parts), i + 1
+        else:
+            parts.append(c)
+            i += 1
+    raise NonLiteralRow()
+
+
+def stream_migration(cursor, migration: Dict[str, any], adapter, batch_rows: int = 1000,
+                     on_statement: Optional[Callable[[str, int, Optional[int]], None]] = None) -> None:
+    """
+    Execute a migration file in streaming mode on the given cursor without committing.
+
+    Args:
+        cursor: Database cursor of the caller's transaction.
+        migration (dict): Migration metadata with a "path".
+        adapter (Adapter): Adapter for the target backend.
+        batch_rows (int): Rows per bulk load.
+        on_statement (Callable): Optional callback receiving (statement text, duration ms, row count).
+    """
+    StreamingExecutor(cursor, adapter, batch_rows, on_statement).execute_file(migration["path"])
@@ -6,7 +6,112 @@ Provides utilities for generating migration file versions, extracting version nu
 
 import time
 import re
-from typing import List, Any
+from functools import lru_cache
+from typing import List, Any, Optional, Tuple
+
+VERSION_PATTERN = re.compile(r'V?(\d+(?:\.\d+)*)')
+FILENAME_PATTERN = re.compile(r'V(\d+(?:\.\d+)*)__(.+)\.sql')
+
+# A leading part with at least this many digits is a Unix timestamp (as written by generate_file_version), whose fraction is a decimal fraction of a second.
+TIMESTAMP_DIGITS = 9
+# Timestamp fractions are compared as nanoseconds.
+FRACTION_DIGITS = 9
+
+# Parsed versions and filenames kept in memory, enough for very large migration histories.
+CACHE_SIZE = 1 << 18
+
+
+class Version:
+    """
+    Immutable, hashable migration version compared as a tuple of integer parts, so V1.10 sorts after V1.9 and V1.2.3 after V1.2.
+    Timestamp versions such as V1712345678.25 compare their fraction as a decimal, and sort after every semantic version.
+    Use Version.parse, which memoizes instances, instead of calling the constructor directly.
+    """
+    __slots__ = ('parts', 'text', '_hash')
+
+    def __init__(self, parts: Tuple[int, ...], text: str) -> None:
+        """
+        Initialize the Version.
+
+        Args:
+            parts (tuple): Integer parts used for comparison.
+            text (str): Version as written in the filename, without the leading 'V'.
+        """
+        self.parts = parts
+        self.text = text
+        self._hash = hash(parts)
+
+    @staticmethod
+    def parse(version: str) -> 'Version':
+        """
+        Parse a version string such as 'V1.10', '1.2.3' or 'V1712345678.123456'.
+
+        Args:
+            version (str): Version string, with or without the leading 'V'.
+        Returns:
+            Version: The parsed, memoized version.
+        Raises:
+            ValueError: If the string is not a version.
+        """
+        return _parse_version(version)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Version) and self.parts == other.parts
+
+    def __lt__(self, other: 'Version') -> bool:
+        return self.parts < other.parts
+
+    def __le__(self, other: 'Version') -> bool:
+        return self.parts <= other.parts
+
+    def __gt__(self, other: 'Version') -> bool:
+        return self.parts > other.parts
+
+    def __ge__(self, other: 'Version') -> bool:
+        return self.parts >= other.parts
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __str__(self) -> str:
+        return f"V{self.text}"
+
+    def __repr__(self) -> str:
+        return f"Version('{self.text}')"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_version(version: str) -> Version:
+    """
+    Parse and memoize a version string.
+    """
+    match = VERSION_PATTERN.fullmatch(version)
+    if not match:
+        raise ValueError(f"Invalid migration version {version}")
+    text = match.group(1)
+    pieces = text.split('.')
+    if len(pieces) == 2 and len(pieces[0]) >= TIMESTAMP_DIGITS:
+        parts = (int(pieces[0]), int(pieces[1][:FRACTION_DIGITS].ljust(FRACTION_DIGITS, '0')))
+    else:
+        parts = tuple(int(piece) for piece in pieces)
+    return Version(parts, text)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_filename(file_name: str) -> Optional[Tuple[Version, str]]:
+    """
+    Parse a migration filename of the form 'V<version>__<description>.sql' once.
+
+    Args:
+        file_name (str): The migration filename.
+    Returns:
+        tuple: (Version, raw description), or None if the name is not a migration filename.
+    """
+    match = FILENAME_PATTERN.fullmatch(file_name)
+    if not match:
+        return None
+    return _parse_version(match.group(1)), match.group(2)
+
 
 class VersionManager:
     """
@@ -35,29 +140,49 @@ class VersionManager:
 
         return f'V{time.time()}__{file_object.name}'
 
-    def extract_version(self, file_name: str) -> float:
+    def extract_version(self, file_name: str) -> Version:
         """
-        Extract the version number from a migration filename.
+        Extract the version from a migration filename.
 
         Args:
             file_name (str): The migration filename.
         Returns:
-            float: The extracted version number.
+            Version: The extracted version.
         Raises:
             ValueError: If the filename does not match the expected pattern.
         """
-        match = re.match(r'V(\d+(?:\.\d+)?)__.*\.sql', file_name)
-        if not match:
+        parsed = parse_filename(file_name)
+        if parsed is None:
             raise ValueError("Invalid migration file format")
-        return float(match.group(1))
+        return parsed[0]
+
+    def parse_version(self, version: str) -> Version:
+        """
+        Convert a version string as stored in the registry (e.g. 'V1.1') to a Version.
+
+        Args:
+            version (str): Version string, with or without the leading 'V'.
+        Returns:
+            Version: The parsed version.
+        Raises:
+            ValueError: If the string is not a version.
+        """
+        return _parse_version(version)
 
-    def order_migrations(self, migration_list: List[object]) -> List[object]:
+    def order_migrations(self, migration_list: List[Any]) -> List[Any]:
         """
         Return migrations in ascending order based on version number.
+        Each filename is parsed once; files that are not migrations are dropped.
 
         Args:
             migration_list (List[Path]): List of Path objects for migration files.
         Returns:
             List[Path]: Sorted list of Path objects.
         """
-        return sorted(migration_list, key=lambda x: self.extract_version(x.name))
+        keyed = []
+        for path in migration_list:
+            parsed = parse_filename(path.name)
+            if parsed is not None:
+                keyed.append((parsed[0], path))
+        keyed.sort(key=lambda item: item[0])
+        return [path for _, path in keyed]
@@ -2,26 +2,45 @@
 conftest.py
 -----------
 Pytest fixtures for database configuration and cleaning the test database before each test.
+Tests run against PostgreSQL when DB_PASSWORD is set and against SQLite otherwise.
 """
 
 import pytest
-import psycopg2
 import os
 from dotenv import load_dotenv
 from core.migration_registry import MigrationRegistry
+from core.migration_scanner import MANIFEST_DIR_ENV
 
 load_dotenv()
 
 DB_PASS = os.getenv("DB_PASSWORD")
 
 
+@pytest.fixture(autouse=True)
+def manifest_cache_dir(tmp_path, monkeypatch):
+    """
+    Fixture keeping checksum manifests written by tests out of the user cache directory.
+    Returns:
+        pathlib.Path: Directory holding the manifests.
+    """
+    cache_dir = tmp_path / "manifest_cache"
+    monkeypatch.setenv(MANIFEST_DIR_ENV, str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture
-def db_config():
+def db_config(tmp_path):
     """
     Fixture providing database configuration for tests.
+    Uses PostgreSQL when DB_PASSWORD is set, otherwise a throwaway SQLite database file, so the suite runs without a server.
     Returns:
         dict: Database configuration dictionary.
     """
+    if not DB_PASS:
+        return {
+            'type': 'sqlite',
+            'database': str(tmp_path / "migrations.db"),
+        }
     return {
         'type': 'postgresql',
         'dbname': 'postgres',
@@ -0,0 +1,179 @@
+"""
+test_backfill.py
+----------------
+Unit tests for chunked, resumable backfill migrations.
+"""
+
+import sqlite3
+import pytest
+from core.backfill import BackfillExecutor, load_backfill
+from core.migration_registry import MigrationRegistry
+from adapters.postgres import posgrestSQL
+from adapters.mysql import mySQL
+from adapters.sqlite import sqLite
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        if params and "start" in params:
+            if self.db["fail_next"]:
+                self.db["fail_next"] -= 1
+                raise RuntimeError("lock timeout")
+            low, high = params["start"], params["end"]
+            self.rowcount = len([k for k in self.db["keys"] if low <= k < high])
+            self.db["pending"].append((low, high))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db["chunks"].extend(self.db["pending"])
+        self.db["pending"] = []
+        if self.db["pending_checkpoint"] is not None:
+            self.db["checkpoint"] = self.db["pending_checkpoint"]
+
+    def rollback(self):
+        self.db["pending"] = []
+        self.db["pending_checkpoint"] = None
+
+    def close(self):
+        pass
+
+
+class FakeAdapter(posgrestSQL):
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+
+    def initialize_checkpoint_table(self, cursor):
+        pass
+
+    def get_checkpoint(self, cursor, version):
+        return self.db["checkpoint"]
+
+    def save_checkpoint(self, cursor, version, last_key):
+        self.db["pending_checkpoint"] = last_key
+
+    def get_key_range(self, cursor, table, key):
+        return min(self.db["keys"]), max(self.db["keys"])
+
+    def set_transaction_timeouts(self, cursor, lock_timeout_ms, statement_timeout_ms):
+        self.db["timeouts"] = (lock_timeout_ms, statement_timeout_ms)
+
+    def reset_transaction_timeouts(self, cursor):
+        self.db["timeouts_reset"] = True
+
+
+def make_backfill(tmp_path, monkeypatch, checkpoint=None, fail_next=0):
+    path = tmp_path / "V2.1__backfill_totals.sql"
+    path.write_text(
+        "-- backfill: table=orders key=id chunk_size=1000 min_chunk_size=1000 lock_timeout=2s statement_timeout=1min\n"
+        "UPDATE orders SET total_cents = total * 100 WHERE id >= {start} AND id < {end};\n"
+    )
+    db = {"keys": list(range(1, 2501)), "checkpoint": checkpoint, "pending_checkpoint": None,
+          "pending": [], "chunks": [], "fail_next": fail_next}
+    registry = MigrationRegistry({'type': 'postgresql'})
+    monkeypatch.setattr(registry, "_get_connection", lambda: FakeConnection(db))
+    monkeypatch.setattr(registry, "_get_adapter", lambda: FakeAdapter(db))
+    return registry, {"version": "V2.1", "path": str(path)}, db
+
+
+def test_load_backfill_header(tmp_path):
+    """
+    Test that the backfill header is parsed and durations are converted to milliseconds.
+    """
+    path = tmp_path / "V2.1__backfill.sql"
+    path.write_text("-- backfill: table=orders key=id lock_timeout=2s\nUPDATE orders SET x = 1 WHERE id >= {start} AND id < {end};")
+
+    spec = load_backfill(str(path))
+
+    assert (spec["table"], spec["key"], spec["lock_timeout"]) == ("orders", "id", 2000)
+    assert spec["body"].endswith("id < {end}")
+
+
+def test_backfill_commits_each_chunk_and_checkpoints(tmp_path, monkeypatch):
+    """
+    Test that every key is covered by committed chunks and the checkpoint ends past the maximum key.
+    """
+    registry, migration, db = make_backfill(tmp_path, monkeypatch)
+    sleeps = []
+
+    rows = BackfillExecutor(registry, sleep=sleeps.append).run(migration, load_backfill(migration["path"]))
+
+    assert rows == 2500
+    assert db["chunks"][0] == (1, 1001)
+    assert db["checkpoint"] > 2500
+    assert db["timeouts"] == (2000, 60000)
+    assert db.get("timeouts_reset")
+    assert len(sleeps) == len(db["chunks"]) - 1
+
+
+def test_backfill_resumes_and_retries(tmp_path, monkeypatch):
+    """
+    Test that a backfill resumes from its checkpoint and retries a chunk that hit a lock timeout.
+    """
+    registry, migration, db = make_backfill(tmp_path, monkeypatch, checkpoint=2001, fail_next=1)
+
+    rows = BackfillExecutor(registry, sleep=lambda s: None).run(migration, load_backfill(migration["path"]))
+
+    assert rows == 500
+    assert db["chunks"] == [(2001, 3001)]
+
+
+def test_backfill_gives_up_after_retries(tmp_path, monkeypatch):
+    """
+    Test that a chunk failing more often than the retry budget raises.
+    """
+    registry, migration, db = make_backfill(tmp_path, monkeypatch, fail_next=100)
+
+    with pytest.raises(RuntimeError):
+        BackfillExecutor(registry, sleep=lambda s: None).run(migration, load_backfill(migration["path"]))
+    assert db["checkpoint"] is None
+    assert db.get("timeouts_reset")
+
+
+def test_mysql_session_timeouts_are_restored():
+    """
+    Test that MySQL saves the session timeouts before the first override only, and restores them on reset.
+    """
+    statements = []
+    cursor = type("RecordingCursor", (), {"execute": lambda self, sql, params=None: statements.append(" ".join(sql.split()))})()
+    adapter = mySQL()
+
+    adapter.set_transaction_timeouts(cursor, 2000, 60000)
+    adapter.set_transaction_timeouts(cursor, 2000, 60000)
+    adapter.reset_transaction_timeouts(cursor)
+
+    assert statements[0].startswith("SET @schema_migration_lock_wait_timeout = COALESCE(@schema_migration_lock_wait_timeout, @@SESSION.innodb_lock_wait_timeout)")
+    assert statements[1:3] == ["SET SESSION innodb_lock_wait_timeout = 2", "SET SESSION max_execution_time = 60000"]
+    assert statements[-2].startswith("SET SESSION innodb_lock_wait_timeout = COALESCE(@schema_migration_lock_wait_timeout")
+    assert statements[-1] == "SET @schema_migration_lock_wait_timeout = NULL, @schema_migration_max_execution_time = NULL;"
+
+
+def test_sqlite_busy_timeout_is_restored():
+    """
+    Test that SQLite restores the connection's busy timeout on reset, so a pooled connection does not keep a migration's lock timeout.
+    """
+    conn = sqlite3.connect(":memory:", timeout=7)
+    cursor = conn.cursor()
+    adapter = sqLite()
+
+    adapter.set_transaction_timeouts(cursor, 2000, 60000)
+    adapter.set_transaction_timeouts(cursor, 3000, 60000)
+    assert cursor.execute("PRAGMA busy_timeout").fetchone() == (3000,)
+    adapter.reset_transaction_timeouts(cursor)
+
+    assert cursor.execute("PRAGMA busy_timeout").fetchone() == (7000,)
+    conn.close()
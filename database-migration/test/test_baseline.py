@@ -0,0 +1,104 @@
+"""
+test_baseline.py
+----------------
+Tests for baseline snapshots, run against the embedded SQLite backend.
+"""
+
+import json
+import pytest
+from core.baseline import create_baseline, load_baseline
+from core.migration_registry import MigrationRegistry
+from core.migration_runner import MigrationRunner
+
+
+MIGRATIONS = {
+    "V1.1__users.sql": "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL);\nCREATE INDEX users_name_idx ON users (name);",
+    "V1.2__seed_users.sql": "INSERT INTO users (name) VALUES ('ada'), ('o''brien');",
+    "V1.3__orders.sql": "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, note BLOB);\nINSERT INTO orders VALUES (1, 1, X'00ff');",
+}
+
+
+def make_baseline(tmp_path):
+    migration_dir = tmp_path / "up"
+    migration_dir.mkdir()
+    for name, sql in MIGRATIONS.items():
+        (migration_dir / name).write_text(sql)
+    source = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "source.db")})
+    source.initialize()
+    MigrationRunner(str(migration_dir), source).run_migrations()
+    baseline_path = str(tmp_path / "baseline.json")
+    create_baseline(source, baseline_path, str(migration_dir))
+    return migration_dir, baseline_path
+
+
+def query(registry, sql):
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def test_fresh_database_loads_baseline_then_applies_the_rest(tmp_path):
+    """
+    Test that a fresh database is built from the baseline and only newer migrations are executed.
+    """
+    migration_dir, baseline_path = make_baseline(tmp_path)
+    (migration_dir / "V1.4__user_email.sql").write_text("ALTER TABLE users ADD COLUMN email TEXT;")
+    target = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "target.db")})
+    target.initialize()
+
+    MigrationRunner(str(migration_dir), target, baseline_path=baseline_path).run_migrations()
+
+    assert query(target, "SELECT name, email FROM users ORDER BY id") == [("ada", None), ("o'brien", None)]
+    assert query(target, "SELECT note FROM orders") == [(b"\x00\xff",)]
+    assert query(target, "SELECT name FROM sqlite_master WHERE name = 'users_name_idx'") == [("users_name_idx",)]
+    assert query(target, "SELECT version, applied_by FROM schema_migrations ORDER BY version") == [
+        ("V1.1", "baseline"), ("V1.2", "baseline"), ("V1.3", "baseline"), ("V1.4", "system")]
+    assert MigrationRunner(str(migration_dir), target).get_migrations_to_apply() == []
+
+
+def test_baseline_loads_into_database_without_registry(tmp_path):
+    """
+    Test that the runner API loads a baseline into a database whose registry was never initialized.
+    """
+    migration_dir, baseline_path = make_baseline(tmp_path)
+    (migration_dir / "V1.4__user_email.sql").write_text("ALTER TABLE users ADD COLUMN email TEXT;")
+    for advisory_lock in (False, True):
+        target = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / f"target_{advisory_lock}.db")})
+
+        assert MigrationRunner(str(migration_dir), target, baseline_path=baseline_path, advisory_lock=advisory_lock).run_migrations() == "Migrations Applied"
+        assert len(query(target, "SELECT version FROM schema_migrations WHERE applied_by = 'baseline'")) == 3
+
+
+def test_baseline_rejects_changed_squashed_migration(tmp_path):
+    """
+    Test that a baseline is refused when a squashed migration's file no longer matches its recorded checksum.
+    """
+    migration_dir, baseline_path = make_baseline(tmp_path)
+    (migration_dir / "V1.2__seed_users.sql").write_text("INSERT INTO users (name) VALUES ('eve');")
+    target = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "target.db")})
+
+    with pytest.raises(ValueError, match="V1.2"):
+        load_baseline(target, baseline_path, str(migration_dir))
+
+
+def test_baseline_rejects_tampering_and_non_empty_database(tmp_path):
+    """
+    Test that a modified baseline file and a database with applied migrations are both refused.
+    """
+    migration_dir, baseline_path = make_baseline(tmp_path)
+    with open(baseline_path) as file:
+        snapshot = json.load(file)
+    snapshot["schema"] += "DROP TABLE users;\n"
+    tampered_path = tmp_path / "tampered.json"
+    tampered_path.write_text(json.dumps(snapshot))
+    target = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "target.db")})
+
+    with pytest.raises(ValueError, match="corrupt"):
+        load_baseline(target, str(tampered_path))
+
+    load_baseline(target, baseline_path)
+    with pytest.raises(ValueError, match="without applied migrations"):
+        load_baseline(target, baseline_path)
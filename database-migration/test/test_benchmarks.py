@@ -0,0 +1,24 @@
+"""
+test_benchmarks.py
+------------------
+Smoke test for the migration benchmark suite on a tiny synthetic history.
+"""
+
+import json
+from benchmarks.bench_migrations import main
+
+
+def test_benchmark_report(tmp_path):
+    """
+    Test that every benchmark runs and the report is machine-readable.
+    """
+    output = tmp_path / "bench.json"
+
+    assert main(["--sizes", "20", "--seed-every", "5", "--seed-rows", "10", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    benchmarks = {r["benchmark"]: r for r in report["results"]}
+    assert set(benchmarks) == {"scan_cold", "scan_warm", "order_migrations", "get_migrations_to_apply",
+                               "get_migrations_to_apply_server", "apply_pending", "apply_pending_batch"}
+    assert benchmarks["apply_pending"]["items"] == 2
+    assert all(r["peak_bytes"] > 0 and r["seconds"] >= 0 for r in report["results"])
@@ -0,0 +1,122 @@
+"""
+test_catalog.py
+---------------
+Tests for catalog snapshots and schema drift checks, run against the embedded SQLite backend.
+"""
+
+import json
+import pytest
+import cli
+from core.catalog import capture_catalog, check_catalog
+from core.migration_registry import MigrationRegistry
+from core.migration_rollback import MigrationRollback
+from core.migration_runner import MigrationRunner
+
+MIGRATIONS = {
+    "V1.1__users.sql": ("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL);\nCREATE INDEX users_name_idx ON users (name);",
+                        "DROP TABLE users;"),
+    "V1.2__orders.sql": ("CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id));",
+                         "DROP TABLE orders;"),
+}
+
+
+def setup_project(tmp_path):
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    for name, (up_sql, down_sql) in MIGRATIONS.items():
+        (up_dir / name).write_text(up_sql)
+        (down_dir / name).write_text(down_sql)
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    return registry, up_dir, down_dir
+
+
+def execute(registry, *statements):
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        conn.commit()
+        cursor.close()
+
+
+def test_check_reports_changed_missing_and_unexpected_objects(tmp_path, monkeypatch):
+    """
+    Test that an unchanged schema is confirmed from the snapshot digest alone, and that drift is classified per object.
+    """
+    registry, up_dir, _ = setup_project(tmp_path)
+    MigrationRunner(str(up_dir), registry, catalog_snapshot=True).run_migrations()
+
+    adapter = registry._get_adapter()
+    snapshot_reads = []
+    read_snapshot = adapter.get_catalog_snapshot
+    monkeypatch.setattr(adapter, "get_catalog_snapshot", lambda *args, **kwargs: snapshot_reads.append(kwargs) or read_snapshot(*args, **kwargs))
+    assert check_catalog(registry) == []
+    assert snapshot_reads == [{"names": ["*"]}]
+
+    execute(registry, "ALTER TABLE users ADD COLUMN email TEXT", "DROP INDEX users_name_idx", "CREATE TABLE audit (id INTEGER)")
+    drift = check_catalog(registry)
+
+    assert [(row["object_type"], row["object_name"], row["state"]) for row in drift] == [
+        ("index", "users_name_idx", "missing"), ("table", "audit", "unexpected"), ("table", "users", "changed")]
+    users = drift[-1]
+    assert "email" not in users["expected"] and "email TEXT" in users["actual"]
+
+
+def test_snapshots_are_kept_per_version(tmp_path):
+    """
+    Test that after a rollback the schema is checked against the snapshot of the version rolled back to.
+    """
+    registry, up_dir, down_dir = setup_project(tmp_path)
+    with pytest.raises(ValueError, match="No applied migrations"):
+        capture_catalog(registry)
+
+    (up_dir / "V1.2__orders.sql").rename(tmp_path / "V1.2__orders.sql")
+    MigrationRunner(str(up_dir), registry, catalog_snapshot=True).run_migrations()
+    (tmp_path / "V1.2__orders.sql").rename(up_dir / "V1.2__orders.sql")
+    MigrationRunner(str(up_dir), registry).run_migrations()
+    with pytest.raises(ValueError, match="No catalog snapshot recorded at V1.2"):
+        check_catalog(registry)
+
+    assert capture_catalog(registry) == {"version": "V1.2", "objects": 3}
+    MigrationRollback(str(down_dir), registry, "V1.1").rollback()
+    assert check_catalog(registry) == []
+
+
+def test_cli_verify_schema(tmp_path, capsys):
+    """
+    Test that verify --schema exits 1 once the live schema drifts from the snapshot taken by migrate.
+    """
+    registry, up_dir, down_dir = setup_project(tmp_path)
+    config_path = tmp_path / "migrations.json"
+    config_path.write_text(json.dumps({
+        "database": registry.db_config,
+        "migrations": {"migration_dir": str(up_dir), "down_dir": str(down_dir)},
+    }))
+
+    assert cli.main(["--config", str(config_path), "migrate"]) == cli.EXIT_OK
+    assert cli.main(["--config", str(config_path), "verify", "--schema"]) == cli.EXIT_OK
+    assert "Schema matches the catalog snapshot" in capsys.readouterr().out
+
+    execute(registry, "DROP TABLE orders")
+    assert cli.main(["--config", str(config_path), "verify", "--schema"]) == cli.EXIT_FAILED
+    assert "missing    orders" in capsys.readouterr().out
+
+
+def test_cli_verify_schema_without_snapshots_is_read_only(tmp_path, capsys):
+    """
+    Test that verify --schema reports a missing snapshot without creating the snapshot table.
+    """
+    registry, up_dir, down_dir = setup_project(tmp_path)
+    config_path = tmp_path / "migrations.json"
+    config_path.write_text(json.dumps({
+        "database": registry.db_config,
+        "migrations": {"migration_dir": str(up_dir), "down_dir": str(down_dir), "catalog_snapshot": False},
+    }))
+
+    assert cli.main(["--config", str(config_path), "migrate"]) == cli.EXIT_OK
+    assert cli.main(["--config", str(config_path), "verify", "--schema"]) == cli.EXIT_FAILED
+    assert "No catalog snapshot recorded at V1.2" in capsys.readouterr().err
+    with registry.connection() as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'schema_migration_catalog'").fetchall() == []
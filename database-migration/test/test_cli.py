@@ -0,0 +1,126 @@
+"""
+test_cli.py
+-----------
+Tests for the command-line interface and its start-up budget, run against the embedded SQLite backend.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import cli
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall-clock budget for a fresh interpreter to load the CLI and answer `status` with its first queries.
+STARTUP_BUDGET_MS = 750
+
+
+def write_project(tmp_path):
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    for i in range(1, 4):
+        (up_dir / f"V1.{i}__step_{i}.sql").write_text(f"CREATE TABLE t{i} (id INTEGER);")
+        (down_dir / f"V1.{i}__step_{i}.sql").write_text(f"DROP TABLE t{i};")
+    config_path = tmp_path / "migrations.json"
+    config_path.write_text(json.dumps({
+        "database": {"type": "sqlite", "database": str(tmp_path / "app.db")},
+        "migrations": {"migration_dir": str(up_dir), "down_dir": str(down_dir)},
+    }))
+    return str(config_path), up_dir
+
+
+def test_cli_commands(tmp_path, capsys):
+    """
+    Test plan, migrate, status, verify and rollback end to end.
+    """
+    config_path, up_dir = write_project(tmp_path)
+
+    assert cli.main(["--config", config_path, "plan"]) == cli.EXIT_OK
+    assert "3 migrations to apply" in capsys.readouterr().out
+
+    assert cli.main(["--config", config_path, "migrate"]) == cli.EXIT_OK
+    assert cli.main(["--config", config_path, "migrate"]) == cli.EXIT_OK
+    assert capsys.readouterr().out.strip().endswith("Up To Date")
+
+    assert cli.main(["--config", config_path, "rollback", "V1.2"]) == cli.EXIT_OK
+    assert cli.main(["--config", config_path, "status"]) == cli.EXIT_OK
+    assert capsys.readouterr().out.strip().endswith("2 applied, 1 pending, 0 changed, 0 missing")
+
+    (up_dir / "V1.1__step_1.sql").write_text("CREATE TABLE t1 (id INTEGER, name TEXT);")
+    assert cli.main(["--config", config_path, "verify"]) == cli.EXIT_FAILED
+    assert "changed" in capsys.readouterr().out
+
+
+def test_cli_read_only_commands_do_not_create_registry(tmp_path, capsys):
+    """
+    Test that status, plan and verify report a missing registry instead of creating one.
+    """
+    config_path, _ = write_project(tmp_path)
+
+    assert cli.main(["--config", config_path, "status"]) == cli.EXIT_OK
+    captured = capsys.readouterr()
+    assert captured.out.strip().endswith("0 applied, 3 pending, 0 changed, 0 missing")
+    assert "No registry" in captured.err
+    assert not (tmp_path / "app.db").exists()
+
+    sqlite3.connect(tmp_path / "app.db").close()
+    assert cli.main(["--config", config_path, "plan"]) == cli.EXIT_OK
+    assert cli.main(["--config", config_path, "plan", "--explain"]) == cli.EXIT_OK
+    captured = capsys.readouterr()
+    assert "3 migrations to apply" in captured.out
+    assert "No registry" in captured.err
+    assert cli.main(["--config", config_path, "verify"]) == cli.EXIT_OK
+    conn = sqlite3.connect(tmp_path / "app.db")
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    conn.close()
+
+
+def test_cli_migrate_scans_once(tmp_path, monkeypatch, capsys):
+    """
+    Test that migrate without the advisory lock reuses its first scan of the migration directory.
+    """
+    from core.migration_scanner import MigrationScanner
+
+    config_path, _ = write_project(tmp_path)
+    scans = []
+    discover = MigrationScanner.discover_migrations
+    monkeypatch.setattr(MigrationScanner, "discover_migrations", lambda self: scans.append(self.migration_dir) or discover(self))
+
+    assert cli.main(["--config", config_path, "migrate", "--no-lock"]) == cli.EXIT_OK
+    assert capsys.readouterr().out.strip().endswith("Migrations Applied")
+    assert len(scans) == 1
+
+
+def test_cli_reports_config_errors(tmp_path, capsys):
+    """
+    Test that a missing config file is a usage error rather than a traceback.
+    """
+    assert cli.main(["--config", str(tmp_path / "absent.toml"), "status"]) == cli.EXIT_USAGE
+    assert "Error" in capsys.readouterr().err
+
+
+def test_cli_startup_budget(tmp_path):
+    """
+    Test that a cold `status` run stays within the start-up budget and never loads drivers of unselected backends.
+    """
+    config_path, _ = write_project(tmp_path)
+    probe = (
+        "import sys, cli\n"
+        f"code = cli.main(['--config', {config_path!r}, 'status'])\n"
+        "print(sorted({m.split('.')[0] for m in sys.modules} & {'psycopg2', 'mysql', 'asyncpg', 'httpx'}))\n"
+        "sys.exit(code)\n"
+    )
+
+    timings = []
+    for _ in range(3):
+        began = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_DIR, capture_output=True, text=True)
+        timings.append((time.perf_counter() - began) * 1000)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().endswith("[]")
+
+    assert min(timings) < STARTUP_BUDGET_MS
@@ -0,0 +1,92 @@
+"""
+test_events.py
+--------------
+Tests for migration event hooks and the metrics exporter, run against the embedded SQLite backend.
+"""
+
+import json
+import pytest
+import cli
+from core.events import MetricsCollector
+from core.migration_registry import MigrationRegistry
+from core.migration_rollback import MigrationRollback
+from core.migration_runner import MigrationRunner
+
+
+def setup_migrations(tmp_path, broken=None):
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    for i in range(1, 4):
+        sql = "CREATE TABLE broken (id INTEGER" if i == broken else f"CREATE TABLE t{i} (id INTEGER);"
+        (up_dir / f"V1.{i}__step_{i}.sql").write_text(sql)
+        (down_dir / f"V1.{i}__step_{i}.sql").write_text(f"DROP TABLE t{i};")
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    return registry, up_dir, down_dir
+
+
+def test_runner_and_rollback_emit_phase_events(tmp_path):
+    """
+    Test the event sequence of a locked run and a rollback, and that a failing handler does not break the run.
+    """
+    registry, up_dir, down_dir = setup_migrations(tmp_path)
+    seen = []
+    registry.events.subscribe(lambda event, fields: seen.append((event, fields.get("version"))))
+    registry.events.subscribe(lambda event, fields: 1 / 0, "migration_commit")
+
+    assert MigrationRunner(str(up_dir), registry, advisory_lock=True).run_migrations() == "Migrations Applied"
+    MigrationRollback(str(down_dir), registry, "V1.2").rollback()
+
+    assert [event for event, _ in seen] == [
+        "scan_start", "scan_end", "diff", "lock_wait", "scan_start", "scan_end", "diff",
+        "migration_begin", "migration_commit", "migration_begin", "migration_commit", "migration_begin", "migration_commit",
+        "run_end", "rollback_step", "rollback"]
+    assert ("rollback_step", "V1.3") in seen
+
+    with pytest.raises(ValueError, match="Unknown events"):
+        registry.events.subscribe(print, "migration_start")
+
+
+def test_metrics_collector_counts_failures(tmp_path):
+    """
+    Test that a failed batch run is counted and exported in both formats.
+    """
+    registry, up_dir, _ = setup_migrations(tmp_path, broken=3)
+    collector = MetricsCollector().attach(registry.events)
+
+    with pytest.raises(Exception):
+        MigrationRunner(str(up_dir), registry).run_migrations(batch=True, batch_size=2)
+
+    metrics = collector.to_json()
+    assert metrics["schema_migration_migrations_applied_total"]["samples"] == [{"labels": {}, "value": 2}]
+    assert metrics["schema_migration_migrations_failed_total"]["samples"] == [{"labels": {}, "value": 1}]
+    assert metrics["schema_migration_last_run_success"]["samples"] == [{"labels": {"command": "migrate"}, "value": 0}]
+    assert [row["labels"] for row in metrics["schema_migration_migration_duration_seconds"]["samples"]] == [{"version": "V1.1"}, {"version": "V1.2"}]
+
+    text = collector.to_prometheus()
+    assert "# TYPE schema_migration_migration_seconds summary" in text
+    assert "schema_migration_migration_seconds_count 2" in text
+    assert 'schema_migration_events_total{event="migration_fail"} 1' in text
+
+
+def test_cli_writes_metrics_file(tmp_path, capsys):
+    """
+    Test that --metrics writes Prometheus text, or JSON for a .json path.
+    """
+    registry, up_dir, down_dir = setup_migrations(tmp_path)
+    config_path = tmp_path / "migrations.json"
+    config_path.write_text(json.dumps({
+        "database": registry.db_config,
+        "migrations": {"migration_dir": str(up_dir), "down_dir": str(down_dir)},
+    }))
+
+    prom_path = tmp_path / "migrate.prom"
+    assert cli.main(["--config", str(config_path), "--metrics", str(prom_path), "migrate"]) == cli.EXIT_OK
+    assert "schema_migration_migrations_applied_total 3" in prom_path.read_text()
+
+    json_path = tmp_path / "rollback.json"
+    assert cli.main(["--config", str(config_path), "--metrics", str(json_path), "rollback", "V1.1"]) == cli.EXIT_OK
+    metrics = json.loads(json_path.read_text())["metrics"]
+    assert metrics["schema_migration_rollback_steps_total"]["samples"][0]["value"] == 2
+    assert metrics["schema_migration_run_seconds"]["samples"][0]["labels"] == {"command": "rollback"}
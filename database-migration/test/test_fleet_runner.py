@@ -0,0 +1,107 @@
+"""
+test_fleet_runner.py
+--------------------
+Unit tests for the asynchronous multi-database fleet runner, using in-process fake asyncpg connections.
+"""
+
+import asyncio
+import asyncpg
+from core.fleet_runner import FleetRunner
+from core.migration_scanner import MigrationScanner
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.pending = []
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.committed.extend(self.conn.pending)
+        self.conn.pending = []
+
+
+class FakeAsyncConnection:
+    active = 0
+    peak = 0
+
+    def __init__(self, database, applied):
+        self.database = database
+        self.applied = applied
+        self.pending = []
+        self.committed = []
+        FakeAsyncConnection.active += 1
+        FakeAsyncConnection.peak = max(FakeAsyncConnection.peak, FakeAsyncConnection.active)
+
+    async def execute(self, sql, *args):
+        await asyncio.sleep(0.01)
+        self.pending.append((sql, args))
+
+    async def fetch(self, sql):
+        return list(self.applied.items())
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def close(self):
+        FakeAsyncConnection.active -= 1
+
+
+def test_fleet_runner_isolates_failures(monkeypatch, tmp_path):
+    """
+    Test that every target is migrated concurrently within the cap and one failing target does not affect the others.
+    """
+    (tmp_path / "V1.1__users.sql").write_text("CREATE TABLE users (id INT);")
+    (tmp_path / "V1.2__orders.sql").write_text("CREATE TABLE orders (id INT);")
+    connections = {}
+
+    async def connect(timeout=None, **config):
+        if config["database"] == "down":
+            raise OSError("connection refused")
+        conn = FakeAsyncConnection(config["database"], {})
+        connections[config["database"]] = conn
+        return conn
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    targets = {name: {'type': 'postgresql', 'dbname': name, 'port': "5432"} for name in ["a", "b", "down", "c", "d"]}
+
+    report = FleetRunner(str(tmp_path), targets, concurrency=2).run()
+
+    assert (report["targets"], report["succeeded"], report["failed"]) == (5, 4, 1)
+    assert [r["target"] for r in report["results"]] == ["a", "b", "down", "c", "d"]
+    assert report["results"][2]["error"] == "connection refused"
+    assert report["results"][0]["applied"] == ["V1.1", "V1.2"]
+    assert FakeAsyncConnection.peak <= 2
+    registry_rows = [args for sql, args in connections["a"].committed if args]
+    assert [row[0] for row in registry_rows] == ["V1.1", "V1.2"]
+
+
+def test_fleet_runner_matches_versions_and_streams_pending_files(monkeypatch, tmp_path):
+    """
+    Test that registry rows match files by parsed version, pending files run statement by statement, and backfills are rejected.
+    """
+    (tmp_path / "V1.1__users.sql").write_text("CREATE TABLE users (id INT);")
+    (tmp_path / "V1.2__orders.sql").write_text("CREATE TABLE orders (id INT);\nCREATE INDEX orders_idx ON orders (id);")
+    checksum = MigrationScanner(str(tmp_path), use_manifest=False).discover_migrations()[0]["checksum"]
+    connections = {}
+
+    async def connect(timeout=None, **config):
+        connections[config["database"]] = FakeAsyncConnection(config["database"], {"V1.01": checksum})
+        return connections[config["database"]]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+
+    report = FleetRunner(str(tmp_path), {"a": {'type': 'postgresql', 'dbname': "a"}}).run()
+
+    assert report["results"][0]["applied"] == ["V1.2"]
+    statements = [sql for sql, args in connections["a"].committed if not args]
+    assert statements == ["CREATE TABLE orders (id INT)", "CREATE INDEX orders_idx ON orders (id)"]
+
+    (tmp_path / "V1.3__backfill.sql").write_text("-- backfill: table=orders key=id\nUPDATE orders SET id = id WHERE id >= {start} AND id < {end};")
+    report = FleetRunner(str(tmp_path), {"b": {'type': 'postgresql', 'dbname': "b"}}).run()
+
+    assert report["results"][0]["status"] == "failed"
+    assert "backfill" in report["results"][0]["error"]
+    assert connections["b"].committed == []
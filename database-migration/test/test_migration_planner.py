@@ -0,0 +1,111 @@
+"""
+test_migration_planner.py
+-------------------------
+Tests for the dry-run migration planner, run against the embedded SQLite backend.
+"""
+
+import json
+import cli
+from core.migration_planner import classify_statement, rate_risk
+from core.migration_registry import MigrationRegistry
+from core.migration_runner import MigrationRunner
+
+
+def setup_project(tmp_path, migrations):
+    up_dir = tmp_path / "up"
+    up_dir.mkdir()
+    for name, sql in migrations.items():
+        (up_dir / name).write_text(sql)
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, kind TEXT)")
+        cursor.executemany("INSERT INTO events (kind) VALUES (?)", [("click" if i % 4 else "view",) for i in range(200)])
+        conn.commit()
+        cursor.close()
+    return registry, up_dir
+
+
+def test_classify_statement_per_dialect():
+    """
+    Test lock classification of common DDL forms and their risk on a large table.
+    """
+    index = classify_statement("CREATE INDEX events_kind_idx ON events (kind)")
+    concurrent = classify_statement("-- online\nCREATE INDEX CONCURRENTLY events_kind_idx ON events (kind)")
+    assert (index["lock"], index["blocks"], index["table"]) == ("SHARE", "writes", "events")
+    assert (concurrent["lock"], concurrent["blocks"]) == ("SHARE UPDATE EXCLUSIVE", None)
+    assert classify_statement("ALTER TABLE events ALTER COLUMN kind TYPE varchar(20)")["lock"] == "ACCESS EXCLUSIVE"
+    assert classify_statement("ALTER TABLE events ADD CONSTRAINT fk FOREIGN KEY (id) REFERENCES users (id) NOT VALID")["scales"] is False
+    assert classify_statement("ALTER TABLE events ADD COLUMN note TEXT, ALGORITHM=INSTANT", "mysql")["scales"] is False
+    assert classify_statement("VACUUM FULL events")["blocks"] == "reads"
+    assert classify_statement("LOCK TABLE events IN EXCLUSIVE MODE")["lock"] == "UNKNOWN"
+
+    assert rate_risk(index["blocks"], index["scales"], 5000000) == "high"
+    assert rate_risk(concurrent["blocks"], concurrent["scales"], 5000000) == "medium"
+    assert rate_risk(index["blocks"], index["scales"], 100) == "medium"
+    assert rate_risk(None, True, 100) == "low"
+
+
+def test_plan_estimates_without_applying(tmp_path):
+    """
+    Test that the plan estimates rows on existing and newly created tables, records errors, and leaves the database unchanged.
+    """
+    registry, up_dir = setup_project(tmp_path, {
+        "V1.1__index.sql": "CREATE INDEX events_kind_idx ON events (kind);\nUPDATE events SET kind = 'tap' WHERE kind = 'view';",
+        "V1.2__audit.sql": "CREATE TABLE audit (id INTEGER, event_id INTEGER);\nINSERT INTO audit (event_id) SELECT id FROM events;\nDELETE FROM missing;",
+    })
+
+    report = MigrationRunner(str(up_dir), registry).plan_migrations(large_table_rows=100)
+
+    index, audit = report
+    assert [(s["lock"], s["rows"], s["risk"]) for s in index["statements"]] == [
+        ("EXCLUSIVE (database)", 200, "high"), ("RESERVED (database)", 200, "high")]
+    assert (index["risk"], index["rows"]) == ("high", 400)
+    create, insert, delete = audit["statements"]
+    assert (create["risk"], insert["rows"], insert["risk"]) == ("medium", 200, "high")
+    assert delete["rows"] is None and "no such table" in delete["error"]
+
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('audit', 'events_kind_idx')")
+        assert cursor.fetchall() == []
+        cursor.execute("SELECT COUNT(*) FROM events WHERE kind = 'view'")
+        assert cursor.fetchone()[0] == 50
+        cursor.close()
+    assert MigrationRunner(str(up_dir), registry).get_applied_migrations() == {}
+
+
+def test_sqlite_explain_does_not_execute(tmp_path):
+    """
+    Test that SQLite estimates DML from its query plan without running it, even if the transaction is committed.
+    """
+    registry, _ = setup_project(tmp_path, {})
+    adapter = registry._get_adapter()
+
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        assert adapter.explain_statement(cursor, "DELETE FROM events") == {"rows": 200, "cost": None}
+        assert adapter.explain_statement(cursor, "DELETE FROM events WHERE id = 3") == {"rows": 1, "cost": None}
+        assert adapter.explain_statement(cursor, "UPDATE events SET kind = 'tap' WHERE id > 10") == {"rows": 200, "cost": None}
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM events")
+        assert cursor.fetchone()[0] == 200
+        cursor.close()
+
+
+def test_cli_plan_explain(tmp_path, capsys):
+    """
+    Test plan --explain in text and JSON form.
+    """
+    registry, up_dir = setup_project(tmp_path, {"V1.1__index.sql": "CREATE INDEX events_kind_idx ON events (kind);"})
+    config_path = tmp_path / "migrations.json"
+    config_path.write_text(json.dumps({"database": registry.db_config, "migrations": {"migration_dir": str(up_dir)}}))
+
+    assert cli.main(["--config", str(config_path), "plan", "--explain", "--large-table-rows", "100"]) == cli.EXIT_OK
+    out = capsys.readouterr().out
+    assert "high" in out and "schedule off-peak: V1.1" in out
+
+    assert cli.main(["--config", str(config_path), "plan", "--explain", "--json"]) == cli.EXIT_OK
+    report = json.loads(capsys.readouterr().out)
+    assert report[0]["version"] == "V1.1" and report[0]["risk"] == "medium"
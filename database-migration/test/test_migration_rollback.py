@@ -0,0 +1,141 @@
+"""
+test_migration_rollback.py
+--------------------------
+Unit tests for transactional rollback of applied migrations, run on the embedded SQLite backend.
+"""
+
+import pytest
+from pathlib import Path
+from core.migration_registry import MigrationRegistry
+from core.migration_rollback import MigrationRollback
+from core.migration_runner import MigrationRunner
+
+
+def setup_migrations(tmp_path, count, broken_down=None):
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    for i in range(1, count + 1):
+        (up_dir / f"V1.{i}__step_{i}.sql").write_text(f"CREATE TABLE t{i} (id INTEGER);")
+        down_sql = "DROP TABLE missing_table;" if i == broken_down else f"DROP TABLE t{i};"
+        (down_dir / f"V1.{i}__step_{i}.sql").write_text(down_sql)
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    MigrationRunner(str(up_dir), registry).run_migrations()
+    return registry, str(down_dir)
+
+
+def state(registry):
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 't%' ORDER BY name")
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+        versions = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables, versions
+
+
+def test_rollback_runs_down_chain_and_cleans_registry(tmp_path):
+    """
+    Test that rollback reverses every version above the target, newest first, and removes their registry rows.
+    """
+    registry, down_dir = setup_migrations(tmp_path, 4)
+
+    rolled_back = MigrationRollback(down_dir, registry, Path("V1.2__step_2.sql")).rollback()
+
+    assert rolled_back == ["V1.4", "V1.3"]
+    assert state(registry) == (["t1", "t2"], ["V1.1", "V1.2"])
+
+
+def test_failed_step_rolls_back_everything(tmp_path):
+    """
+    Test that a failing down migration leaves schema and registry untouched in atomic mode.
+    """
+    registry, down_dir = setup_migrations(tmp_path, 3, broken_down=2)
+
+    with pytest.raises(Exception):
+        MigrationRollback(down_dir, registry, "V1.1").rollback()
+
+    assert state(registry) == (["t1", "t2", "t3"], ["V1.1", "V1.2", "V1.3"])
+
+
+def test_non_atomic_rollback_keeps_completed_steps(tmp_path):
+    """
+    Test that with atomic=False the steps before the failing one are committed.
+    """
+    registry, down_dir = setup_migrations(tmp_path, 3, broken_down=2)
+
+    with pytest.raises(Exception):
+        MigrationRollback(down_dir, registry, "V1.1", atomic=False).rollback()
+
+    assert state(registry) == (["t1", "t2"], ["V1.1", "V1.2"])
+
+
+def test_missing_down_migration_runs_nothing(tmp_path):
+    """
+    Test that a rollback without a down file for every affected version fails before executing anything.
+    """
+    registry, down_dir = setup_migrations(tmp_path, 3)
+    (Path(down_dir) / "V1.2__step_2.sql").unlink()
+
+    with pytest.raises(ValueError):
+        MigrationRollback(down_dir, registry, "V1.1").rollback()
+
+    assert state(registry)[1] == ["V1.1", "V1.2", "V1.3"]
+
+
+def test_rollback_without_transactional_ddl_commits_each_step(tmp_path, monkeypatch):
+    """
+    Test that on a backend whose DDL commits implicitly (as MySQL's does), every step is committed with its registry row and no savepoint is used.
+    """
+    registry, down_dir = setup_migrations(tmp_path, 4, broken_down=2)
+    adapter = registry._get_adapter()
+    execute_script = adapter.execute_script
+
+    def execute_and_commit(cursor, sql):
+        execute_script(cursor, sql)
+        cursor.connection.commit()
+
+    monkeypatch.setattr(adapter, "TRANSACTIONAL_DDL", False)
+    monkeypatch.setattr(adapter, "execute_script", execute_and_commit)
+
+    MigrationRollback(down_dir, registry, "V1.3").rollback()
+    assert state(registry) == (["t1", "t2", "t3"], ["V1.1", "V1.2", "V1.3"])
+
+    with pytest.raises(Exception):
+        MigrationRollback(down_dir, registry, "V1.1").rollback()
+    assert state(registry) == (["t1", "t2"], ["V1.1", "V1.2"])
+
+
+def test_backfill_applied_again_after_rollback_covers_every_row(tmp_path):
+    """
+    Test that rolling back a backfill clears its checkpoint, so applying it again updates every row instead of resuming past the old high-water key.
+    """
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    rows = ", ".join(f"({i}, {i})" for i in range(1, 51))
+    (up_dir / "V1.1__orders.sql").write_text(f"CREATE TABLE orders (id INTEGER PRIMARY KEY, total INTEGER, total_cents INTEGER); INSERT INTO orders (id, total) VALUES {rows};")
+    (up_dir / "V1.2__backfill_cents.sql").write_text(
+        "-- backfill: table=orders key=id chunk_size=20 min_chunk_size=20 max_chunk_size=20 max_sleep=0\n"
+        "UPDATE orders SET total_cents = total * 100 WHERE id >= {start} AND id < {end};\n"
+    )
+    (down_dir / "V1.1__orders.sql").write_text("DROP TABLE orders;")
+    (down_dir / "V1.2__backfill_cents.sql").write_text("UPDATE orders SET total_cents = NULL;")
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+
+    def unfilled():
+        with registry.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM orders WHERE total_cents IS NULL").fetchone()[0]
+
+    MigrationRunner(str(up_dir), registry).run_migrations()
+    assert unfilled() == 0
+    MigrationRollback(str(down_dir), registry, Path("V1.1__orders.sql")).rollback()
+    assert unfilled() == 50
+    MigrationRunner(str(up_dir), registry).run_migrations()
+
+    assert unfilled() == 0
+    with registry.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM schema_migration_checkpoints").fetchone()[0] == 0
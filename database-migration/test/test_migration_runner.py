@@ -0,0 +1,213 @@
+"""
+test_migration_runner.py
+------------------------
+Unit tests for the migration runner's apply modes, using a recording connection in place of a live database.
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from core.migration_runner import MigrationRunner
+from core.migration_registry import MigrationRegistry
+from adapters.postgres import posgrestSQL
+
+
+class RecordingCursor:
+    rowcount = -1
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.fail_on and self.conn.fail_on in sql:
+            raise RuntimeError("boom")
+        self.conn.pending.append(sql)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.pending = []
+        self.committed = []
+        self.commits = 0
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+def write_migrations(directory, count):
+    for i in range(1, count + 1):
+        (directory / f"V1.{i}__step_{i}.sql").write_text(f"CREATE TABLE t{i} (id INT);")
+
+
+def make_runner(monkeypatch, tmp_path, conn):
+    registry = MigrationRegistry({'type': 'postgresql'})
+    monkeypatch.setattr(registry, "_get_connection", lambda: conn)
+    runner = MigrationRunner(str(tmp_path), registry)
+    monkeypatch.setattr(runner, "get_applied_migrations", lambda: {})
+    return runner
+
+
+def test_batch_apply_single_transaction(monkeypatch, tmp_path):
+    """
+    Test that batch mode writes every migration and registry row in one commit.
+    """
+    write_migrations(tmp_path, 5)
+    conn = RecordingConnection()
+    runner = make_runner(monkeypatch, tmp_path, conn)
+
+    runner.run_migrations(batch=True)
+
+    assert conn.commits == 1
+    assert sum("INSERT INTO schema_migrations" in sql for sql in conn.committed) == 5
+
+
+def test_batch_apply_commit_groups(monkeypatch, tmp_path):
+    """
+    Test that batch_size splits the pending migrations into commit groups.
+    """
+    write_migrations(tmp_path, 5)
+    conn = RecordingConnection()
+    runner = make_runner(monkeypatch, tmp_path, conn)
+
+    runner.run_migrations(batch=True, batch_size=2)
+
+    assert conn.commits == 3
+
+
+def test_batch_apply_failure_discards_registry_rows(monkeypatch, tmp_path):
+    """
+    Test that a failing migration rolls back its group's registry rows along with its SQL.
+    """
+    write_migrations(tmp_path, 4)
+    conn = RecordingConnection(fail_on="t3")
+    runner = make_runner(monkeypatch, tmp_path, conn)
+
+    with pytest.raises(RuntimeError):
+        runner.run_migrations(batch=True, batch_size=2)
+
+    assert conn.commits == 1
+    assert sum("INSERT INTO schema_migrations" in sql for sql in conn.committed) == 2
+
+
+def test_server_diff_returns_only_pending(monkeypatch, tmp_path):
+    """
+    Test that server_diff ships every scanned pair once and applies only the versions the database reports as unapplied.
+    """
+    write_migrations(tmp_path, 3)
+    registry = MigrationRegistry({'type': 'postgresql'})
+    shipped = []
+
+    def pending(pairs):
+        shipped.extend(pairs)
+        return [("V1.3", pairs[2][1], None)]
+
+    monkeypatch.setattr(registry, "get_pending_migrations", pending)
+    runner = MigrationRunner(str(tmp_path), registry, server_diff=True)
+
+    to_apply = runner.get_migrations_to_apply()
+
+    assert [v for v, _ in shipped] == ["V1.1", "V1.2", "V1.3"]
+    assert [m["version"] for m in to_apply] == ["V1.3"]
+
+
+def test_server_diff_rejects_changed_migration(monkeypatch, tmp_path):
+    """
+    Test that a recorded checksum mismatch reported by the database raises.
+    """
+    write_migrations(tmp_path, 2)
+    registry = MigrationRegistry({'type': 'postgresql'})
+    monkeypatch.setattr(registry, "get_pending_migrations", lambda pairs: [("V1.1", pairs[0][1], "0" * 32)])
+    runner = MigrationRunner(str(tmp_path), registry, server_diff=True)
+
+    with pytest.raises(ValueError):
+        runner.get_migrations_to_apply()
+
+
+def test_postgres_pending_query_uses_one_values_list():
+    """
+    Test that the PostgreSQL adapter sends all pairs in a single parameterized statement.
+    """
+    conn = RecordingConnection()
+    cursor = conn.cursor()
+    posgrestSQL().get_pending_migrations(cursor, [("V1.1", "a"), ("V1.2", "b")])
+
+    assert len(conn.pending) == 1
+    assert "VALUES (%s, %s), (%s, %s)" in conn.pending[0]
+
+
+def test_profile_statements_records_each_statement(monkeypatch, tmp_path):
+    """
+    Test that profiling executes statements one by one and records a profile row per statement.
+    """
+    (tmp_path / "V1.1__seed.sql").write_text("CREATE TABLE t (id INT);\nINSERT INTO t VALUES (1);\nINSERT INTO t VALUES (2);\n")
+    conn = RecordingConnection()
+    runner = make_runner(monkeypatch, tmp_path, conn)
+    runner.profile_statements = True
+    profiles = []
+    monkeypatch.setattr(runner.migration_registry, "initialize_profiling", lambda: None)
+    monkeypatch.setattr(runner.migration_registry, "record_statement_profiles",
+                        lambda version, rows, cursor=None: profiles.extend(rows))
+
+    runner.run_migrations()
+
+    assert [p["statement_index"] for p in profiles] == [0, 1, 2]
+    assert profiles[1]["statement"] == "INSERT INTO t VALUES (1)"
+    assert all(isinstance(p["duration_ms"], int) for p in profiles)
+
+
+def test_advisory_lock_single_applier(tmp_path):
+    """
+    Test that runners started together against one registry apply each migration once, and the rest return without error.
+    """
+    migration_dir = tmp_path / "migrations"
+    migration_dir.mkdir()
+    write_migrations(migration_dir, 3)
+    db_config = {'type': 'sqlite', 'database': str(tmp_path / "app.db")}
+    MigrationRegistry(db_config).initialize()
+
+    def start_replica(_):
+        runner = MigrationRunner(str(migration_dir), MigrationRegistry(db_config), advisory_lock=True, lock_poll_interval=0.01)
+        return runner.run_migrations()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(start_replica, range(8)))
+
+    assert results.count("Migrations Applied") == 1
+    assert results.count("Up To Date") == 7
+    assert len(MigrationRunner(str(migration_dir), MigrationRegistry(db_config)).get_applied_migrations()) == 3
+
+
+def test_advisory_lock_times_out(tmp_path):
+    """
+    Test that a runner gives up when another holder keeps the lock past lock_timeout.
+    """
+    write_migrations(tmp_path, 1)
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        assert registry._get_adapter().try_advisory_lock(cursor, registry.lock_name)
+        conn.commit()
+    sleeps = []
+    runner = MigrationRunner(str(tmp_path), registry, advisory_lock=True, lock_timeout=0, sleep=sleeps.append)
+
+    with pytest.raises(TimeoutError):
+        runner.run_migrations()
+    assert runner.get_migrations_to_apply() != []
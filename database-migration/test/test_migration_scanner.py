@@ -0,0 +1,126 @@
+"""
+test_migration_scanner.py
+-------------------------
+Unit tests for migration discovery and checksum caching.
+"""
+
+import json
+import os
+import time
+import hashlib
+from core import checksum_manifest
+from core import migration_scanner
+from core.migration_scanner import MigrationScanner, default_manifest_path
+
+
+def write_migration(directory, name, sql, age=60):
+    path = directory / name
+    path.write_text(sql)
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return path
+
+
+def count_hashes(monkeypatch):
+    calls = []
+    real_md5 = hashlib.md5
+
+    def counting_md5(*args, **kwargs):
+        calls.append(args)
+        return real_md5(*args, **kwargs)
+
+    monkeypatch.setattr(migration_scanner.hashlib, "md5", counting_md5)
+    return calls
+
+
+def test_manifest_skips_unchanged_files(monkeypatch, tmp_path):
+    """
+    Test that a second scan reuses persisted checksums and only re-hashes modified files.
+    """
+    write_migration(tmp_path, "V1.1__users.sql", "CREATE TABLE users (id INT);")
+    changed = write_migration(tmp_path, "V1.2__orders.sql", "CREATE TABLE orders (id INT);")
+    first = MigrationScanner(str(tmp_path)).discover_migrations()
+
+    checksum_manifest._MEMO.clear()
+    write_migration(tmp_path, changed.name, "CREATE TABLE orders (id BIGINT);", age=30)
+    calls = count_hashes(monkeypatch)
+    second = MigrationScanner(str(tmp_path)).discover_migrations()
+
+    assert len(calls) == 1
+    assert second[0]["checksum"] == first[0]["checksum"]
+    assert second[1]["checksum"] != first[1]["checksum"]
+
+
+def test_manifest_kept_outside_migration_dir(manifest_cache_dir, tmp_path):
+    """
+    Test that the default manifest is written to the cache directory, one per migration directory, and not into the sources.
+    """
+    up_dir, down_dir = tmp_path / "up", tmp_path / "down"
+    up_dir.mkdir()
+    down_dir.mkdir()
+    write_migration(up_dir, "V1.1__users.sql", "CREATE TABLE users (id INT);")
+    write_migration(down_dir, "V1.1__users.sql", "DROP TABLE users;")
+
+    MigrationScanner(str(up_dir)).discover_migrations()
+    MigrationScanner(str(down_dir)).discover_migrations()
+
+    assert sorted(p.name for p in up_dir.iterdir()) == ["V1.1__users.sql"]
+    assert sorted(p.name for p in down_dir.iterdir()) == ["V1.1__users.sql"]
+    assert len(list(manifest_cache_dir.iterdir())) == 2
+    assert os.path.dirname(default_manifest_path(str(up_dir))) == str(manifest_cache_dir)
+
+
+def test_memo_shared_between_scanners(monkeypatch, tmp_path):
+    """
+    Test that scanners in the same process share checksums without a manifest file.
+    """
+    write_migration(tmp_path, "V1.1__users.sql", "CREATE TABLE users (id INT);")
+    MigrationScanner(str(tmp_path), use_manifest=False).discover_migrations()
+
+    calls = count_hashes(monkeypatch)
+    MigrationScanner(str(tmp_path), use_manifest=False).discover_migrations()
+
+    assert calls == []
+    assert not os.path.exists(default_manifest_path(str(tmp_path)))
+
+
+def test_manifest_prunes_deleted_files(tmp_path):
+    """
+    Test that entries for removed migration files are dropped from the manifest.
+    """
+    write_migration(tmp_path, "V1.1__users.sql", "CREATE TABLE users (id INT);")
+    removed = write_migration(tmp_path, "V1.2__orders.sql", "CREATE TABLE orders (id INT);")
+    MigrationScanner(str(tmp_path)).discover_migrations()
+
+    removed.unlink()
+    MigrationScanner(str(tmp_path)).discover_migrations()
+
+    with open(default_manifest_path(str(tmp_path))) as f:
+        assert list(json.load(f)["files"]) == ["V1.1__users.sql"]
+
+
+def test_streaming_checksum_matches_full_read(monkeypatch, tmp_path):
+    """
+    Test that chunked hashing produces the same md5 as hashing the whole file.
+    """
+    monkeypatch.setattr(migration_scanner, "CHUNK_SIZE", 7)
+    sql = "INSERT INTO products VALUES (1);\n" * 50
+    path = write_migration(tmp_path, "V1.1__seed.sql", sql)
+
+    assert migration_scanner.compute_checksum(str(path)) == hashlib.md5(sql.encode()).hexdigest()
+
+
+def test_parallel_blake2b_scan_is_tagged_and_validates_md5(tmp_path):
+    """
+    Test that blake2b checksums carry an algorithm tag and that rows recorded with md5 still validate.
+    """
+    for i in range(1, 6):
+        write_migration(tmp_path, f"V1.{i}__step.sql", f"CREATE TABLE t{i} (id INT);")
+    scanner = MigrationScanner(str(tmp_path), use_manifest=False, algorithm="blake2b", max_workers=4)
+
+    migrations = scanner.discover_migrations()
+    md5_checksum = hashlib.md5(b"CREATE TABLE t1 (id INT);").hexdigest()
+
+    assert all(m["checksum"].startswith("blake2b:") and len(m["checksum"]) <= 64 for m in migrations)
+    assert migration_scanner.checksum_matches(migrations[0], md5_checksum)
+    assert not migration_scanner.checksum_matches(migrations[1], md5_checksum)
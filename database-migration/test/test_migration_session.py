@@ -0,0 +1,78 @@
+"""
+test_migration_session.py
+-------------------------
+Unit tests for session-scoped connection reuse across the registry, runner and rollback.
+"""
+
+import sqlite3
+import threading
+from core.migration_registry import MigrationRegistry
+from core.migration_session import MigrationSession
+
+
+def counting_registry(monkeypatch):
+    """
+    Build a registry whose connections are in-memory sqlite connections, counting each connect.
+    """
+    registry = MigrationRegistry({'type': 'postgresql'})
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(registry, "_get_connection", connect)
+    return registry, opened
+
+
+def test_session_reuses_one_connection(monkeypatch):
+    """
+    Test that repeated and nested borrows inside a session share a single connection.
+    """
+    registry, opened = counting_registry(monkeypatch)
+
+    with MigrationSession(registry):
+        for _ in range(5):
+            with registry.connection() as conn:
+                with registry.connection() as nested:
+                    assert nested is conn
+
+    assert len(opened) == 1
+    assert registry.session is None
+
+
+def test_without_session_connects_per_call(monkeypatch):
+    """
+    Test that the registry falls back to a new connection per call when no session is open.
+    """
+    registry, opened = counting_registry(monkeypatch)
+
+    for _ in range(3):
+        with registry.connection():
+            pass
+
+    assert len(opened) == 3
+
+
+def test_session_pool_is_bounded(monkeypatch):
+    """
+    Test that concurrent borrowers never open more connections than pool_size.
+    """
+    registry, opened = counting_registry(monkeypatch)
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(10):
+            with registry.connection() as conn:
+                conn.execute("SELECT 1")
+
+    with MigrationSession(registry, pool_size=2):
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(opened) <= 2
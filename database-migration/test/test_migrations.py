@@ -7,7 +7,7 @@ Unit tests for migration registry, version management, and migration runner func
 from pathlib import Path
 import re
 from core.migration_runner import MigrationRunner
-from core.version_manager import VersionManager
+from core.version_manager import Version, VersionManager
 from core.migration_registry import MigrationRegistry
 
 
@@ -47,7 +47,8 @@ def test_extract_version(clean_db):
 
     extracted_version = version_manager.extract_version(new_file_with_version)
 
-    assert type(extracted_version) == float
+    assert isinstance(extracted_version, Version)
+    assert extracted_version > version_manager.parse_version("V1.1")
 
 
 def test_find_migrations(db_config, clean_db):
@@ -0,0 +1,123 @@
+"""
+test_parallel_executor.py
+-------------------------
+Unit tests for migration dependency analysis and the parallel executor.
+"""
+
+import threading
+import time
+from core.migration_registry import MigrationRegistry
+from core import parallel_executor
+from core.parallel_executor import ParallelMigrationExecutor, analyze_migration, analyze_migration_file, build_dependency_graph
+
+
+def analyzed(*sqls):
+    return [{"version": f"V1.{i}", "analysis": analyze_migration(sql)} for i, sql in enumerate(sqls, start=1)]
+
+
+def test_analyze_migration_tables_and_depends():
+    """
+    Test that touched tables and declared dependencies are read from the SQL.
+    """
+    analysis = analyze_migration(
+        "-- depends: V1.1\n"
+        "CREATE TABLE orders (id INT, user_id INT REFERENCES users(id));\n"
+        "CREATE INDEX CONCURRENTLY orders_user_idx ON orders (user_id);\n"
+    )
+
+    assert analysis["depends"] == {"V1.1"}
+    assert analysis["tables"] == {"orders", "users"}
+    assert not analysis["barrier"]
+
+
+def test_analyze_migration_file_reads_in_chunks_with_dialect(monkeypatch, tmp_path):
+    """
+    Test that migration files are analyzed chunk by chunk using the backend's SQL dialect.
+    """
+    path = tmp_path / "V1.2__seed.sql"
+    path.write_text(
+        "-- depends: V1.1\n"
+        "INSERT INTO users VALUES ('it\\'s; DROP FUNCTION f');\n"
+        "-- depends: V1.0\n"
+    )
+    monkeypatch.setattr(parallel_executor, "READ_CHUNK_CHARS", 5)
+
+    analysis = analyze_migration_file(str(path), "mysql")
+
+    assert analysis == {"depends": {"V1.0", "V1.1"}, "tables": {"users"}, "barrier": False}
+    assert analyze_migration_file(str(path))["barrier"]
+
+
+def test_dependency_graph_links_shared_tables_and_barriers():
+    """
+    Test that migrations sharing a table are ordered and unknown statements act as barriers.
+    """
+    migrations = analyzed(
+        "CREATE TABLE users (id INT);",
+        "CREATE TABLE products (id INT);",
+        "ALTER TABLE users ADD COLUMN email TEXT;",
+        "CREATE FUNCTION noop() RETURNS void AS $$ BEGIN END $$ LANGUAGE plpgsql;",
+        "CREATE INDEX products_idx ON products (id);",
+    )
+
+    graph = build_dependency_graph(migrations)
+
+    assert graph[1] == set()
+    assert graph[2] == {0}
+    assert graph[3] == {0, 1, 2}
+    assert graph[4] == {1, 3}
+
+
+class SleepyCursor:
+    def execute(self, sql, params=None):
+        if "CREATE" in sql:
+            time.sleep(0.05)
+
+    def close(self):
+        pass
+
+
+class SleepyConnection:
+    def cursor(self):
+        return SleepyCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_parallel_executor_overlaps_independent_migrations(monkeypatch, tmp_path):
+    """
+    Test that independent migrations run concurrently while dependent ones wait for their dependencies.
+    """
+    sqls = ["CREATE TABLE a (id INT);", "CREATE TABLE b (id INT);", "CREATE TABLE c (id INT);", "ALTER TABLE a ADD COLUMN x INT;"]
+    to_apply = []
+    for i, sql in enumerate(sqls, start=1):
+        path = tmp_path / f"V1.{i}__step.sql"
+        path.write_text(sql)
+        to_apply.append({"version": f"V1.{i}", "path": str(path)})
+
+    registry = MigrationRegistry({'type': 'postgresql'})
+    monkeypatch.setattr(registry, "_get_connection", SleepyConnection)
+    recorded = []
+    lock = threading.Lock()
+
+    def record(migration, execution_time, status, applied_by='system', cursor=None):
+        with lock:
+            recorded.append(migration["version"])
+
+    monkeypatch.setattr(registry, "record_migration", record)
+
+    start = time.time()
+    committed = ParallelMigrationExecutor(registry, max_workers=3).run(to_apply)
+    elapsed = time.time() - start
+
+    assert sorted(committed) == ["V1.1", "V1.2", "V1.3", "V1.4"]
+    assert committed.index("V1.1") < committed.index("V1.4")
+    assert sorted(recorded) == sorted(committed)
+    assert elapsed < 0.15
@@ -0,0 +1,106 @@
+"""
+test_sqlite_adapter.py
+----------------------
+End-to-end tests of the registry, runner and backfill paths on the embedded SQLite backend.
+"""
+
+import pytest
+from core.migration_registry import MigrationRegistry
+from core.migration_runner import MigrationRunner
+from core.migration_session import MigrationSession
+
+
+def write_migrations(directory, files):
+    for name, sql in files.items():
+        (directory / name).write_text(sql)
+
+
+def fetch(registry, sql):
+    with registry.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+
+def test_in_memory_registry_applies_and_diffs(tmp_path):
+    """
+    Test that an in-memory database is shared by every connection of a registry and the server-side diff sees applied rows.
+    """
+    write_migrations(tmp_path, {
+        "V1.1__users.sql": "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);\nINSERT INTO users (name) VALUES ('a;b');",
+        "V1.2__orders.sql": "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER);",
+    })
+    registry = MigrationRegistry({'type': 'sqlite', 'database': ':memory:'})
+    assert registry.initialize(index_checksums=True) == "Applied"
+
+    assert MigrationRunner(str(tmp_path), registry).run_migrations() == "Migrations Applied"
+
+    assert fetch(registry, "SELECT name FROM users") == [("a;b",)]
+    assert [row[0] for row in fetch(registry, "SELECT version FROM schema_migrations ORDER BY version")] == ["V1.1", "V1.2"]
+    assert MigrationRunner(str(tmp_path), registry, server_diff=True).get_migrations_to_apply() == []
+    assert fetch(MigrationRegistry({'type': 'sqlite', 'database': ':memory:'}), "SELECT name FROM sqlite_master WHERE name = 'users'") == []
+
+
+def test_failed_batch_rolls_back_ddl(tmp_path):
+    """
+    Test that a failing migration rolls back the DDL and registry rows of its whole commit group.
+    """
+    write_migrations(tmp_path, {
+        "V1.1__users.sql": "CREATE TABLE users (id INTEGER PRIMARY KEY);",
+        "V1.2__broken.sql": "INSERT INTO missing_table VALUES (1);",
+    })
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+
+    with pytest.raises(Exception):
+        MigrationRunner(str(tmp_path), registry).run_migrations(batch=True)
+
+    assert fetch(registry, "SELECT name FROM sqlite_master WHERE name = 'users'") == []
+    assert fetch(registry, "SELECT version FROM schema_migrations") == []
+
+
+def test_backfill_and_profiles_on_sqlite(tmp_path):
+    """
+    Test that backfills run through the SQLite adapter, dropping their checkpoint once recorded, and statement profiles are recorded, over a pooled session.
+    """
+    write_migrations(tmp_path, {
+        "V1.1__orders.sql": "CREATE TABLE orders (id INTEGER PRIMARY KEY, total INTEGER, total_cents INTEGER);\n"
+                            "INSERT INTO orders (id, total) VALUES (1, 1), (2, 2), (3, 3), (4, 4), (5, 5);",
+        "V1.2__backfill.sql": "-- backfill: table=orders key=id chunk_size=2 min_chunk_size=2 max_chunk_size=2\n"
+                              "UPDATE orders SET total_cents = total * 100 WHERE id >= {start} AND id < {end};",
+    })
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+
+    with MigrationSession(registry, pool_size=2):
+        MigrationRunner(str(tmp_path), registry, profile_statements=True).run_migrations()
+
+    assert fetch(registry, "SELECT SUM(total_cents) FROM orders") == [(1500,)]
+    assert fetch(registry, "SELECT last_key FROM schema_migration_checkpoints WHERE version = 'V1.2'") == []
+    assert fetch(registry, "SELECT statement_index, row_count FROM schema_migration_statements ORDER BY statement_index") == [(0, None), (1, 5)]
+
+
+def test_run_migrations_opens_a_session(tmp_path, monkeypatch):
+    """
+    Test that run_migrations borrows from a session of its own, instead of connecting once per registry call, and detaches it afterwards.
+    """
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    write_migrations(migrations, {f"V1.{i}__t{i}.sql": f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY);" for i in range(1, 6)})
+    registry = MigrationRegistry({'type': 'sqlite', 'database': str(tmp_path / "app.db")})
+    registry.initialize()
+    connect, opened = registry._get_connection, []
+
+    def counting_connect():
+        opened.append(connect())
+        return opened[-1]
+
+    monkeypatch.setattr(registry, "_get_connection", counting_connect)
+    assert MigrationRunner(str(migrations), registry).run_migrations() == "Migrations Applied"
+
+    assert len(opened) == 1
+    assert registry.session is None
+    assert len(fetch(registry, "SELECT version FROM schema_migrations")) == 5
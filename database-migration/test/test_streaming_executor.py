@@ -0,0 +1,101 @@
+"""
+test_streaming_executor.py
+--------------------------
+Unit tests for streaming execution of large data-seed migrations.
+"""
+
+from decimal import Decimal
+import pytest
+from core import streaming_executor
+from core.streaming_executor import stream_migration
+from adapters.postgres import posgrestSQL
+from adapters.mysql import mySQL
+
+
+class CapturingCursor:
+    rowcount = -1
+
+    def __init__(self):
+        self.statements = []
+        self.copies = []
+        self.executemany_calls = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def executemany(self, sql, rows):
+        self.executemany_calls.append((sql, list(rows)))
+
+    def copy_expert(self, sql, file):
+        self.copies.append((sql, file.read()))
+
+
+SEED = """CREATE TABLE products (product_id SERIAL PRIMARY KEY, name VARCHAR(100), price DECIMAL(10, 2));
+
+-- reference data
+INSERT INTO products (name, price) VALUES
+('Laptop', 1200.00),
+('It''s a tab\tbed', 25.50),
+('Clock', NULL),
+('Now', NOW()),
+('Mouse', -3);
+
+COMMENT ON TABLE products IS 'seeded; with care';
+"""
+
+
+def seed_migration(tmp_path, monkeypatch, chunk=7):
+    monkeypatch.setattr(streaming_executor, "READ_CHUNK_CHARS", chunk)
+    monkeypatch.setattr(streaming_executor, "STREAM_INSERT_CHARS", 0)
+    path = tmp_path / "V1.3__product.sql"
+    path.write_text(SEED)
+    return {"version": "V1.3", "path": str(path)}
+
+
+def test_postgres_stream_uses_copy_in_batches(tmp_path, monkeypatch):
+    """
+    Test that literal rows are loaded with COPY in batches while non-literal rows run as single INSERTs in order.
+    """
+    migration = seed_migration(tmp_path, monkeypatch)
+    cursor = CapturingCursor()
+
+    stream_migration(cursor, migration, posgrestSQL(), batch_rows=2)
+
+    assert cursor.statements[0].startswith("CREATE TABLE products")
+    assert cursor.statements[1] == "INSERT INTO products (name, price) VALUES ('Now', NOW())"
+    assert cursor.statements[2] == "COMMENT ON TABLE products IS 'seeded; with care'"
+    assert [sql for sql, _ in cursor.copies] == ["COPY products (name, price) FROM STDIN"] * 3
+    assert cursor.copies[0][1] == "Laptop\t1200.00\nIt's a tab\\tbed\t25.50\n"
+    assert cursor.copies[1][1] == "Clock\t\\N\n"
+    assert cursor.copies[2][1] == "Mouse\t-3\n"
+
+
+def test_mysql_stream_uses_executemany(tmp_path, monkeypatch):
+    """
+    Test that MySQL receives literal rows as parameter tuples through executemany.
+    """
+    migration = seed_migration(tmp_path, monkeypatch, chunk=64)
+    cursor = CapturingCursor()
+
+    stream_migration(cursor, migration, mySQL(), batch_rows=10)
+
+    sql, rows = cursor.executemany_calls[0]
+    assert sql == "INSERT INTO products (name, price) VALUES (%s, %s)"
+    assert rows == [("Laptop", Decimal("1200.00")), ("It's a tab\tbed", Decimal("25.50")), ("Clock", None)]
+
+
+def test_stream_rejects_trailing_insert_clause(tmp_path, monkeypatch):
+    """
+    Test that small INSERTs run as written, while streamed INSERTs with clauses after VALUES are refused rather than partially honoured.
+    """
+    path = tmp_path / "V1.4__upsert.sql"
+    path.write_text("INSERT INTO t (a) VALUES (1), (2) ON CONFLICT DO NOTHING;")
+    cursor = CapturingCursor()
+
+    stream_migration(cursor, {"path": str(path)}, posgrestSQL())
+    assert cursor.statements == ["INSERT INTO t (a) VALUES (1), (2) ON CONFLICT DO NOTHING"]
+
+    monkeypatch.setattr(streaming_executor, "READ_CHUNK_CHARS", 30)
+    monkeypatch.setattr(streaming_executor, "STREAM_INSERT_CHARS", 0)
+    with pytest.raises(ValueError):
+        stream_migration(CapturingCursor(), {"path": str(path)}, posgrestSQL())
@@ -0,0 +1,45 @@
+"""
+test_version_manager.py
+-----------------------
+Unit tests for the Version value type and migration ordering.
+"""
+
+from pathlib import Path
+from core.version_manager import Version, VersionManager
+from core.migration_scanner import MigrationScanner
+
+
+def test_version_ordering_is_numeric_per_part():
+    """
+    Test that versions compare part by part as integers, including multi-part and timestamp versions.
+    """
+    ordered = ["V1.2", "V1.9", "V1.10", "V1.10.1", "V2", "V1712345678.1", "V1712345678.25"]
+
+    assert sorted((Version.parse(v) for v in reversed(ordered))) == [Version.parse(v) for v in ordered]
+    assert Version.parse("V1.1") == Version.parse("1.01")
+    assert Version.parse("V1.10") is Version.parse("V1.10")
+    assert str(Version.parse("V1.10")) == "V1.10"
+
+
+def test_order_migrations_drops_non_migrations():
+    """
+    Test that order_migrations sorts by Version and skips files that are not migrations.
+    """
+    files = [Path("V1.10__c.sql"), Path("notes.sql"), Path("V1.9__b.sql"), Path("V1__a.sql")]
+
+    ordered = VersionManager().order_migrations(files)
+
+    assert [f.name for f in ordered] == ["V1__a.sql", "V1.9__b.sql", "V1.10__c.sql"]
+
+
+def test_scanner_orders_by_version(tmp_path):
+    """
+    Test that the scanner returns V1.10 after V1.9 and attaches the parsed Version.
+    """
+    for name in ["V1.10__ten.sql", "V1.9__nine.sql", "V1.2.1__patch.sql"]:
+        (tmp_path / name).write_text("SELECT 1;")
+
+    migrations = MigrationScanner(str(tmp_path), use_manifest=False).discover_migrations()
+
+    assert [m["version"] for m in migrations] == ["V1.2.1", "V1.9", "V1.10"]
+    assert migrations[2]["version_key"] == Version.parse("V1.10")
@@ -4,7 +4,9 @@ from enum import Enum
 class Strategies(Enum):
     API = "API"
     CSV = "CSV"
+    CSV_STREAM = "CSV_STREAM"
     DB = "DB"
+    DB_KEYSET = "DB_KEYSET"
 
 class ConnectorStrategy():
 
@@ -17,8 +19,12 @@ class ConnectorStrategy():
             self.strategy = connector_methods.api_connector
         elif strat == Strategies.CSV:
             self.strategy = connector_methods.csv_connector
+        elif strat == Strategies.CSV_STREAM:
+            self.strategy = connector_methods.csv_stream_connector
         elif strat == Strategies.DB:
             self.strategy = connector_methods.db_connector
+        elif strat == Strategies.DB_KEYSET:
+            self.strategy = connector_methods.db_keyset_connector
         else:
             raise ValueError("Unknown strategy")
 
@@ -3,13 +3,21 @@ import httpx
 import logging
 import csv
 import aiofiles
+import aiofiles.os
 import asyncpg
+import base64
+import zlib
+import asyncio
+import collections
 from typing import *
+from .csv_index import read_records, read_header, get_csv_index
+from .http_pool import HttpClientPool, TokenBucket, get_with_retries, shared_pool
+from .db_source import get_database_source
 
 class DataConnectors:
 
-    def __init__(self):
-        pass
+    def __init__(self, http_pool: Optional[HttpClientPool] = None):
+        self.http_pool = http_pool or shared_pool
 
     async def api_connector(
         self,
@@ -39,37 +47,135 @@ class DataConnectors:
         params = {offset[0]: offset[1], limit[0]: min(max(limit[1],1), _max_limit)}
 
         try:
-            async with httpx.AsyncClient() as client:
-                res = await client.get(url=endpoint, params=params, timeout=_timeout)
+            client = self.http_pool.get_client()
+            res = await client.get(url=endpoint, params=params, timeout=_timeout)
             res.raise_for_status()
-            try:
-                json_data = res.json()
-                return (json_data, (offset[1] + limit[1]), res.status_code)
-            except ValueError as ve:
-                logging.warning(f'Invalid JSON returned from API, returning as text...{ve}')
-                text_data = res.text
-                return (text_data, (offset[1] + limit[1]), res.status_code)
+            return (_response_data(res), (offset[1] + limit[1]), res.status_code)
 
         except Exception as e:
             logging.exception(f'Error fetching from API: {e}')
             return None, offset[1], 500
 
+    async def api_crawl(
+        self,
+        endpoint: str,
+        offset: tuple[str,int] = ('page',0),
+        limit: tuple[str,int] = ('size',1),
+        pages: Optional[int] = None,
+        step: Optional[int] = None,
+        concurrency: int = 4,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        extract: Optional[Callable[[Any], Any]] = None,
+        _max_limit: int = 100,
+        _timeout: int = 30,
+    ) -> AsyncIterator[Tuple[Optional[Any],int,int]]:
+
+        """
+        Crawls a paginated API endpoint, fetching up to `concurrency` pages at once over the shared client pool and yielding them in page order.
+
+        The crawl stops at the first page without rows, after `pages` pages, or at the first page that still fails after its retries,
+        which is yielded with None data so the caller can resume from its offset. Pages fetched past the end are discarded.
+        By default a page's rows are its whole body, i.e. the API returns a bare JSON list; pass extract for APIs that wrap their rows, e.g. {"data": [...]}.
+
+        Args:
+            endpoint (str): The API URL.
+            offset (Tuple[str, int]): (parameter name, value) for the first page's offset.
+            limit (Tuple[str, int]): (parameter name, value) for limit.
+            pages (int): Maximum number of pages to fetch, unbounded when None.
+            step (int): Offset increment per page. Defaults to the page size; use 1 for page-number parameters.
+            concurrency (int): Maximum pages in flight.
+            rate (float): Maximum requests per second, unlimited when None.
+            burst (float): Requests allowed in a burst above rate. Defaults to one second's worth.
+            retries (int): Retries per page for transport errors and 429/5xx responses, with jittered exponential backoff.
+            backoff (float): Base retry delay in seconds.
+            extract (Callable): Returns the rows of a page body, used to detect the end of the data. Defaults to the body itself.
+            max_limit (int): Maximum number of records to fetch per request.
+            timeout (int): Timeout for each request in seconds.
+
+        Returns:
+            AsyncIterator[Tuple[Optional[Any], int, int]]: (data, next_offset, status_code) per page, as api_connector returns
+        """
+        if not offset[0] or not limit[0]:
+            raise ValueError("Offset and limit parameter names must be non-empty strings")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        size = min(max(limit[1],1), _max_limit)
+        step = step or size
+        rate_limiter = TokenBucket(rate, burst) if rate else None
+        client = self.http_pool.get_client()
+
+        async def fetch(page_offset: int) -> Tuple[Optional[Any],int,int]:
+            try:
+                res = await get_with_retries(client, endpoint, {offset[0]: page_offset, limit[0]: size},
+                                             retries=retries, backoff=backoff, rate_limiter=rate_limiter, timeout=_timeout)
+                res.raise_for_status()
+                return (_response_data(res), page_offset + step, res.status_code)
+            except httpx.HTTPStatusError as e:
+                logging.exception(f'Error fetching from API: {e}')
+                return None, page_offset, e.response.status_code
+            except Exception as e:
+                logging.exception(f'Error fetching from API: {e}')
+                return None, page_offset, 500
+
+        window = collections.deque()
+        next_offset, scheduled = offset[1], 0
+
+        def schedule():
+            nonlocal next_offset, scheduled
+            window.append(asyncio.ensure_future(fetch(next_offset)))
+            next_offset += step
+            scheduled += 1
+
+        try:
+            while len(window) < concurrency and (pages is None or scheduled < pages):
+                schedule()
+            while window:
+                result = await window.popleft()
+                if result[0] is None:
+                    yield result
+                    return
+                if not (extract(result[0]) if extract else result[0]):
+                    return
+                yield result
+                if pages is None or scheduled < pages:
+                    schedule()
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
     async def csv_connector(
         self,
         file_path: str,
         offset: int,
         limit: int,
-        _max_limit: int = 100
+        _max_limit: int = 100,
+        _index_every: int = 1000,
+        _index_min_bytes: int = 1 << 20,
+        _chunk_size: int = 65536,
+        _encoding: str = 'utf-8'
     ) -> Tuple[List[Dict], Optional[int]]:
 
         """
         Fetches data from a CSV with pagination support
 
+        Files of at least index_min_bytes get a sparse sidecar index (see csv_index), so a page seeks to the
+        nearest indexed row and parses at most index_every extra rows, whatever the offset. Disjoint pages of
+        the same file can be read concurrently.
+
         Args:
             file_path(str): The file path
             offset(int): offset
             limit(int): limit of rows to read
             max_limit(int): internal argument for nax limit
+            index_every(int): internal argument for rows between indexed offsets
+            index_min_bytes(int): internal argument for the file size from which the index is used
+            chunk_size(int): internal argument for bytes read per disk read
+            encoding(str): internal argument for the file encoding
 
         Returns:
             List[Dict], Optional[Any]: A List of dicts which represents the row data, and a pointer
@@ -77,21 +183,100 @@ class DataConnectors:
         csv_data = []
         limit = min(_max_limit,limit)
         try:
-            async with aiofiles.open(file_path, 'r', newline='') as csvfile:
-                content = await csvfile.read()
-                reader = csv.DictReader(content.splitlines())
-                for _ in range(offset):
-                    next(reader, None)
-                for i,row in enumerate(reader):
-                    if i >= limit: break
-                    csv_data.append(row)
+            skip, start = max(offset,0), None
+            if (await aiofiles.os.stat(file_path)).st_size >= _index_min_bytes:
+                index = await get_csv_index(file_path, _index_every, _chunk_size)
+                if skip >= index["rows"]:
+                    return (csv_data,(offset + limit))
+                start = index["offsets"][skip // _index_every]
+                skip %= _index_every
 
+            records = []
+            async with aiofiles.open(file_path, 'rb') as csvfile:
+                header, data_start = await read_header(csvfile, _chunk_size)
+                if header is None or limit <= 0:
+                    return (csv_data,(offset + limit))
+                start = data_start if start is None else start
+                await csvfile.seek(start)
+                async for record, _ in read_records(csvfile, start, _chunk_size):
+                    if not record.strip(): continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    records.append(record.decode(_encoding))
+                    if len(records) >= limit: break
+
+            fieldnames = next(csv.reader([header.decode(_encoding).lstrip('\ufeff')]))
+            csv_data = list(csv.DictReader(records, fieldnames=fieldnames))
             return (csv_data,(offset + limit))
         except Exception as e:
             logging.exception(f'Error reading from csv {e}')
             return [], None
 
 
+    async def csv_stream_connector(
+        self,
+        file_path: str,
+        cursor: Optional[str],
+        limit: int,
+        _max_limit: int = 100,
+        _chunk_size: int = 65536,
+        _encoding: str = 'utf-8'
+    ) -> Tuple[List[Dict], Optional[str]]:
+
+        """
+        Streams data from a CSV with cursor-based pagination
+
+        Resuming seeks straight to the byte offset stored in the cursor and parses only the requested rows,
+        so every page costs the same and memory stays constant regardless of file size.
+        Quoted fields may span lines.
+
+        Args:
+            file_path(str): The file path
+            cursor(Optional[str]): cursor returned by the previous page, None to start at the first row
+            limit(int): limit of rows to read
+            max_limit(int): internal argument for max limit
+            chunk_size(int): internal argument for bytes read per disk read
+            encoding(str): internal argument for the file encoding
+
+        Returns:
+            List[Dict], Optional[str]: A List of dicts which represents the row data, and the cursor of the next page (None once the file is exhausted)
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for a file with a different header
+        """
+        csv_data = []
+        limit = max(min(_max_limit,limit),1)
+        try:
+            async with aiofiles.open(file_path, 'rb') as csvfile:
+                header, data_start = await read_header(csvfile, _chunk_size)
+                if header is None:
+                    return [], None
+                header_crc = zlib.crc32(header)
+                offset = data_start if cursor is None else _decode_cursor(cursor, header_crc, data_start)
+
+                await csvfile.seek(offset)
+                records = []
+                async for record, end in read_records(csvfile, offset, _chunk_size):
+                    offset = end
+                    if record.strip():
+                        records.append(record.decode(_encoding))
+                        if len(records) >= limit: break
+
+            fieldnames = next(csv.reader([header.decode(_encoding).lstrip('\ufeff')]))
+            csv_data = list(csv.DictReader(records, fieldnames=fieldnames))
+            size = (await aiofiles.os.stat(file_path)).st_size
+            return (csv_data, _encode_cursor(offset, header_crc) if offset < size else None)
+        except UnicodeDecodeError as e:
+            logging.exception(f'Error decoding csv {e}')
+            return [], None
+        except ValueError:
+            raise
+        except Exception as e:
+            logging.exception(f'Error streaming from csv {e}')
+            return [], None
+
+
     async def db_connector(
         self,
         selected_table: Tuple[str,int,int],
@@ -110,12 +295,79 @@ class DataConnectors:
         table_name,limit,offset = selected_table
 
         try:
-            conn = asyncpg.connect(**db_config)
-            rows = await conn.fetch(f'SELECT * FROM {table_name} LIMIT {limit} OFFSET {offset}')
-            await conn.close()
+            conn = await asyncpg.connect(**{k:v for k,v in db_config.items() if k != "type"})
+            try:
+                rows = await conn.fetch(f'SELECT * FROM {table_name} LIMIT {limit} OFFSET {offset}')
+            finally:
+                await conn.close()
 
             return rows, limit + offset
 
         except Exception as e:
             logging.exception(f'error retrieving from {table_name}')
             return [],None
+
+    async def db_keyset_connector(
+        self,
+        selected_table: Tuple[str,Union[str,Tuple[str,...]],int],
+        db_config: Dict[str,Any],
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetches data from a table in a database with keyset pagination over a pooled connection -- supports mysql and postgres
+
+        Unlike db_connector's OFFSET paging, every page seeks straight past the previous page's last key,
+        so the cost of a page does not grow with its position in the table.
+
+        Args:
+            selected_table ( Tuple[str,str,int] ): a table, its unique ordered key column (or columns) and the page limit
+            db_config (Dict[str,Any]): connection settings with a 'type' of 'postgresql' or 'mysql'
+            cursor (Optional[str]): cursor returned by the previous page, None to start at the first row
+
+        Returns:
+            List[Dict], Optional[str]: the rows, and the cursor of the next page (None once the table is exhausted)
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another table or key
+        """
+        table_name,key,limit = selected_table
+
+        try:
+            return await get_database_source(db_config).fetch_page(table_name, key, cursor, limit)
+        except ValueError:
+            raise
+        except Exception as e:
+            logging.exception(f'error retrieving from {table_name}')
+            return [],None
+
+
+def _response_data(res: httpx.Response) -> Any:
+    """
+    Returns a response's JSON body, or its text when the body is not valid JSON.
+    """
+    try:
+        return res.json()
+    except ValueError as ve:
+        logging.warning(f'Invalid JSON returned from API, returning as text...{ve}')
+        return res.text
+
+
+def _encode_cursor(offset: int, header_crc: int) -> str:
+    """
+    Packs a byte offset and the header checksum into an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(f'{offset}:{header_crc:08x}'.encode()).decode()
+
+
+def _decode_cursor(cursor: str, header_crc: int, data_start: int) -> int:
+    """
+    Unpacks a cursor into its byte offset, rejecting cursors issued for a different file.
+    """
+    try:
+        offset, crc = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        offset, crc = int(offset), int(crc, 16)
+    except Exception:
+        raise ValueError(f'Invalid CSV cursor {cursor!r}')
+    if crc != header_crc or offset < data_start:
+        raise ValueError(f'CSV cursor {cursor!r} does not belong to this file')
+    return offset
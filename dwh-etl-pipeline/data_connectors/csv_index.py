@@ -0,0 +1,126 @@
+#Sparse row index for CSV files, persisted as a sidecar next to the file
+import aiofiles
+import aiofiles.os
+import json
+import logging
+import os
+import uuid
+from typing import *
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+
+async def read_records(csvfile, offset: int, chunk_size: int) -> AsyncIterator[Tuple[bytes, int]]:
+    """
+    Yields each raw CSV record read from the file's current position, with the byte offset just past it.
+    A line only ends a record when it closes every open quote, so quoted newlines stay inside their record.
+
+    Args:
+        csvfile: file opened with aiofiles in binary mode
+        offset(int): byte offset of the file's current position
+        chunk_size(int): bytes read per disk read
+
+    Returns:
+        AsyncIterator[Tuple[bytes, int]]: (record, end offset) pairs
+    """
+    buffer, record, quotes = b'', b'', 0
+    while True:
+        chunk = await csvfile.read(chunk_size)
+        if not chunk: break
+        lines = (buffer + chunk).split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            record += line + b'\n'
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                offset += len(record)
+                yield record, offset
+                record, quotes = b'', 0
+    record += buffer
+    if record:
+        yield record, offset + len(record)
+
+
+async def read_header(csvfile, chunk_size: int) -> Tuple[Optional[bytes], int]:
+    """
+    Reads the header record from the start of the file.
+
+    Returns:
+        Tuple[Optional[bytes], int]: the header (None for an empty file) and the byte offset of the first data row
+    """
+    await csvfile.seek(0)
+    async for record, end in read_records(csvfile, 0, chunk_size):
+        if record.strip():
+            return record, end
+    return None, 0
+
+
+async def build_csv_index(file_path: str, every: int = 1000, _chunk_size: int = 65536) -> Dict[str, Any]:
+    """
+    Scans a CSV once, recording the byte offset of every Nth data row, and persists the index as a sidecar file
+
+    Blank lines are not counted as rows, matching csv.DictReader. The sidecar is written atomically,
+    so concurrent workers building the same index never read a partial file.
+
+    Args:
+        file_path(str): The file path
+        every(int): rows between indexed offsets
+        chunk_size(int): internal argument for bytes read per disk read
+
+    Returns:
+        Dict[str, Any]: {"version", "size", "mtime_ns", "every", "rows", "offsets"}, where offsets[k] is the byte offset of row k * every
+    """
+    stat = await aiofiles.os.stat(file_path)
+    offsets, rows = [], 0
+    async with aiofiles.open(file_path, 'rb') as csvfile:
+        header, data_start = await read_header(csvfile, _chunk_size)
+        await csvfile.seek(data_start)
+        async for record, end in read_records(csvfile, data_start, _chunk_size):
+            if not record.strip(): continue
+            if rows % every == 0:
+                offsets.append(end - len(record))
+            rows += 1
+
+    index = {"version": INDEX_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "every": every, "rows": rows, "offsets": offsets}
+    index_path = file_path + INDEX_SUFFIX
+    tmp_path = f'{index_path}.{uuid.uuid4().hex}.tmp'
+    try:
+        async with aiofiles.open(tmp_path, 'w') as index_file:
+            await index_file.write(json.dumps(index))
+        await aiofiles.os.replace(tmp_path, index_path)
+    except OSError as e:
+        logging.warning(f'Could not persist csv index {index_path}, using it in memory only: {e}')
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return index
+
+
+async def load_csv_index(file_path: str, every: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Loads the sidecar index of a CSV if it is still valid
+
+    Args:
+        file_path(str): The file path
+        every(Optional[int]): required row spacing, any spacing when None
+
+    Returns:
+        Optional[Dict[str, Any]]: the index, or None when it is missing, unreadable, or the file's size or mtime changed since it was built
+    """
+    try:
+        async with aiofiles.open(file_path + INDEX_SUFFIX, 'r') as index_file:
+            index = json.loads(await index_file.read())
+        stat = await aiofiles.os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    if (index.get("version") != INDEX_VERSION or index.get("size") != stat.st_size or index.get("mtime_ns") != stat.st_mtime_ns
+            or (every is not None and index.get("every") != every)):
+        return None
+    return index
+
+
+async def get_csv_index(file_path: str, every: int = 1000, _chunk_size: int = 65536) -> Dict[str, Any]:
+    """
+    Returns the valid sidecar index of a CSV, rebuilding it when it is missing or stale
+    """
+    return await load_csv_index(file_path, every) or await build_csv_index(file_path, every, _chunk_size)
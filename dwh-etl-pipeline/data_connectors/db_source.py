@@ -0,0 +1,219 @@
+#Pooled, keyset-paginated database source for PostgreSQL (asyncpg) and MySQL (mysql.connector)
+import asyncio
+import base64
+import datetime
+import decimal
+import json
+import re
+import threading
+import uuid
+import weakref
+import asyncpg
+from typing import *
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+
+#Key value types a cursor can carry beyond plain JSON, tagged so they decode back to the type the driver compares against
+CURSOR_TYPES = {
+    'datetime': (datetime.datetime, datetime.datetime.fromisoformat),
+    'date': (datetime.date, datetime.date.fromisoformat),
+    'decimal': (decimal.Decimal, decimal.Decimal),
+    'uuid': (uuid.UUID, uuid.UUID),
+}
+
+
+class DatabaseSource:
+
+    def __init__(self, db_config: Dict[str, Any], min_size: int = 1, max_size: int = 10):
+        """
+        Streams tables with keyset pagination over a connection pool: each page seeks past the last key of the previous one through the key's index,
+        so page N costs the same as page 1 instead of rescanning N * limit rows as OFFSET does.
+
+        Args:
+            db_config (Dict[str, Any]): Connection settings with a 'type' of 'postgresql' or 'mysql'; the rest is passed to the driver.
+            min_size (int): Connections opened up front (PostgreSQL).
+            max_size (int): Maximum pooled connections. MySQL fetches beyond it wait for a free connection, since its pool raises instead of waiting.
+        """
+        self.type = db_config.get('type', 'postgresql')
+        if self.type not in ('postgresql', 'mysql'):
+            raise ValueError(f"Unsupported database type {self.type}")
+        self.config = {k: v for k, v in db_config.items() if k != 'type'}
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pools = weakref.WeakKeyDictionary()
+        self._pool_locks = weakref.WeakKeyDictionary()
+        self._mysql_slots = weakref.WeakKeyDictionary()
+        self._mysql_pool = None
+        self._mysql_lock = threading.Lock()
+
+    async def _get_pool(self):
+        """
+        Returns the running loop's asyncpg pool (pools are bound to the loop that created them), creating it on first use.
+        Creation is serialized, so concurrent first pages share one pool.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._pool_locks.setdefault(loop, asyncio.Lock()):
+            pool = self._pools.get(loop)
+            if pool is None:
+                pool = await asyncpg.create_pool(min_size=self.min_size, max_size=self.max_size, **self.config)
+                self._pools[loop] = pool
+        return pool
+
+    def _get_mysql_pool(self):
+        with self._mysql_lock:
+            if self._mysql_pool is None:
+                from mysql.connector import pooling
+                self._mysql_pool = pooling.MySQLConnectionPool(pool_size=self.max_size, **self.config)
+            return self._mysql_pool
+
+    def build_query(self, table: str, key: Union[str, Tuple[str, ...]], columns: Optional[List[str]], after: bool, limit: int) -> str:
+        """
+        Builds the keyset page query: rows ordered by key, after the given key values when after is set.
+        """
+        keys = [key] if isinstance(key, str) else list(key)
+        quote = self._quote
+        select = ', '.join(quote(column) for column in columns) if columns else '*'
+        sql = f'SELECT {select} FROM {quote(table)}'
+        if after:
+            if self.type == 'postgresql':
+                placeholders = [f'${i + 1}' for i in range(len(keys))]
+            else:
+                placeholders = ['%s'] * len(keys)
+            if len(keys) == 1:
+                sql += f' WHERE {quote(keys[0])} > {placeholders[0]}'
+            else:
+                sql += f" WHERE ({', '.join(quote(k) for k in keys)}) > ({', '.join(placeholders)})"
+        return sql + f" ORDER BY {', '.join(quote(k) for k in keys)} LIMIT {int(limit)}"
+
+    def _quote(self, name: str) -> str:
+        """
+        Quotes a possibly schema-qualified identifier, rejecting anything that is not a plain name.
+        """
+        parts = name.split('.')
+        if not all(IDENTIFIER.match(part) for part in parts):
+            raise ValueError(f"Invalid identifier {name!r}")
+        mark = '"' if self.type == 'postgresql' else '`'
+        return '.'.join(f'{mark}{part}{mark}' for part in parts)
+
+    async def fetch_page(
+        self,
+        table: str,
+        key: Union[str, Tuple[str, ...]],
+        cursor: Optional[str] = None,
+        limit: int = 1000,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetches the page of rows after a cursor, ordered by key.
+
+        Args:
+            table (str): Table name, optionally schema-qualified.
+            key (Union[str, Tuple[str, ...]]): Unique, indexed column (or columns) to order and seek by.
+            cursor (Optional[str]): Token returned by the previous page, None to start at the first row.
+            limit (int): Rows per page.
+            columns (Optional[List[str]]): Columns to select, all when None. Must include the key columns.
+
+        Returns:
+            List[Dict], Optional[str]: The rows as dicts, and the cursor of the next page (None once the table is exhausted)
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another table or key
+        """
+        keys = [key] if isinstance(key, str) else list(key)
+        after = None if cursor is None else decode_cursor(cursor, table, keys)
+        sql = self.build_query(table, key, columns, after is not None, limit)
+        args = after or []
+
+        if self.type == 'postgresql':
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = [dict(record) for record in await conn.fetch(sql, *args)]
+        else:
+            async with self._mysql_slots.setdefault(asyncio.get_running_loop(), asyncio.Semaphore(self.max_size)):
+                rows = await asyncio.to_thread(self._fetch_mysql, sql, args)
+
+        if len(rows) < limit:
+            return rows, None
+        return rows, encode_cursor(table, keys, [rows[-1][k] for k in keys])
+
+    def _fetch_mysql(self, sql: str, args: List[Any]) -> List[Dict]:
+        conn = self._get_mysql_pool().get_connection()
+        try:
+            cur = conn.cursor(dictionary=True)
+            cur.execute(sql, tuple(args))
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+        finally:
+            conn.close()
+
+    async def stream(
+        self,
+        table: str,
+        key: Union[str, Tuple[str, ...]],
+        cursor: Optional[str] = None,
+        batch_size: int = 1000,
+        columns: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+        """
+        Yields (rows, cursor) batches until the table is exhausted. Persisting the cursor of the last batch handled lets an interrupted extraction resume there.
+        """
+        while True:
+            rows, cursor = await self.fetch_page(table, key, cursor, batch_size, columns)
+            if rows:
+                yield rows, cursor
+            if cursor is None:
+                return
+
+    async def close(self):
+        """
+        Closes the running loop's pool and the MySQL pool's idle connections.
+        """
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.close()
+        with self._mysql_lock:
+            mysql_pool, self._mysql_pool = self._mysql_pool, None
+        if mysql_pool is not None:
+            await asyncio.to_thread(mysql_pool._remove_connections)
+
+
+#Sources shared by the DB connectors, one per connection config
+_sources: Dict[str, DatabaseSource] = {}
+
+
+def get_database_source(db_config: Dict[str, Any]) -> DatabaseSource:
+    """
+    Returns the shared DatabaseSource for a connection config, so every page reuses its pool.
+    """
+    config_key = json.dumps(db_config, sort_keys=True, default=str)
+    source = _sources.get(config_key)
+    if source is None:
+        source = _sources[config_key] = DatabaseSource(db_config)
+    return source
+
+
+def encode_cursor(table: str, keys: List[str], values: List[Any]) -> str:
+    """
+    Packs the last key values of a page into an opaque cursor bound to its table and key.
+    """
+    encoded = []
+    for value in values:
+        tag = next((tag for tag, (kind, _) in CURSOR_TYPES.items() if isinstance(value, kind)), None)
+        encoded.append(value if tag is None else [tag, value.isoformat() if hasattr(value, 'isoformat') else str(value)])
+    payload = json.dumps({'t': table, 'k': keys, 'v': encoded}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, table: str, keys: List[str]) -> List[Any]:
+    """
+    Unpacks a cursor into its key values.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = [CURSOR_TYPES[value[0]][1](value[1]) if isinstance(value, list) else value for value in payload['v']]
+    except Exception:
+        raise ValueError(f'Invalid database cursor {cursor!r}')
+    if payload.get('t') != table or payload.get('k') != keys or len(values) != len(keys):
+        raise ValueError(f'Database cursor {cursor!r} does not belong to {table} ordered by {", ".join(keys)}')
+    return values
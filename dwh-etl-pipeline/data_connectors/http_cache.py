@@ -0,0 +1,197 @@
+#Disk-backed HTTP response cache, plugged in under the API connectors as an httpx transport
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import httpx
+from typing import *
+
+#Headers that describe the wire encoding rather than the body, which is stored decoded
+DROPPED_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+class OfflineCacheMiss(httpx.RequestError):
+    """
+    Raised in offline mode for a request with no cached response. Not a transport error, so it is not retried.
+    """
+
+
+class HttpCache:
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, ttl: Optional[float] = 3600, offline: bool = False, clock=time.time):
+        """
+        Size-bounded LRU store of GET responses on local disk, keyed on method and URL with its query parameters in sorted order.
+
+        Args:
+            directory (str): Directory holding the cache database, created if missing.
+            max_bytes (int): Total body bytes kept before least recently used responses are evicted.
+            ttl (float): Seconds a response is fresh when the server sends no Cache-Control max-age. None keeps responses fresh forever, e.g. for immutable historical seasons.
+            offline (bool): Replay cached responses, fresh or not, without touching the network.
+            clock (Callable): Wall-clock time source.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'responses.sqlite')
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.offline = offline
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        """
+        Returns the cache key of a request.
+        """
+        params = sorted(request.url.params.multi_items())
+        url = request.url.copy_with(query=None, fragment=None)
+        return hashlib.sha256(json.dumps([request.method, str(url), params]).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a cached entry {"status", "headers", "body", "etag", "last_modified", "expires_at"} and marks it recently used, or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (self.clock(), key))
+            self._conn.commit()
+        status, headers, body, etag, last_modified, expires_at = row
+        return {"status": status, "headers": json.loads(headers), "body": body, "etag": etag,
+                "last_modified": last_modified, "expires_at": expires_at}
+
+    def put(self, key: str, url: str, response: httpx.Response, body: bytes) -> None:
+        """
+        Stores a response unless it forbids caching, then evicts least recently used entries beyond max_bytes.
+        """
+        if 'no-store' in response.headers.get('cache-control', '').lower() or len(body) > self.max_bytes:
+            return
+        ttl = self._ttl(response)
+        now = self.clock()
+        headers = [(name, value) for name, value in response.headers.multi_items() if name.lower() not in DROPPED_HEADERS]
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               (key, url, response.status_code, json.dumps(headers), body, len(body), response.headers.get('etag'),
+                                response.headers.get('last-modified'), None if ttl is None else now + ttl, now))
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str, response: httpx.Response) -> None:
+        """
+        Restarts an entry's TTL after the server confirmed it with 304 Not Modified, taking over any new validators.
+        """
+        ttl = self._ttl(response)
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET expires_at = ?, last_access = ?, etag = COALESCE(?, etag), "
+                               "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                               (None if ttl is None else now + ttl, now, response.headers.get('etag'), response.headers.get('last-modified'), key))
+            self._conn.commit()
+
+    def _ttl(self, response: httpx.Response) -> Optional[float]:
+        """
+        Returns the response's Cache-Control max-age, or the default TTL.
+        """
+        max_age = re.search(r'max-age\s*=\s*(\d+)', response.headers.get('cache-control', '').lower())
+        return int(max_age.group(1)) if max_age else self.ttl
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """
+        Removes every cached response.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+
+    def __init__(self, cache: HttpCache, transport: httpx.AsyncBaseTransport):
+        """
+        Serves GET requests from an HttpCache, revalidating stale entries with If-None-Match / If-Modified-Since.
+        Responses carry an x-cache header: HIT, REVALIDATED, MISS or OFFLINE.
+
+        Args:
+            cache (HttpCache): Response store.
+            transport (httpx.AsyncBaseTransport): Transport that reaches the network.
+        """
+        self.cache = cache
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != 'GET':
+            return await self.transport.handle_async_request(request)
+
+        key = self.cache.key(request)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None and (self.cache.offline or entry["expires_at"] is None or entry["expires_at"] > self.cache.clock()):
+            return _cached_response(entry, request, 'OFFLINE' if self.cache.offline else 'HIT')
+        if self.cache.offline:
+            raise OfflineCacheMiss(f'No cached response for {request.url} in offline mode', request=request)
+
+        if entry is not None and (entry["etag"] or entry["last_modified"]):
+            headers = request.headers.copy()
+            if entry["etag"]:
+                headers['If-None-Match'] = entry["etag"]
+            if entry["last_modified"]:
+                headers['If-Modified-Since'] = entry["last_modified"]
+            request = httpx.Request(request.method, request.url, headers=headers, extensions=request.extensions)
+
+        response = await self.transport.handle_async_request(request)
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            await asyncio.to_thread(self.cache.refresh, key, response)
+            return _cached_response(entry, request, 'REVALIDATED')
+
+        body = await response.aread()
+        if response.status_code == 200:
+            await asyncio.to_thread(self.cache.put, key, str(request.url), response, body)
+        headers = [(name, value) for name, value in response.headers.multi_items() if name.lower() not in DROPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers + [('x-cache', 'MISS')], content=body,
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _cached_response(entry: Dict[str, Any], request: httpx.Request, state: str) -> httpx.Response:
+    """
+    Builds a response from a cache entry.
+    """
+    return httpx.Response(entry["status"], headers=[tuple(header) for header in entry["headers"]] + [('x-cache', state)],
+                          content=entry["body"], request=request)
@@ -0,0 +1,172 @@
+#Long-lived HTTP clients, rate limiting and retries shared by the API connectors
+import asyncio
+import email.utils
+import httpx
+import random
+import time
+import weakref
+from typing import *
+from .http_cache import HttpCache, CachingTransport
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClientPool:
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 30.0,
+        cache: Optional[HttpCache] = None,
+        **client_kwargs
+    ):
+        """
+        Hands out one keep-alive httpx.AsyncClient per event loop, so pages reuse connections instead of paying DNS, TCP and TLS setup each time.
+        httpx clients are bound to the loop they were created on, hence one client per loop rather than one per process.
+
+        Args:
+            max_connections (int): Maximum open connections per client.
+            max_keepalive_connections (int): Maximum idle connections kept alive per client.
+            keepalive_expiry (float): Seconds an idle connection is kept alive.
+            http2 (bool): Negotiate HTTP/2 where the server supports it. Requires httpx[http2].
+            timeout (float): Default request timeout in seconds.
+            cache (HttpCache): Serve GET responses from this disk cache, revalidating stale entries.
+            client_kwargs: Passed through to httpx.AsyncClient, e.g. headers or transport.
+        """
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.http2 = http2
+        self.timeout = timeout
+        self.cache = cache
+        self.client_kwargs = client_kwargs
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Returns the running loop's client, creating it on first use.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            kwargs = dict(self.client_kwargs)
+            if self.cache is not None:
+                transport = kwargs.pop('transport', None) or httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+                kwargs['transport'] = CachingTransport(self.cache, transport)
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=self.timeout, **kwargs)
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """
+        Closes the running loop's client. The next get_client() opens a new one.
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+#Pool used by DataConnectors unless one is passed in
+shared_pool = HttpClientPool()
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic, sleep=asyncio.sleep):
+        """
+        Token-bucket rate limiter: allows bursts of up to capacity requests, refilled at rate requests per second.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Bucket size. Defaults to rate, i.e. one second of burst. Never less than one token, so rates below one request per second still make progress.
+            clock (Callable): Monotonic time source.
+            sleep (Callable): Coroutine used to wait for tokens.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits until a token is available and takes it. Waiters are served in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await self.sleep((1 - self._tokens) / self.rate)
+
+
+async def get_with_retries(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    params: Dict[str, Any],
+    retries: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 30.0,
+    rate_limiter: Optional[TokenBucket] = None,
+    timeout: Optional[float] = None,
+    sleep=asyncio.sleep
+) -> httpx.Response:
+    """
+    GETs a URL, retrying transport errors and 429/5xx responses with full-jitter exponential backoff.
+    A Retry-After header sets the minimum wait. Every attempt takes a rate-limiter token.
+
+    Args:
+        client (httpx.AsyncClient): Client to send with.
+        endpoint (str): The API URL.
+        params (Dict[str, Any]): Query parameters.
+        retries (int): Retries after the first attempt.
+        backoff (float): Base delay in seconds, doubled per attempt.
+        max_backoff (float): Cap on the delay in seconds.
+        rate_limiter (TokenBucket): Limiter to take a token from before each attempt.
+        timeout (float): Request timeout in seconds, the client's default when None.
+        sleep (Callable): Coroutine used to wait between attempts.
+
+    Returns:
+        httpx.Response: The last response, which may still carry an error status once retries run out.
+
+    Raises:
+        httpx.TransportError: If the last attempt failed to connect or read.
+    """
+    for attempt in range(retries + 1):
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        try:
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            res = await client.get(url=endpoint, params=params, **kwargs)
+            if res.status_code not in RETRY_STATUSES or attempt == retries:
+                return res
+            retry_after = _retry_after(res.headers.get("Retry-After"))
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            retry_after = 0
+        await sleep(max(retry_after, random.uniform(0, min(max_backoff, backoff * 2 ** attempt))))
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """
+    Parses a Retry-After header given in seconds or as an HTTP date.
+    """
+    if not value:
+        return 0
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return 0
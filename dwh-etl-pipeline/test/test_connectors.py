@@ -1,6 +1,18 @@
+import asyncio
+import csv
+import datetime
+import httpx
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from data_connectors import connector_strategy as cs
+from data_connectors import csv_index
+from data_connectors import connectors
+from data_connectors import http_pool
+from data_connectors import http_cache
+from data_connectors import db_source
 
 
 class TestConnectorMethods(unittest.IsolatedAsyncioTestCase):
@@ -51,6 +63,244 @@ class TestConnectorMethods(unittest.IsolatedAsyncioTestCase):
 
 
 
+    async def test_api_crawl(self):
+
+        #Serve 10 pages of 3 rows from a mock transport that fails some requests once and reports its peak concurrency
+        calls, in_flight, peak = {}, [0], [0]
+
+        async def handler(request):
+            page = int(request.url.params['page'])
+            calls[page] = calls.get(page, 0) + 1
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01 * (page % 3))
+            in_flight[0] -= 1
+            if page in (2, 5) and calls[page] == 1:
+                return httpx.Response(503 if page == 2 else 429, headers={'Retry-After': '0'})
+            rows = [{'page': page, 'row': i} for i in range(3)] if page < 10 else []
+            return httpx.Response(200, json=rows)
+
+        pool = http_pool.HttpClientPool(transport=httpx.MockTransport(handler))
+        api = connectors.DataConnectors(http_pool=pool)
+        results = [result async for result in api.api_crawl('https://example.test/matches', ('page', 0), ('size', 3),
+                                                            step=1, concurrency=4, rate=1000, backoff=0.001)]
+        await pool.aclose()
+
+        self.assertEqual([result[1] for result in results], list(range(1, 11)))
+        self.assertEqual([result[0][0]['page'] for result in results], list(range(10)))
+        self.assertEqual((calls[2], calls[5]), (2, 2))
+        self.assertLessEqual(peak[0], 4)
+        self.assertGreater(peak[0], 1)
+
+        pool = http_pool.HttpClientPool(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+        results = [result async for result in connectors.DataConnectors(http_pool=pool).api_crawl('https://example.test/matches', pages=5)]
+        self.assertEqual(results, [(None, 0, 404)])
+        self.assertIs(pool.get_client(), pool.get_client())
+        await pool.aclose()
+
+    async def test_api_crawl_wrapped_payload(self):
+
+        #The API wraps its rows in {"data": [...]} and returns an empty wrapper past the last page
+        def handler(request):
+            page = int(request.url.params['page'])
+            return httpx.Response(200, json={'data': [{'page': page}] if page < 3 else []})
+
+        pool = http_pool.HttpClientPool(transport=httpx.MockTransport(handler))
+        results = [result async for result in connectors.DataConnectors(http_pool=pool).api_crawl(
+            'https://example.test/matches', step=1, concurrency=2, extract=lambda body: body['data'])]
+        await pool.aclose()
+
+        self.assertEqual([result[0]['data'][0]['page'] for result in results], [0, 1, 2])
+
+    async def test_api_connector_cache(self):
+
+        #Page 0 carries an ETag and page 1 a Last-Modified date; the server answers 304 when the validator still matches
+        requests, now = [], [1000.0]
+
+        def handler(request):
+            requests.append((request.url.params['page'], request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')))
+            if request.url.params['page'] == '0':
+                if request.headers.get('If-None-Match') == '"v1"':
+                    return httpx.Response(304, headers={'ETag': '"v1"'})
+                return httpx.Response(200, json=[{'match': 1}], headers={'ETag': '"v1"'})
+            if request.headers.get('If-Modified-Since'):
+                return httpx.Response(304)
+            return httpx.Response(200, json=[{'match': 2, 'padding': 'x' * 200}], headers={'Last-Modified': 'Sat, 01 Jun 2024 00:00:00 GMT'})
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache_dir = tmp_dir.name
+        cache = http_cache.HttpCache(cache_dir, ttl=60, clock=lambda: now[0])
+        self.addCleanup(cache.close)
+        pool = http_pool.HttpClientPool(cache=cache, transport=httpx.MockTransport(handler))
+        api = connectors.DataConnectors(http_pool=pool)
+
+        first = await api.api_connector('https://example.test/matches', ('page', 0), ('size', 1))
+        self.assertEqual(first, ([{'match': 1}], 1, 200))
+        self.assertEqual(await api.api_connector('https://example.test/matches', ('page', 0), ('size', 1)), first)
+        self.assertEqual(len(requests), 1)
+
+        now[0] += 120
+        self.assertEqual(await api.api_connector('https://example.test/matches', ('page', 0), ('size', 1)), first)
+        self.assertEqual(requests[-1], ('0', '"v1"', None))
+        await api.api_connector('https://example.test/matches', ('page', 1), ('size', 1))
+        now[0] += 120
+        second = await api.api_connector('https://example.test/matches', ('page', 1), ('size', 1))
+        self.assertEqual(second[0][0]['match'], 2)
+        self.assertEqual(requests[-1], ('1', None, 'Sat, 01 Jun 2024 00:00:00 GMT'))
+        await pool.aclose()
+        cache.close()
+
+        #Offline replay serves stale entries and fails misses without touching the network
+        offline = http_cache.HttpCache(cache_dir, offline=True, clock=lambda: now[0] + 10000)
+        self.addCleanup(offline.close)
+        pool = http_pool.HttpClientPool(cache=offline, transport=httpx.MockTransport(handler))
+        api = connectors.DataConnectors(http_pool=pool)
+        count = len(requests)
+        self.assertEqual(await api.api_connector('https://example.test/matches', ('page', 0), ('size', 1)), first)
+        self.assertEqual(await api.api_connector('https://example.test/matches', ('page', 2), ('size', 1)), (None, 2, 500))
+        self.assertEqual(len(requests), count)
+        await pool.aclose()
+
+        #Shrinking the cache evicts the least recently used page
+        offline.max_bytes = 250
+        offline.put('extra', 'https://example.test/extra', httpx.Response(200), b'y' * 40)
+        self.assertIsNone(offline.get(offline.key(httpx.Request('GET', 'https://example.test/matches?size=1&page=1'))))
+        self.assertIsNotNone(offline.get(offline.key(httpx.Request('GET', 'https://example.test/matches?size=1&page=0'))))
+        offline.close()
+
+    async def test_token_bucket(self):
+
+        now, waits = [0.0], []
+
+        async def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        bucket = http_pool.TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            await bucket.acquire()
+        self.assertEqual(waits, [0.5, 0.5])
+        self.assertEqual(now[0], 1.0)
+
+        #Below one request per second the bucket still holds a whole token
+        now[0], waits[:] = 0.0, []
+        slow = http_pool.TokenBucket(rate=0.5, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            await asyncio.wait_for(slow.acquire(), 1)
+        self.assertEqual(waits, [2.0, 2.0])
+
+    async def test_db_connector_awaits_connect(self):
+
+        conn = MagicMock(fetch=AsyncMock(return_value=[{'id': 1}]), close=AsyncMock())
+        with patch('data_connectors.connectors.asyncpg.connect', AsyncMock(return_value=conn)) as connect:
+            self.selector.set_strategy(cs.Strategies.DB)
+            result = await self.selector.execute(('fixtures', 10, 20), {'type': 'postgresql', 'database': 'epl'})
+
+        self.assertEqual(result, ([{'id': 1}], 30))
+        connect.assert_awaited_once_with(database='epl')
+        conn.fetch.assert_awaited_once_with('SELECT * FROM fixtures LIMIT 10 OFFSET 20')
+        conn.close.assert_awaited_once()
+
+    async def test_db_keyset_connector(self):
+
+        #Serve a 5-row table through a fake asyncpg pool that applies the keyset predicate to (kickoff, id)
+        table = [{'id': i, 'kickoff': datetime.datetime(2024, 8, 16 + i // 2)} for i in range(5)]
+        queries = []
+
+        async def fetch(sql, *args):
+            queries.append((sql, args))
+            rows = [row for row in table if not args or (row['kickoff'], row['id']) > tuple(args)]
+            return rows[:int(sql.rsplit('LIMIT ', 1)[1])]
+
+        conn = MagicMock(fetch=fetch)
+        pool = MagicMock(close=AsyncMock())
+        pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+        pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+        config = {'type': 'postgresql', 'database': 'epl', 'host': 'keyset.test'}
+
+        with patch('data_connectors.db_source.asyncpg.create_pool', AsyncMock(return_value=pool)) as create_pool:
+            self.selector.set_strategy(cs.Strategies.DB_KEYSET)
+            rows, cursor, pages = [], None, 0
+            while True:
+                page, cursor = await self.selector.execute(('epl.fixtures', ('kickoff', 'id'), 2), config, cursor)
+                rows.extend(page)
+                pages += 1
+                if cursor is None: break
+
+            self.assertEqual(rows, table)
+            self.assertEqual(pages, 3)
+            create_pool.assert_awaited_once()
+            self.assertEqual(queries[1][0], 'SELECT * FROM "epl"."fixtures" WHERE ("kickoff", "id") > ($1, $2) ORDER BY "kickoff", "id" LIMIT 2')
+            self.assertEqual(queries[1][1], (datetime.datetime(2024, 8, 16), 1))
+
+            with self.assertRaises(ValueError):
+                await self.selector.execute(('epl.results', ('kickoff', 'id'), 2), config, db_source.encode_cursor('epl.fixtures', ['kickoff', 'id'], [1, 2]))
+            await db_source.get_database_source(config).close()
+            pool.close.assert_awaited_once()
+
+        mysql = db_source.DatabaseSource({'type': 'mysql', 'database': 'epl'})
+        self.assertEqual(mysql.build_query('fixtures', 'id', ['id', 'home'], True, 500), 'SELECT `id`, `home` FROM `fixtures` WHERE `id` > %s ORDER BY `id` LIMIT 500')
+        with self.assertRaises(ValueError):
+            mysql.build_query('fixtures; DROP TABLE x', 'id', None, False, 10)
+
+    async def test_db_source_concurrent_pages_share_pools(self):
+
+        #Concurrent first pages must create one asyncpg pool, and MySQL fetches beyond the pool size must wait instead of exhausting it
+        async def create_pool(**kwargs):
+            await asyncio.sleep(0.01)
+            conn = MagicMock(fetch=AsyncMock(return_value=[{'id': 1}]))
+            pool = MagicMock(close=AsyncMock())
+            pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+            pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+            return pool
+
+        source = db_source.DatabaseSource({'type': 'postgresql', 'database': 'epl'})
+        with patch('data_connectors.db_source.asyncpg.create_pool', side_effect=create_pool) as created:
+            await asyncio.gather(*[source.fetch_page('fixtures', 'id') for _ in range(5)])
+            await source.close()
+        self.assertEqual(created.call_count, 1)
+
+        queries, state = [], {'out': 0, 'peak': 0, 'pools': 0}
+
+        class FakeMySQLPool:
+
+            def __init__(self, pool_size, **config):
+                state['pools'] += 1
+                self.pool_size = pool_size
+
+            def get_connection(self):
+                if state['out'] >= self.pool_size:
+                    raise RuntimeError('Failed getting connection; pool exhausted')
+                state['out'] += 1
+                state['peak'] = max(state['peak'], state['out'])
+                return FakeMySQLConnection()
+
+            def _remove_connections(self):
+                pass
+
+        class FakeMySQLConnection:
+
+            def cursor(self, dictionary=False):
+                cursor = MagicMock()
+                cursor.execute.side_effect = lambda sql, args: queries.append((sql, args)) or time.sleep(0.01)
+                cursor.fetchall.return_value = [{'id': args_id} for args_id in (5, 6)] if dictionary else []
+                return cursor
+
+            def close(self):
+                state['out'] -= 1
+
+        source = db_source.DatabaseSource({'type': 'mysql', 'database': 'epl'}, max_size=2)
+        with patch('mysql.connector.pooling.MySQLConnectionPool', FakeMySQLPool):
+            pages = await asyncio.gather(*[source.fetch_page('fixtures', 'id', limit=2) for _ in range(6)])
+            rows, cursor = pages[0]
+            await source.fetch_page('fixtures', 'id', cursor, limit=2)
+            await source.close()
+
+        self.assertEqual((state['pools'], state['peak'], state['out']), (1, 2, 0))
+        self.assertEqual(rows, [{'id': 5}, {'id': 6}])
+        self.assertEqual(queries[-1], ('SELECT * FROM `fixtures` WHERE `id` > %s ORDER BY `id` LIMIT 2', (6,)))
+
     async def test_csv_connector(self):
 
 
@@ -63,5 +313,70 @@ class TestConnectorMethods(unittest.IsolatedAsyncioTestCase):
         self.assertGreater(len(result[0]), 0)
         self.assertEqual(result[1],3)
 
+    async def test_csv_stream_connector(self):
+
+
+        self.selector.set_strategy(cs.Strategies.CSV_STREAM)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        file_path = os.path.join(tmp_dir.name, 'events.csv')
+        with open(file_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['id', 'note'])
+            for i in range(25):
+                writer.writerow([i, f'line one\nline "{i}" two' if i % 7 == 0 else f'note {i}'])
+        with open(file_path, newline='') as csvfile:
+            expected = list(csv.DictReader(csvfile))
+
+        rows, cursor, pages = [], None, 0
+        while True:
+            page, cursor = await self.selector.execute(file_path, cursor, 4, _chunk_size=16)
+            rows.extend(page)
+            pages += 1
+            if cursor is None: break
+            self.assertIsInstance(cursor, str)
+        self.assertEqual(rows, expected)
+        self.assertEqual(pages, 7)
+
+        page, cursor = await self.selector.execute(file_path, None, 3)
+        resumed, _ = await self.selector.execute(file_path, cursor, 2)
+        self.assertEqual(resumed, expected[3:5])
+
+        with self.assertRaises(ValueError):
+            await self.selector.execute(file_path, 'not-a-cursor', 2)
+        with self.assertRaises(ValueError):
+            await self.selector.execute('test_files/test_data.csv', cursor, 2)
+
+    async def test_csv_connector_sparse_index(self):
+
+
+        self.selector.set_strategy(cs.Strategies.CSV)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        file_path = os.path.join(tmp_dir.name, 'events.csv')
+        with open(file_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['id', 'note'])
+            for i in range(25):
+                writer.writerow([i, f'line one\nline "{i}" two' if i % 7 == 0 else f'note {i}'])
+            csvfile.write('\r\n')
+        with open(file_path, newline='') as csvfile:
+            expected = list(csv.DictReader(csvfile))
+
+        for offset in (0, 3, 4, 14, 23, 30):
+            result = await self.selector.execute(file_path, offset, 5, _index_every=4, _index_min_bytes=0)
+            self.assertEqual(result, (expected[offset:offset + 5], offset + 5))
+
+        index = await csv_index.load_csv_index(file_path, 4)
+        self.assertEqual((index["rows"], len(index["offsets"])), (25, 7))
+        self.assertIsNone(await csv_index.load_csv_index(file_path, 10))
+
+        with open(file_path, 'a', newline='') as csvfile:
+            csv.writer(csvfile).writerow([25, 'appended'])
+        self.assertIsNone(await csv_index.load_csv_index(file_path, 4))
+        result = await self.selector.execute(file_path, 24, 5, _index_every=4, _index_min_bytes=0)
+        self.assertEqual([row['id'] for row in result[0]], ['24', '25'])
+        self.assertEqual((await csv_index.load_csv_index(file_path, 4))["rows"], 26)
+
     def tearDown(self):
         self.selector = None